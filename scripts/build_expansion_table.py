@@ -0,0 +1,38 @@
+"""
+Build a new version of the offline job expansion synonym table
+from the history of LLM expansions recorded by JobExpander
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+from src.expansion_table import ExpansionSynonymTable
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_expansion_table(config_path: str = "config.yaml"):
+    """Rebuild data/job_expansions.json from data/expansion_history.jsonl"""
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    
+    expansion_config = config.get('job_expansion') or {}
+    history_path = expansion_config.get('history_file', 'data/expansion_history.jsonl')
+    table_path = expansion_config.get('synonym_table', 'data/job_expansions.json')
+    
+    if not os.path.exists(history_path):
+        logger.warning(f"No expansion history at {history_path} - nothing to build")
+        return
+    
+    logger.info(f"🔄 Building expansion table from {history_path}...")
+    table = ExpansionSynonymTable.build(history_path, table_path)
+    
+    logger.info(f"✅ Wrote {table_path} v{table['version']}")
+    logger.info(f"   Titles: {len(table['titles'])}, Skills: {len(table['skills'])}")
+
+
+if __name__ == "__main__":
+    build_expansion_table()
@@ -1,11 +1,14 @@
 import asyncio
-from typing import List
+from typing import Dict, List, Set, Tuple
 from src.models import JobDescription, Candidate, RankedCandidate, Job, JobStatus
 from src.scrapers import PortalScraperManager
 from src.matcher import CandidateMatcher
 from src.ranker import CandidateRanker
 from src.llm_provider import LLMProvider
 from src.job_expander import JobExpander
+from src.enrichment import CandidateEnricher
+from src.pipeline import PipelineStage, SourcingLimits, StagePipeline, TopKSelector
+from src.tracing import tracer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,15 +32,31 @@ class CandidateSourcingAgent:
         logger.info(f"Starting candidate sourcing for: {job_description.title}")
         
         # Step 0: Expand job titles and skills using LLM
-        logger.info("🔄 Expanding job titles and skills...")
-        expanded_data = self.job_expander.expand_job_data(
-            job_title=job_description.title,
-            skills=job_description.required_skills
-        )
+        # The original title is always among the expanded titles, so on portals whose
+        # search ignores the skills, start scraping it right away and hide the expansion
+        # latency behind that scrape (the rest need the expanded skills first)
+        logger.info("🔄 Expanding job titles and skills (scraping original title meanwhile)...")
+        limits = SourcingLimits.for_job(self.config, job_description)
+        planned_queries = {}
+        scrape_tasks = self.scraper_manager.schedule([job_description], planned_queries, skill_independent_only=True)
+        try:
+            with tracer.span("expansion", title=job_description.title) as span:
+                expanded_data = await limits.within(asyncio.to_thread(
+                    self.job_expander.expand_job_data,
+                    job_title=job_description.title,
+                    skills=job_description.required_skills
+                ), {"job_titles": [job_description.title], "skills": job_description.required_skills}, "job expansion")
+                span.set_attributes(titles=len(expanded_data["job_titles"]), skills=len(expanded_data["skills"]))
+        except BaseException:
+            for task in scrape_tasks:
+                task.cancel()
+            raise
         
-        # Create expanded job descriptions for scraping
+        # Create expanded job descriptions for the additional titles
         expanded_job_descriptions = []
         for job_title in expanded_data["job_titles"]:
+            if job_title.strip().lower() == job_description.title.strip().lower():
+                continue  # Planned first, below
             expanded_jd = JobDescription(
                 title=job_title,
                 description=job_description.description,
@@ -48,47 +67,12 @@ class CandidateSourcingAgent:
             )
             expanded_job_descriptions.append(expanded_jd)
         
-        logger.info(f"✓ Created {len(expanded_job_descriptions)} job title variations:")
+        logger.info(f"✓ Created {len(expanded_job_descriptions)} additional job title variations:")
         for jd in expanded_job_descriptions:
             logger.info(f"  - {jd.title}")
         logger.info(f"✓ Expanded skills from {len(job_description.required_skills)} to {len(expanded_data['skills'])}")
         
-        # Step 1: Scrape candidates from all portals using expanded job descriptions
-        all_candidates = []
-        seen_ids = set()
-        
-        for expanded_jd in expanded_job_descriptions:
-            logger.info(f"Scraping for: {expanded_jd.title}")
-            candidates = await self.scraper_manager.scrape_all(expanded_jd)
-            
-            # Deduplicate candidates
-            for candidate in candidates:
-                if candidate.id not in seen_ids:
-                    all_candidates.append(candidate)
-                    seen_ids.add(candidate.id)
-        
-        candidates = all_candidates
-        logger.info(f"Found {len(candidates)} unique raw candidates across all job title variations")
-        
-        if not candidates:
-            logger.warning("No candidates found from any portal")
-            return []
-        
-        # Step 2: Enrich candidate data (optional)
-        try:
-            from src.enrichment import CandidateEnricher
-            enricher = CandidateEnricher()
-            enriched_candidates = []
-            for candidate in candidates[:50]:  # Limit enrichment to top 50
-                enriched = await enricher.enrich_candidate(candidate)
-                enriched_candidates.append(enriched)
-            candidates = enriched_candidates
-            logger.info(f"Enriched {len(candidates)} candidates")
-        except Exception as e:
-            logger.warning(f"Enrichment failed: {e}. Continuing without enrichment.")
-        
-        # Step 3: Match candidates using NLP (with expanded skills)
-        # Use the original job description but with expanded skills for better matching
+        # The original job description but with expanded skills, for scraping and better matching
         enhanced_jd = JobDescription(
             title=job_description.title,
             description=job_description.description,
@@ -97,15 +81,140 @@ class CandidateSourcingAgent:
             location=job_description.location,
             salary_range=job_description.salary_range
         )
-        matched = self.matcher.match_candidates(enhanced_jd, candidates)
-        logger.info(f"Matched {len(matched)} candidates above threshold")
         
-        if not matched:
+        # Step 1: Scrape candidates from all portals using expanded job descriptions
+        # Titles are merged into as few queries per portal as it supports, and every
+        # query runs concurrently under the per-portal limits. The original title comes
+        # first; queries the speculative scrape already issued are skipped
+        scrape_tasks.extend(self.scraper_manager.schedule([enhanced_jd] + expanded_job_descriptions, planned_queries))
+        
+        # Steps 2-4: Enrich, match (with expanded skills) and select candidates as scrapes finish
+        try:
+            selected = await self._process_candidates(job_description, enhanced_jd, scrape_tasks, limits)
+        finally:
+            for task in scrape_tasks:
+                if not task.done():
+                    task.cancel()
+        
+        if not selected:
             logger.warning("No candidates matched the job requirements")
             return []
         
-        # Step 4: Rank candidates
-        ranked = self.ranker.rank_candidates(job_description, matched)
+        # Step 5: Rank the selected candidates (AI reasoning only for these, within what is left of the budget)
+        ranked = self.ranker.rank_candidates(job_description, selected, time_budget=limits.remaining())
         logger.info(f"Ranked top {len(ranked)} candidates")
         
         return ranked
+    
+    async def _process_candidates(self, job_description: JobDescription, enhanced_jd: JobDescription,
+                                  scrape_tasks: List[asyncio.Task], limits: SourcingLimits) -> List[Candidate]:
+        """
+        Stream scraped candidates through dedupe -> enrich -> embed -> score -> select.
+        
+        Each stage is a pool of workers fed by a bounded queue, so candidates from the
+        first finished scrapes are enriched and scored while other portals still run.
+        Outstanding scrapes are cancelled once the quality target is met or at the
+        deadline; candidates already scraped are still selected, but past the deadline
+        they skip enrichment and embedding (and so the match threshold) and are
+        selected by ranking score alone. Returns the top-K candidates by ranking score.
+        """
+        pipeline_config = self.config.get('pipeline') or {}
+        concurrency = pipeline_config.get('concurrency') or {}
+        threshold = pipeline_config.get('match_threshold', 0.25)
+        enrich_limit = pipeline_config.get('enrich_limit', 50)
+        
+        timer = None
+        if limits.deadline is not None:
+            timer = asyncio.get_running_loop().call_at(limits.deadline, self.scraper_manager.cancel_outstanding,
+                                                       scrape_tasks, "Time budget reached")
+        
+        job_context = await asyncio.to_thread(self.matcher.prepare_job, enhanced_jd)
+        selector = TopKSelector(pipeline_config.get('top_k', 20))
+        seen: Dict[str, Tuple[int, Candidate]] = {}  # Candidate id -> (query index, record kept)
+        counted: Set[str] = set()  # Candidates already counted towards the quality target
+        enriched = 0
+        unscored = 0
+        
+        enricher = CandidateEnricher.from_config(self.config)
+        if not enricher.enabled:
+            logger.info("No enrichment API keys configured, skipping enrichment")
+        
+        async def scraped():
+            async for index, batch in self.scraper_manager.iter_results(scrape_tasks):
+                for candidate in batch:
+                    yield index, candidate
+        
+        async def dedupe(item):
+            index, candidate = item
+            kept = seen.get(candidate.id)
+            if kept is not None and index >= kept[0]:
+                self.scraper_manager.merge_duplicate(kept[1], candidate)
+                return None
+            if kept is not None:
+                # The same candidate from an earlier query (e.g. the original title, whose
+                # scrape finished later) replaces the record already in the pipeline
+                self.scraper_manager.merge_duplicate(candidate, kept[1])
+                selector.discard(candidate.id)
+            seen[candidate.id] = (index, candidate)
+            return candidate
+        
+        async def enrich(candidate: Candidate):
+            nonlocal enriched
+            if not enricher.enabled or enriched >= enrich_limit or limits.expired:  # Only enrich the first enrich_limit candidates
+                return candidate
+            enriched += 1
+            return await limits.within(enricher.enrich_candidate(candidate), candidate, "enrichment")
+        
+        async def embed(candidate: Candidate):
+            if limits.expired:
+                return candidate, None
+            return candidate, await limits.within(asyncio.to_thread(self.matcher.embed_candidate, candidate),
+                                                  None, "embedding")
+        
+        async def score(item):
+            nonlocal unscored
+            candidate, embedding = item
+            if embedding is None:  # Out of time: left to the ranking score
+                unscored += 1
+                return candidate
+            if self.matcher.score_candidate(job_context, candidate, embedding) < threshold:
+                return None
+            return candidate
+        
+        async def select(candidate: Candidate):
+            if seen[candidate.id][1] is not candidate:
+                return None  # Replaced by an earlier query's record
+            total_score, _ = self.ranker.score_candidate(job_description, candidate)
+            selector.add(total_score, candidate, key=candidate.id)
+            
+            if candidate.id in counted:
+                return None
+            counted.add(candidate.id)
+            if limits.record(total_score):
+                self.scraper_manager.cancel_outstanding(
+                    scrape_tasks, f"Quality target met ({limits.min_candidates} candidates scoring {limits.min_score}+)")
+            return None
+        
+        pipeline = StagePipeline([
+            PipelineStage('dedupe', dedupe),
+            PipelineStage('enrich', enrich, concurrency.get('enrich', 8)),
+            PipelineStage('embed', embed, concurrency.get('embed', 2)),
+            PipelineStage('score', score),
+            PipelineStage('select', select)
+        ], queue_size=pipeline_config.get('queue_size', 50), source_name='scrape')
+        
+        try:
+            metrics = await pipeline.run(scraped())
+        finally:
+            if timer is not None:
+                timer.cancel()
+        logger.info(f"Found {len(seen)} unique raw candidates across all job title variations")
+        if not seen:
+            logger.warning("No candidates found from any portal")
+        logger.info(f"Matched {metrics['score']['emitted'] - unscored} candidates above threshold {threshold}")
+        if unscored:
+            logger.info(f"⏱️  {unscored} candidates reached the time budget unmatched and were selected by ranking score")
+        logger.info("Pipeline stages:")
+        pipeline.log_summary()
+        
+        return selector.items()
@@ -3,14 +3,18 @@ Enhanced Agent with NoSQL and Vector DB integration
 Automatically stores all scraped candidates and creates embeddings
 """
 import asyncio
-from typing import List
+from typing import Awaitable, Callable, List, Optional, Set
 from src.models import JobDescription, Candidate, RankedCandidate
 from src.scrapers import PortalScraperManager
-from src.matcher import CandidateMatcher
+from src.matcher import CandidateMatcher, ScoredCandidates
 from src.ranker import CandidateRanker
 from src.llm_provider import LLMProvider
 from src.nosql_database import mongo_db
 from src.vector_database import vector_db
+from src.tracing import tracer
+from src.persistence_queue import persistence_queue
+from src.feature_store import JobFeatureMatrix, feature_store
+from src.pipeline import SourcingLimits
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,31 +29,41 @@ class CandidateSourcingAgentNoSQL:
         self.matcher = CandidateMatcher(config)
         self.ranker = CandidateRanker(config)
         self.llm_provider = LLMProvider(config)
+        
+        # Candidate writes go through the write-behind queue
+        persistence_queue.register('mongo.scraped_candidates', mongo_db.insert_scraped_candidates_bulk)
+        persistence_queue.register('mongo.candidates', mongo_db.insert_candidates_bulk)
+        persistence_queue.register('chroma.scraped_candidates', lambda batch: self._write_vectors(batch, is_final=False))
+        persistence_queue.register('chroma.candidates', lambda batch: self._write_vectors(batch, is_final=True))
         logger.info("Agent initialized with NoSQL + Vector DB support")
     
-    async def check_existing_candidates(self, job_description: JobDescription, min_results: int = 10) -> List[Candidate]:
-        """Check vector DB for existing similar candidates"""
+    async def check_existing_candidates(self, job_description: JobDescription, min_results: int = 10,
+                                        exclude_ids: Optional[Set[str]] = None) -> List[Candidate]:
+        """
+        Check vector DB for existing similar candidates
+        
+        Candidates in exclude_ids are left out. Pass the ones this job just
+        scraped: the caller already has them, and their writes may still be
+        queued (write-behind), so the stores may not have them yet.
+        """
         logger.info("🔍 Checking vector DB for existing candidates...")
         
         try:
             # Search in scraped candidates collection (larger pool)
             results = vector_db.search_by_job(job_description.dict(), n_results=min_results * 2)
+            if exclude_ids:
+                results = [result for result in results if result['id'] not in exclude_ids]
             
             if results:
                 logger.info(f"✅ Found {len(results)} existing candidates in vector DB")
                 
-                # Convert vector results to Candidate objects
+                # Get full candidate data for every hit from MongoDB in one lookup
+                profiles = mongo_db.get_candidates_by_ids([result['id'] for result in results])
+                
+                # Convert vector results to Candidate objects (in similarity order)
                 candidates = []
                 for result in results:
-                    metadata = result.get('metadata', {})
-                    
-                    # Get full candidate data from MongoDB
-                    candidate_data = mongo_db.get_candidate(result['id'])
-                    if not candidate_data:
-                        # Try scraped collection
-                        scraped_candidates = mongo_db.get_scraped_candidates()
-                        candidate_data = next((c for c in scraped_candidates if c.get('id') == result['id']), None)
-                    
+                    candidate_data = profiles.get(result['id'])
                     if candidate_data:
                         try:
                             candidate = Candidate(**candidate_data)
@@ -67,23 +81,46 @@ class CandidateSourcingAgentNoSQL:
             logger.error(f"Error checking existing candidates: {e}")
             return []
     
-    async def source_candidates(self, job_description: JobDescription) -> List[RankedCandidate]:
-        """Main entry point with vector DB lookup and automatic storage"""
+    async def source_candidates(self, job_description: JobDescription,
+                                on_update: Optional[Callable[[List[RankedCandidate]], None]] = None,
+                                candidate_pool: Optional[List[Candidate]] = None,
+                                on_scraped: Optional[Callable[[List[Candidate]], Awaitable[None]]] = None,
+                                job_id: Optional[str] = None) -> List[RankedCandidate]:
+        """
+        Main entry point with vector DB lookup and automatic storage
+        
+        on_update, if given, receives the ranked top candidates before AI reasoning
+        is generated; their reasoning text is then filled in as it streams.
+        candidate_pool, if given, is re-scored instead of scraping (candidates
+        scraped for a near-identical job); on_scraped receives fresh scrapes.
+        With a job_id, every scored candidate's ranking features are kept for re-ranking.
+        Scraping stops early at the job's quality target or time budget (see
+        SourcingLimits); past the budget, enrichment, matching and AI reasoning are skipped.
+        """
         logger.info(f"🚀 Starting candidate sourcing for: {job_description.title}")
+        limits = SourcingLimits.for_job(self.config, job_description)
         
-        # Step 1: Always scrape fresh candidates
-        logger.info(f"📡 Scraping fresh candidates from all platforms...")
-        scraped_candidates = await self.scraper_manager.scrape_all(job_description)
-        logger.info(f"Found {len(scraped_candidates)} new candidates")
+        if candidate_pool is not None:
+            # Step 1: Reuse another job's scraped candidates (already stored)
+            logger.info(f"♻️  Re-scoring {len(candidate_pool)} candidates scraped for a similar job")
+            scraped_candidates = candidate_pool
+        else:
+            # Step 1: Scrape fresh candidates
+            logger.info(f"📡 Scraping fresh candidates from all platforms...")
+            scraped_candidates = await self._scrape(job_description, limits)
+            logger.info(f"Found {len(scraped_candidates)} new candidates")
+            if on_scraped and scraped_candidates:
+                await on_scraped(scraped_candidates)
         
         # Step 2: Store ALL scraped candidates in MongoDB and Vector DB
-        if scraped_candidates:
+        if scraped_candidates and candidate_pool is None:
             await self.store_scraped_candidates(scraped_candidates)
             logger.info(f"✅ Stored all {len(scraped_candidates)} scraped candidates with embeddings")
         
         # Step 3: Optionally check existing candidates from vector DB for additional matches
         # (This gives you more candidates to choose from)
-        existing_candidates = await self.check_existing_candidates(job_description, min_results=10)
+        existing_candidates = await self.check_existing_candidates(
+            job_description, min_results=10, exclude_ids={c.id for c in scraped_candidates})
         
         if existing_candidates:
             logger.info(f"📚 Found {len(existing_candidates)} additional candidates from vector DB")
@@ -101,46 +138,65 @@ class CandidateSourcingAgentNoSQL:
         # Step 3: Enrich candidate data (optional)
         try:
             from src.enrichment import CandidateEnricher
-            enricher = CandidateEnricher()
-            enriched_candidates = []
-            for candidate in all_candidates[:50]:
-                enriched = await enricher.enrich_candidate(candidate)
-                enriched_candidates.append(enriched)
-            all_candidates = enriched_candidates
-            logger.info(f"Enriched {len(all_candidates)} candidates")
+            enricher = CandidateEnricher.from_config(self.config)
+            all_candidates = await limits.within(enricher.enrich_many(all_candidates, limit=50),
+                                                 all_candidates, "enrichment")
         except Exception as e:
             logger.warning(f"Enrichment failed: {e}. Continuing without enrichment.")
         
         # Step 4: Match candidates using NLP (correct order: job, candidates)
-        matched_candidates = self.matcher.match_candidates(job_description, all_candidates)
+        # Every candidate is scored once; the fallbacks below only re-filter those scores
+        scored_candidates = await limits.within(
+            asyncio.to_thread(self.matcher.score_candidates, job_description, all_candidates), None, "matching")
+        if scored_candidates is None:
+            # Out of time: the ranking score alone orders every candidate
+            scored_candidates = ScoredCandidates(all_candidates)
+            matched_candidates = list(all_candidates)
+        else:
+            matched_candidates = scored_candidates.above(0.25)
         logger.info(f"Matched {len(matched_candidates)} candidates")
         
         # If no matches, lower the threshold and try again
         if len(matched_candidates) == 0 and len(all_candidates) > 0:
-            logger.warning("No candidates matched with threshold 0.6, trying with 0.4")
-            matched_candidates = self.matcher.match_candidates(job_description, all_candidates, threshold=0.4)
+            logger.warning("No candidates matched with threshold 0.25, trying with 0.1")
+            matched_candidates = scored_candidates.above(0.1)
             logger.info(f"Matched {len(matched_candidates)} candidates with lower threshold")
         
-        # If still no matches, use all candidates
+        # If still no matches, use all candidates (best scores first)
         if len(matched_candidates) == 0 and len(all_candidates) > 0:
             logger.warning("Still no matches, using all candidates")
-            matched_candidates = all_candidates
+            matched_candidates = scored_candidates.candidates
+        
+        if job_id:
+            matrix = JobFeatureMatrix.build(job_id, scored_candidates.candidates,
+                                            lambda c: self.ranker.score_candidate(job_description, c))
+            await asyncio.to_thread(feature_store.save, matrix)
         
-        # Step 5: Rank candidates (correct order: job, candidates)
-        ranked_candidates = self.ranker.rank_candidates(job_description, matched_candidates)
+        # Step 5: Rank candidates (correct order: job, candidates); AI reasoning is streamed below
+        ranked_candidates = self.ranker.rank_candidates(job_description, matched_candidates, reasoning=False)
         logger.info(f"Ranked {len(ranked_candidates)} candidates")
         
         # Step 6: Get top candidates and add reasoning
         top_candidates = ranked_candidates[:20]
         
+        # Publish ranked results (with score summaries) so partial reasoning is visible while it streams
+        if on_update:
+            on_update(top_candidates)
+        
         # Add LLM reasoning for top candidates
         for ranked_candidate in top_candidates[:10]:
+            if limits.expired:
+                break
+            previous = ranked_candidate.reasoning
             try:
-                reasoning = await self.llm_provider.generate_candidate_reasoning(
+                reasoning = await limits.within(self.ranker.stream_ai_reasoning(
+                    job_description,
                     ranked_candidate.candidate,
-                    job_description
-                )
-                ranked_candidate.reasoning = reasoning
+                    ranked_candidate.match_breakdown,
+                    on_partial=lambda text, rc=ranked_candidate: setattr(rc, 'reasoning', text)
+                ), None, "AI reasoning")
+                # Out of time mid-stream: keep the score summary rather than a cut-off text
+                ranked_candidate.reasoning = reasoning if reasoning is not None else previous
             except Exception as e:
                 logger.warning(f"Failed to generate reasoning: {e}")
                 ranked_candidate.reasoning = "AI reasoning unavailable"
@@ -151,82 +207,72 @@ class CandidateSourcingAgentNoSQL:
         logger.info(f"✅ Completed sourcing: {len(top_candidates)} final candidates")
         return top_candidates
     
-    async def store_scraped_candidates(self, candidates: List[Candidate]):
-        """Store ALL scraped candidates in MongoDB and Vector DB"""
-        logger.info(f"💾 Storing {len(candidates)} scraped candidates...")
+    async def _scrape(self, job_description: JobDescription, limits: SourcingLimits) -> List[Candidate]:
+        """Scrape all enabled portals concurrently until done, the quality target is met or the budget runs out"""
+        tasks = self.scraper_manager.schedule([job_description])
+        timer = None
+        if limits.deadline is not None:
+            timer = asyncio.get_running_loop().call_at(limits.deadline, self.scraper_manager.cancel_outstanding,
+                                                       tasks, "Time budget reached")
         
-        stored_count = 0
-        embedding_count = 0
+        def on_candidates(candidates: List[Candidate]):
+            for candidate in candidates:
+                total_score, _ = self.ranker.score_candidate(job_description, candidate)
+                if limits.record(total_score):
+                    self.scraper_manager.cancel_outstanding(
+                        tasks, f"Quality target met ({limits.min_candidates} candidates scoring {limits.min_score}+)")
         
-        for candidate in candidates:
-            try:
-                # Prepare candidate data
-                candidate_data = {
-                    'id': candidate.id,
-                    'name': candidate.name,
-                    'email': candidate.email,
-                    'phone': candidate.phone,
-                    'current_title': candidate.current_title,
-                    'skills': candidate.skills,
-                    'experience_years': candidate.experience_years,
-                    'education': candidate.education,
-                    'location': candidate.location,
-                    'profile_url': candidate.profile_url,
-                    'source_portal': candidate.source_portal,
-                    'summary': candidate.summary
-                }
-                
-                # Store in MongoDB (scraped collection)
-                mongo_db.insert_scraped_candidate(candidate_data)
-                stored_count += 1
-                
-                # Create embedding and store in ChromaDB (scraped collection)
-                vector_db.add_candidate(candidate_data, is_final=False)
-                embedding_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error storing scraped candidate {candidate.name}: {e}")
+        try:
+            return await self.scraper_manager.collect(tasks, on_candidates)
+        finally:
+            if timer is not None:
+                timer.cancel()
+    
+    @staticmethod
+    def _candidate_record(candidate: Candidate) -> dict:
+        """Fields persisted for a candidate in MongoDB and ChromaDB"""
+        return {
+            'id': candidate.id,
+            'name': candidate.name,
+            'email': candidate.email,
+            'phone': candidate.phone,
+            'current_title': candidate.current_title,
+            'skills': candidate.skills,
+            'experience_years': candidate.experience_years,
+            'education': candidate.education,
+            'location': candidate.location,
+            'profile_url': candidate.profile_url,
+            'source_portal': candidate.source_portal,
+            'summary': candidate.summary
+        }
+    
+    async def store_scraped_candidates(self, candidates: List[Candidate]):
+        """Queue ALL scraped candidates for MongoDB and Vector DB (bulk-written in the background)"""
+        logger.info(f"💾 Storing {len(candidates)} scraped candidates...")
+        records = [self._candidate_record(c) for c in candidates]
         
-        logger.info(f"✅ Stored {stored_count} candidates in MongoDB")
-        logger.info(f"✅ Created {embedding_count} embeddings in ChromaDB")
+        with tracer.span("persistence", collection="scraped", candidates=len(candidates)):
+            await self._store_records(records, 'scraped_candidates')
     
     async def store_final_candidates(self, ranked_candidates: List[RankedCandidate]):
-        """Store final selected candidates in MongoDB and Vector DB"""
+        """Queue final selected candidates for MongoDB and Vector DB (bulk-written in the background)"""
         logger.info(f"💾 Storing {len(ranked_candidates)} final candidates...")
+        records = [self._candidate_record(rc.candidate) for rc in ranked_candidates]
         
-        stored_count = 0
-        embedding_count = 0
-        
-        for ranked_candidate in ranked_candidates:
+        with tracer.span("persistence", collection="final", candidates=len(ranked_candidates)):
+            await self._store_records(records, 'candidates')
+    
+    async def _store_records(self, records: List[dict], collection: str):
+        """Queue records for both stores (written inline, off the event loop, if write-behind is off)"""
+        for store in ('mongo', 'chroma'):
             try:
-                candidate = ranked_candidate.candidate
-                
-                # Prepare candidate data
-                candidate_data = {
-                    'id': candidate.id,
-                    'name': candidate.name,
-                    'email': candidate.email,
-                    'phone': candidate.phone,
-                    'current_title': candidate.current_title,
-                    'skills': candidate.skills,
-                    'experience_years': candidate.experience_years,
-                    'education': candidate.education,
-                    'location': candidate.location,
-                    'profile_url': candidate.profile_url,
-                    'source_portal': candidate.source_portal,
-                    'summary': candidate.summary
-                }
-                
-                # Store in MongoDB (final candidates collection)
-                mongo_db.insert_candidate(candidate_data)
-                stored_count += 1
-                
-                # Create embedding and store in ChromaDB (final collection)
-                vector_db.add_candidate(candidate_data, is_final=True)
-                embedding_count += 1
-                
+                await asyncio.to_thread(persistence_queue.enqueue, f"{store}.{collection}", records)
             except Exception as e:
-                logger.error(f"Error storing final candidate {candidate.name}: {e}")
-        
-        logger.info(f"✅ Stored {stored_count} final candidates in MongoDB")
-        logger.info(f"✅ Created {embedding_count} final embeddings in ChromaDB")
+                logger.error(f"Error storing {collection} in {store}: {e}")
+        logger.info(f"✅ Queued {len(records)} {collection.replace('_', ' ')} for MongoDB and ChromaDB")
+    
+    @staticmethod
+    def _write_vectors(records: List[dict], is_final: bool):
+        """Queue handler for ChromaDB (raises so failed batches are retried)"""
+        if not vector_db.add_candidates_batch(records, is_final=is_final):
+            raise RuntimeError(f"ChromaDB upsert of {len(records)} candidates failed")
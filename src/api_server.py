@@ -2,7 +2,7 @@ from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from typing import List
+from typing import List, Optional
 import yaml
 import uuid
 from datetime import datetime
@@ -10,10 +10,19 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.models import JobDescription, Job, JobStatus, RankedCandidate, Candidate
+from src.models import JobDescription, Job, JobStatus, RankedCandidate, Candidate, ReusePolicy, RerankRequest
 from src.agent import CandidateSourcingAgent
 from src.nosql_db import NoSQLJobDB
-from src.hard_matcher import HardMatcher
+from src.hard_matcher import COMBINED_WEIGHTS, HardMatcher
+from src.prompt_budget import token_usage
+from src.http_client import llm_connection_stats, close_http_session, close_llm_http_client
+from src.tracing import tracer
+from src.job_cache import JobResultCache
+from src.job_similarity import SimilarJobIndex
+from src.persistence_queue import persistence_queue
+from src.feature_store import JobFeatureMatrix, feature_store
+from src.http_cache import http_cache
+from src.rate_limiter import rate_limiter
 import asyncio
 import logging
 import os
@@ -47,8 +56,26 @@ config['linkedin']['password'] = os.getenv('LINKEDIN_PASSWORD')
 
 # Initialize agent and databases
 agent = CandidateSourcingAgent(config)
+tracer.configure(config)
+job_cache = JobResultCache.from_config(config)
+job_cache_config = config.get('job_cache') or {}
+similar_jobs = SimilarJobIndex.from_config(config, agent.llm_provider.get_embedding)
 nosql_db = NoSQLJobDB()
 hard_matcher = HardMatcher()
+persistence_queue.configure(config)
+feature_store.configure(config)
+http_cache.configure(config)
+rate_limiter.configure(config)
+
+
+def _save_jobs(batch: list):
+    """Queue handler for job files (raises so failed saves are retried)"""
+    for job_data in batch:
+        if not nosql_db.save_job(Job(**job_data)):
+            raise RuntimeError(f"Could not save job {job_data['id']}")
+
+
+persistence_queue.register('jobs', _save_jobs)
 
 # In-memory storage for job status (for real-time updates)
 jobs_db = {}
@@ -57,9 +84,25 @@ jobs_db = {}
 job_poll_count = {}
 
 # API Routes - specific routes MUST come before parameterized routes
+@app.on_event("startup")
+async def start_persistence():
+    persistence_queue.start()
+
+@app.on_event("shutdown")
+async def flush_persistence():
+    """Write queued results and close the pooled HTTP clients before exiting"""
+    await asyncio.to_thread(persistence_queue.stop)
+    await close_http_session()
+    close_llm_http_client()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "persistence_queue": persistence_queue.stats(),
+        "http_cache": http_cache.stats(),
+        "rate_limits": rate_limiter.stats()
+    }
 
 @app.get("/api/candidates")
 async def get_all_candidates():
@@ -233,41 +276,91 @@ def parse_experience_from_summary(summary: str) -> list:
     
     return experiences
 
+async def save_job(job: Job):
+    """Queue a job for the NoSQL database"""
+    await asyncio.to_thread(persistence_queue.enqueue, 'jobs', [job.dict()])
+
 @app.post("/jobs", response_model=Job)
-async def create_job(job_description: JobDescription):
-    """Submit a new job description for candidate sourcing"""
+async def create_job(job_description: JobDescription, reuse: Optional[ReusePolicy] = None,
+                     refresh: bool = False):
+    """
+    Submit a new job description for candidate sourcing
+    
+    With reuse=exact (default), an identical JD that is still running is returned
+    as-is and a recently completed one returns its cached results at once.
+    reuse=similar also re-scores the scraped candidates of a near-identical recent
+    JD instead of scraping; reuse=none (or the older refresh=true) always sources
+    from scratch.
+    """
+    policy = ReusePolicy.NONE if refresh else reuse or ReusePolicy(job_cache_config.get('default_policy', 'exact'))
+    
+    if policy != ReusePolicy.NONE:
+        running_id = job_cache.running_job(job_description)
+        if running_id in jobs_db:
+            logger.info(f"Identical job {running_id} is still running, attaching to it")
+            return jobs_db[running_id]
+        
+        cached = job_cache.get(job_description)
+        if cached:
+            job = Job(
+                id=str(uuid.uuid4()),
+                description=job_description,
+                status=JobStatus.COMPLETED,
+                created_at=datetime.now(),
+                candidates=cached['candidates'],
+                reused_from=cached['job_id']
+            )
+            jobs_db[job.id] = job
+            logger.info(f"Returning cached results of job {cached['job_id']} (completed {cached['completed_at']})")
+            return job
+    
+    similar = None
+    if policy == ReusePolicy.SIMILAR:
+        similar = await asyncio.to_thread(similar_jobs.find, job_description)
+    
     job_id = str(uuid.uuid4())
     job = Job(
         id=job_id,
         description=job_description,
         status=JobStatus.PENDING,
-        created_at=datetime.now()
+        created_at=datetime.now(),
+        reused_from=similar.job_id if similar else None
     )
     jobs_db[job_id] = job
+    job_cache.mark_running(job_description, job_id)
     
     # Start sourcing in background
-    asyncio.create_task(process_job(job_id))
+    asyncio.create_task(process_job(job_id, candidate_pool=similar.candidates if similar else None))
     
     return job
 
-async def process_job(job_id: str):
-    """Background task to process job - Hard matching with balanced results"""
+async def process_job(job_id: str, candidate_pool: Optional[List[Candidate]] = None):
+    """Background task to process job - Hard matching with balanced results (re-scores candidate_pool if given)"""
+    # Attribute LLM token usage and trace spans in this task to the job
+    usage_binding = token_usage.bind_job(job_id)
+    trace = tracer.start_trace(job_id, title=jobs_db[job_id].description.title)
+    
     try:
         job = jobs_db[job_id]
         job.status = JobStatus.PROCESSING
         
         logger.info(f"Starting candidate sourcing for job {job_id}")
         
-        # PHASE 1: Scrape candidates from all portals
-        logger.info(f"Phase 1: Scraping candidates...")
-        raw_candidates = await agent.scraper_manager.scrape_all_sequential(job.description)
-        logger.info(f"Found {len(raw_candidates)} raw candidates")
+        # PHASE 1: Scrape candidates from all portals (or reuse a similar job's)
+        if candidate_pool is not None:
+            logger.info(f"Phase 1: Re-scoring {len(candidate_pool)} candidates scraped for job {job.reused_from}")
+            raw_candidates = candidate_pool
+        else:
+            logger.info(f"Phase 1: Scraping candidates...")
+            raw_candidates = await agent.scraper_manager.scrape_all_sequential(job.description)
+            logger.info(f"Found {len(raw_candidates)} raw candidates")
+            await asyncio.to_thread(similar_jobs.add, job_id, job.description, raw_candidates)
         
         if not raw_candidates:
             logger.warning("No candidates found from any portal")
             job.status = JobStatus.FAILED
             job.candidates = []
-            nosql_db.save_job(job)
+            await save_job(job)
             return
         
         # PHASE 2: Semantic search in Vector DB for additional relevant candidates
@@ -279,7 +372,9 @@ async def process_job(job_id: str):
         search_query = f"{job.description.title} {' '.join(job.description.required_skills)} {job.description.description}"
         
         # Search for similar candidates (get more than needed)
-        similar_candidates_data = vector_db.search_similar(search_query, n_results=50)
+        with tracer.span("vector_search") as span:
+            similar_candidates_data = vector_db.search_similar(search_query, n_results=50)
+            span.set_attribute("results", len(similar_candidates_data))
         
         # Convert vector DB results to Candidate objects
         from src.models import Candidate
@@ -326,28 +421,37 @@ async def process_job(job_id: str):
         
         # PHASE 3: Hard match on skills and experience (VERY LENIENT)
         logger.info(f"Phase 3: Hard matching on skills and experience...")
-        matched = hard_matcher.match_candidates(
-            job.description, 
-            all_candidates,
-            min_skill_match=0.1,  # At least 10% skills must match (very lenient)
-            min_experience_match=0.1  # At least 10% experience requirement (very lenient)
-        )
+        with tracer.span("matching", candidates=len(all_candidates)) as span:
+            matched = hard_matcher.match_candidates(
+                job.description, 
+                all_candidates,
+                min_skill_match=0.1,  # At least 10% skills must match (very lenient)
+                min_experience_match=0.1  # At least 10% experience requirement (very lenient)
+            )
+            span.set_attribute("matched", len(matched))
         logger.info(f"Matched {len(matched)} candidates")
         
+        # Keep every matched candidate's hard-matcher scores so the job can be re-ranked later
+        # (the same scores this server ranks by; rerank defaults to their combined-score weights)
+        hard_scores = {m['candidate'].id: hard_matcher.feature_breakdown(m) for m in matched}
+        matrix = JobFeatureMatrix.build(job_id, [m['candidate'] for m in matched], lambda c: hard_scores[c.id])
+        await asyncio.to_thread(feature_store.save, matrix)
+        
         if not matched:
             logger.warning("No candidates matched the requirements")
             job.candidates = []
             job.status = JobStatus.COMPLETED
-            nosql_db.save_job(job)
+            await save_job(job)
             return
         
         # PHASE 4: Balance results across sources (max 10 results)
         logger.info(f"Phase 4: Balancing results across sources...")
-        balanced = hard_matcher.balance_by_source(
-            matched,
-            max_results=10,
-            sources=['naukri', 'linkedin', 'stackoverflow', 'github']
-        )
+        with tracer.span("ranking", candidates=len(matched)):
+            balanced = hard_matcher.balance_by_source(
+                matched,
+                max_results=10,
+                sources=['naukri', 'linkedin', 'stackoverflow', 'github']
+            )
         logger.info(f"Selected {len(balanced)} balanced candidates")
         
         # Convert to RankedCandidate format
@@ -369,17 +473,26 @@ async def process_job(job_id: str):
         
         # Update job with final results
         job.candidates = ranked_candidates
+        job.token_usage = token_usage.get_job_usage(job_id)
+        job.timings = tracer.summary(trace)
         job.status = JobStatus.COMPLETED
+        job_cache.store(job.description, job_id, ranked_candidates)
         logger.info(f"Job {job_id} completed with {len(ranked_candidates)} candidates")
         
-        # Save to NoSQL database
-        nosql_db.save_job(job)
-        logger.info(f"💾 Saved job {job_id} to NoSQL database")
+        # Save to NoSQL database (written behind, off the job's critical path)
+        with tracer.span("persistence"):
+            await save_job(job)
+        logger.info(f"💾 Queued job {job_id} for the NoSQL database")
         
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {e}", exc_info=True)
         jobs_db[job_id].status = JobStatus.FAILED
-        nosql_db.save_job(jobs_db[job_id])
+        await save_job(jobs_db[job_id])
+    finally:
+        job_cache.mark_done(jobs_db[job_id].description, job_id)
+        tracer.end_trace(trace)
+        jobs_db[job_id].timings = tracer.summary(trace)
+        token_usage.unbind_job(usage_binding)
 
 @app.get("/jobs/{job_id}", response_model=Job)
 async def get_job(job_id: str):
@@ -398,6 +511,13 @@ async def get_job(job_id: str):
     
     return jobs_db[job_id]
 
+@app.get("/api/llm/usage")
+async def get_llm_usage():
+    """Get LLM token usage totals, recent calls and connection reuse"""
+    usage = token_usage.summary()
+    usage['connections'] = llm_connection_stats.summary()
+    return usage
+
 @app.get("/jobs/{job_id}/candidates", response_model=List[RankedCandidate])
 async def get_candidates(job_id: str):
     """Get ranked candidates for a job"""
@@ -410,6 +530,39 @@ async def get_candidates(job_id: str):
     
     return job.candidates
 
+@app.post("/jobs/{job_id}/rerank", response_model=List[RankedCandidate])
+async def rerank_job(job_id: str, request: RerankRequest):
+    """
+    Re-rank a finished job's candidates with new weights or filters
+    
+    Works off the job's stored feature matrix: no scraping, embedding or LLM calls.
+    Jobs here are scored by the hard matcher, so the features are its skill and
+    experience scores and the default weights reproduce its combined score.
+    """
+    matrix = await asyncio.to_thread(feature_store.get, job_id)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="No ranking features stored for this job")
+    
+    weights = {**COMBINED_WEIGHTS, **(request.weights or {})}
+    results = matrix.rerank(
+        weights,
+        top_n=request.top_n,
+        min_score=request.min_score,
+        min_experience=request.min_experience,
+        max_experience=request.max_experience,
+        locations=request.locations,
+        sources=request.sources
+    )
+    
+    # Keep reasoning already generated for candidates in the original results
+    job = jobs_db.get(job_id)
+    reasoning = {rc.candidate.id: rc.reasoning for rc in job.candidates} if job else {}
+    return [
+        RankedCandidate(candidate=candidate, match_score=score, match_breakdown=breakdown,
+                        reasoning=reasoning.get(candidate.id, ""))
+        for candidate, score, breakdown in results
+    ]
+
 # Mount static files and serve index.html
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -5,7 +5,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from typing import List
+from typing import List, Optional
 import yaml
 import uuid
 from datetime import datetime
@@ -13,10 +13,19 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.models import JobDescription, Job, JobStatus, RankedCandidate
+from src.models import JobDescription, Job, JobStatus, RankedCandidate, Candidate, ReusePolicy, RerankRequest
 from src.agent_nosql import CandidateSourcingAgentNoSQL
 from src.nosql_database import mongo_db
 from src.vector_database import vector_db
+from src.prompt_budget import token_usage
+from src.http_client import llm_connection_stats, close_http_session, close_llm_http_client
+from src.tracing import tracer
+from src.job_cache import JobResultCache
+from src.job_similarity import SimilarJobIndex
+from src.persistence_queue import persistence_queue
+from src.feature_store import feature_store
+from src.http_cache import http_cache
+from src.rate_limiter import rate_limiter
 import asyncio
 import logging
 from dotenv import load_dotenv
@@ -47,10 +56,30 @@ config['linkedin']['password'] = os.getenv('LINKEDIN_PASSWORD')
 
 # Initialize enhanced agent with NoSQL support
 agent = CandidateSourcingAgentNoSQL(config)
+tracer.configure(config)
+job_cache = JobResultCache.from_config(config)
+job_cache_config = config.get('job_cache') or {}
+similar_jobs = SimilarJobIndex.from_config(config, agent.llm_provider.get_embedding)
+persistence_queue.configure(config)
+feature_store.configure(config)
+http_cache.configure(config)
+rate_limiter.configure(config)
+persistence_queue.register('mongo.jobs', mongo_db.insert_jobs_bulk)
 
 # In-memory storage for job status
 jobs_db = {}
 
+@app.on_event("startup")
+async def start_persistence():
+    persistence_queue.start()
+
+@app.on_event("shutdown")
+async def flush_persistence():
+    """Write queued results and close the pooled HTTP clients before exiting"""
+    await asyncio.to_thread(persistence_queue.stop)
+    await close_http_session()
+    close_llm_http_client()
+
 # API Routes
 @app.get("/health")
 async def health_check():
@@ -59,7 +88,10 @@ async def health_check():
         "database": "MongoDB + ChromaDB",
         "candidates_count": len(mongo_db.get_all_candidates()),
         "jobs_count": len(mongo_db.get_all_jobs()),
-        "vector_db_count": vector_db.get_collection_count(is_final=True)
+        "vector_db_count": vector_db.get_collection_count(is_final=True),
+        "persistence_queue": persistence_queue.stats(),
+        "http_cache": http_cache.stats(),
+        "rate_limits": rate_limiter.stats()
     }
 
 @app.get("/api/candidates")
@@ -83,24 +115,65 @@ async def get_all_jobs():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/jobs", response_model=Job)
-async def create_job(job_description: JobDescription):
-    """Submit a new job description for candidate sourcing"""
+async def create_job(job_description: JobDescription, reuse: Optional[ReusePolicy] = None,
+                     refresh: bool = False):
+    """
+    Submit a new job description for candidate sourcing
+    
+    With reuse=exact (default), an identical JD that is still running is returned
+    as-is and a recently completed one returns its cached results at once.
+    reuse=similar also re-scores the scraped candidates of a near-identical recent
+    JD instead of scraping; reuse=none (or the older refresh=true) always sources
+    from scratch.
+    """
+    policy = ReusePolicy.NONE if refresh else reuse or ReusePolicy(job_cache_config.get('default_policy', 'exact'))
+    
+    if policy != ReusePolicy.NONE:
+        running_id = job_cache.running_job(job_description)
+        if running_id in jobs_db:
+            logger.info(f"Identical job {running_id} is still running, attaching to it")
+            return jobs_db[running_id]
+        
+        cached = job_cache.get(job_description)
+        if cached:
+            job = Job(
+                id=str(uuid.uuid4()),
+                description=job_description,
+                status=JobStatus.COMPLETED,
+                created_at=datetime.now(),
+                candidates=cached['candidates'],
+                reused_from=cached['job_id']
+            )
+            jobs_db[job.id] = job
+            logger.info(f"Returning cached results of job {cached['job_id']} (completed {cached['completed_at']})")
+            return job
+    
+    similar = None
+    if policy == ReusePolicy.SIMILAR:
+        similar = await asyncio.to_thread(similar_jobs.find, job_description)
+    
     job_id = str(uuid.uuid4())
     job = Job(
         id=job_id,
         description=job_description,
         status=JobStatus.PENDING,
-        created_at=datetime.now()
+        created_at=datetime.now(),
+        reused_from=similar.job_id if similar else None
     )
     jobs_db[job_id] = job
+    job_cache.mark_running(job_description, job_id)
     
     # Start sourcing in background
-    asyncio.create_task(process_job(job_id))
+    asyncio.create_task(process_job(job_id, candidate_pool=similar.candidates if similar else None))
     
     return job
 
-async def process_job(job_id: str):
-    """Background task to process job with vector search"""
+async def process_job(job_id: str, candidate_pool: Optional[List[Candidate]] = None):
+    """Background task to process job with vector search (re-scores candidate_pool if given)"""
+    # Attribute LLM token usage and trace spans in this task to the job
+    usage_binding = token_usage.bind_job(job_id)
+    trace = tracer.start_trace(job_id, title=jobs_db[job_id].description.title)
+    
     try:
         job = jobs_db[job_id]
         job.status = JobStatus.PROCESSING
@@ -112,10 +185,20 @@ async def process_job(job_id: str):
         # - Scrapes new ones if needed
         # - Stores ALL scraped candidates with embeddings
         # - Stores final candidates with embeddings
-        candidates = await agent.source_candidates(job.description)
+        # Ranked candidates are published early and their reasoning streams in while processing
+        candidates = await agent.source_candidates(
+            job.description,
+            on_update=lambda partial: setattr(job, 'candidates', partial),
+            candidate_pool=candidate_pool,
+            on_scraped=lambda scraped: asyncio.to_thread(similar_jobs.add, job_id, job.description, scraped),
+            job_id=job_id
+        )
         
         job.candidates = candidates
+        job.token_usage = token_usage.get_job_usage(job_id)
+        job.timings = tracer.summary(trace)
         job.status = JobStatus.COMPLETED
+        job_cache.store(job.description, job_id, candidates)
         logger.info(f"Job {job_id} completed with {len(candidates)} candidates")
         
         # Save job to MongoDB
@@ -127,16 +210,24 @@ async def process_job(job_id: str):
             "experience_years": job.description.experience_years,
             "location": job.description.location,
             "status": job.status.value,
-            "candidates": [c.dict() for c in candidates]
+            "candidates": [c.dict() for c in candidates],
+            "token_usage": job.token_usage,
+            "timings": job.timings
         }
-        mongo_db.insert_job(job_data)
+        with tracer.span("persistence", collection="jobs"):
+            await asyncio.to_thread(persistence_queue.enqueue, 'mongo.jobs', [job_data])
         
-        logger.info(f"✅ Job {job_id} saved to MongoDB")
-        logger.info(f"✅ All candidates stored with embeddings in ChromaDB")
+        logger.info(f"✅ Job {job_id} queued for MongoDB")
+        logger.info(f"✅ All candidates queued for storage with embeddings in ChromaDB")
         
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {e}", exc_info=True)
         jobs_db[job_id].status = JobStatus.FAILED
+    finally:
+        job_cache.mark_done(jobs_db[job_id].description, job_id)
+        tracer.end_trace(trace)
+        jobs_db[job_id].timings = tracer.summary(trace)
+        token_usage.unbind_job(usage_binding)
 
 @app.get("/jobs/{job_id}", response_model=Job)
 async def get_job(job_id: str):
@@ -145,6 +236,13 @@ async def get_job(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return jobs_db[job_id]
 
+@app.get("/api/llm/usage")
+async def get_llm_usage():
+    """Get LLM token usage totals, recent calls and connection reuse"""
+    usage = token_usage.summary()
+    usage['connections'] = llm_connection_stats.summary()
+    return usage
+
 @app.get("/jobs/{job_id}/candidates", response_model=List[RankedCandidate])
 async def get_candidates(job_id: str):
     """Get ranked candidates for a job"""
@@ -157,6 +255,37 @@ async def get_candidates(job_id: str):
     
     return job.candidates
 
+@app.post("/jobs/{job_id}/rerank", response_model=List[RankedCandidate])
+async def rerank_job(job_id: str, request: RerankRequest):
+    """
+    Re-rank a finished job's candidates with new weights or filters
+    
+    Works off the job's stored feature matrix: no scraping, embedding or LLM calls.
+    """
+    matrix = await asyncio.to_thread(feature_store.get, job_id)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="No ranking features stored for this job")
+    
+    weights = {**config['ranking']['weights'], **(request.weights or {})}
+    results = matrix.rerank(
+        weights,
+        top_n=request.top_n,
+        min_score=request.min_score,
+        min_experience=request.min_experience,
+        max_experience=request.max_experience,
+        locations=request.locations,
+        sources=request.sources
+    )
+    
+    # Keep reasoning already generated for candidates in the original results
+    job = jobs_db.get(job_id)
+    reasoning = {rc.candidate.id: rc.reasoning for rc in job.candidates} if job else {}
+    return [
+        RankedCandidate(candidate=candidate, match_score=score, match_breakdown=breakdown,
+                        reasoning=reasoning.get(candidate.id, ""))
+        for candidate, score, breakdown in results
+    ]
+
 @app.get("/api/candidate/{candidate_id}/profile")
 async def get_candidate_profile(candidate_id: str):
     """Get detailed candidate profile"""
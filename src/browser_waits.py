@@ -0,0 +1,127 @@
+"""
+Condition-based waits for Selenium flows
+Polls DOM state (elements visible, results changed, network idle) without blocking the event loop,
+and reports how long each step took against the fixed sleep it replaces
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Sequence
+
+from selenium.webdriver.common.by import By
+
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Count of resources the page has loaded so far
+_RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length"
+
+# Cheap fingerprint of a results list: card count, results-count label and first card text
+_RESULTS_SIGNATURE_SCRIPT = """
+const cards = document.querySelectorAll(arguments[0]);
+const label = document.querySelector(arguments[1]);
+return [cards.length, label ? label.textContent.trim() : '', cards.length ? cards[0].textContent.trim().slice(0, 200) : ''].join('|');
+"""
+
+
+async def wait_until(condition: Callable[[], Any], timeout: float, poll: float = 0.1) -> Any:
+    """
+    Poll `condition` until it returns something truthy or `timeout` passes.
+    
+    Returns the condition's value, or None on timeout. Errors raised by the
+    condition (stale or missing elements) count as "not yet".
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = condition()
+            if result:
+                return result
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        await asyncio.sleep(poll)
+
+
+def document_ready(driver) -> Callable[[], bool]:
+    return lambda: driver.execute_script("return document.readyState") == "complete"
+
+
+def visible_element(driver, selectors: Sequence[str]) -> Callable[[], Any]:
+    """First displayed element matching any selector (XPath if it starts with '/', else CSS)"""
+    def condition():
+        for selector in selectors:
+            by = By.XPATH if selector.startswith("/") else By.CSS_SELECTOR
+            for element in driver.find_elements(by, selector):
+                if element.is_displayed():
+                    return element
+        return None
+    return condition
+
+
+def network_idle(driver, quiet: float = 0.5) -> Callable[[], bool]:
+    """True once the page has started no new resource loads for `quiet` seconds"""
+    state = {'count': -1, 'since': time.monotonic()}
+    
+    def condition():
+        count = driver.execute_script(_RESOURCE_COUNT_SCRIPT)
+        now = time.monotonic()
+        if count != state['count']:
+            state['count'], state['since'] = count, now
+            return False
+        return now - state['since'] >= quiet
+    return condition
+
+
+def results_signature(driver, card_selector: str, count_selector: str) -> str:
+    return driver.execute_script(_RESULTS_SIGNATURE_SCRIPT, card_selector, count_selector)
+
+
+def results_changed(driver, card_selector: str, count_selector: str, before: str) -> Callable[[], bool]:
+    """True once the results list differs from the `before` signature"""
+    return lambda: results_signature(driver, card_selector, count_selector) != before
+
+
+class StepTimings:
+    """Duration of each step of a browser flow next to the fixed sleeps it used to take"""
+    
+    def __init__(self, flow: str):
+        self.flow = flow
+        self.steps: List[Dict[str, Any]] = []
+    
+    @contextmanager
+    def step(self, name: str, fixed_wait_seconds: float):
+        """Time a step (also traced as a span) that used to sleep `fixed_wait_seconds`"""
+        started = time.perf_counter()
+        with tracer.span(f"{self.flow}.{name}"):
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - started
+                self.steps.append({
+                    'step': name,
+                    'seconds': round(elapsed, 2),
+                    'fixed_wait_seconds': fixed_wait_seconds,
+                    'saved_seconds': round(fixed_wait_seconds - elapsed, 2)
+                })
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'flow': self.flow,
+            'steps': self.steps,
+            'seconds': round(sum(s['seconds'] for s in self.steps), 2),
+            'fixed_wait_seconds': sum(s['fixed_wait_seconds'] for s in self.steps),
+            'saved_seconds': round(sum(s['saved_seconds'] for s in self.steps), 2)
+        }
+    
+    def log(self):
+        report = self.report()
+        lines = [f"  {s['step']:<22} {s['seconds']:>6.2f}s (was {s['fixed_wait_seconds']:>4.1f}s of sleeps, "
+                 f"saved {s['saved_seconds']:>6.2f}s)" for s in self.steps]
+        logger.info(f"⏱️  {self.flow} timings:\n" + "\n".join(lines) +
+                    f"\n  {'total':<22} {report['seconds']:>6.2f}s (was {report['fixed_wait_seconds']:>4.1f}s, "
+                    f"saved {report['saved_seconds']:.2f}s)")
+
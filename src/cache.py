@@ -1,29 +1,42 @@
 import redis
 import json
 import os
-from typing import Optional, Any
+import time
+from typing import Optional, Any, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CacheManager:
-    """Redis cache manager for candidate data"""
+    """Redis cache manager for candidate data (falls back to an in-process cache)"""
     
-    def __init__(self):
+    def __init__(self, max_local_entries: int = 1000):
         redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        
+        # In-process fallback: key -> (expires_at, serialized value)
+        self._local: Dict[str, Tuple[float, str]] = {}
+        self.max_local_entries = max_local_entries
+        
         try:
             self.redis_client = redis.from_url(redis_url, decode_responses=True)
             self.redis_client.ping()
             self.enabled = True
             logger.info("Redis cache enabled")
         except Exception as e:
-            logger.warning(f"Redis not available: {e}. Caching disabled.")
+            logger.warning(f"Redis not available: {e}. Using in-process cache.")
             self.enabled = False
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self.enabled:
-            return None
+            entry = self._local.get(key)
+            if not entry:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                self._local.pop(key, None)
+                return None
+            return json.loads(value)
         
         try:
             value = self.redis_client.get(key)
@@ -35,6 +48,10 @@ class CacheManager:
     def set(self, key: str, value: Any, ttl: int = 3600):
         """Set value in cache with TTL"""
         if not self.enabled:
+            # Evict oldest entries once the local cache is full
+            while len(self._local) >= self.max_local_entries:
+                self._local.pop(next(iter(self._local)))
+            self._local[key] = (time.time() + ttl, json.dumps(value))
             return
         
         try:
@@ -45,6 +62,7 @@ class CacheManager:
     def delete(self, key: str):
         """Delete key from cache"""
         if not self.enabled:
+            self._local.pop(key, None)
             return
         
         try:
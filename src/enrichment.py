@@ -1,7 +1,10 @@
 import aiohttp
+import asyncio
 import os
-from typing import Optional
+from typing import List, Optional
 from src.models import Candidate
+from src.tracing import tracer
+from src.http_client import get_http_session
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,13 +12,69 @@ logger = logging.getLogger(__name__)
 class CandidateEnricher:
     """Enrich candidate data with additional information"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 10, request_timeout: float = 5.0, candidate_deadline: float = 10.0,
+                 config: Optional[dict] = None):
+        self.config = config or {}
         self.clearbit_key = os.getenv('CLEARBIT_API_KEY')
         self.hunter_key = os.getenv('HUNTER_API_KEY')
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.candidate_deadline = candidate_deadline
+        
+        # Without API keys every lookup would be a no-op
+        self.enabled = bool(self.hunter_key or self.clearbit_key)
+        
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+    
+    @classmethod
+    def from_config(cls, config: dict) -> 'CandidateEnricher':
+        """Build enricher from the `enrichment` config section"""
+        enrichment = config.get('enrichment') or {}
+        return cls(
+            max_concurrency=enrichment.get('max_concurrency', 10),
+            request_timeout=enrichment.get('request_timeout', 5.0),
+            candidate_deadline=enrichment.get('candidate_deadline', 10.0),
+            config=config
+        )
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """The process-wide pooled session (see src.http_client)"""
+        return get_http_session(self.config)
     
     async def enrich_candidate(self, candidate: Candidate) -> Candidate:
-        """Enrich candidate with email, phone, and additional data"""
+        """Enrich candidate with email, phone, and additional data (within the per-candidate deadline)"""
+        if not self.enabled:
+            return candidate
         
+        try:
+            return await asyncio.wait_for(self._enrich(candidate), timeout=self.candidate_deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"Enrichment deadline ({self.candidate_deadline}s) exceeded for {candidate.name}")
+            return candidate
+    
+    async def enrich_many(self, candidates: List[Candidate], limit: Optional[int] = None) -> List[Candidate]:
+        """
+        Enrich candidates concurrently (at most max_concurrency lookups at once).
+        
+        Only the first `limit` candidates are enriched; the rest are returned as-is.
+        """
+        if not self.enabled:
+            logger.info("No enrichment API keys configured, skipping enrichment")
+            return candidates
+        
+        to_enrich = candidates if limit is None else candidates[:limit]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def enrich_one(candidate: Candidate) -> Candidate:
+            async with semaphore:
+                return await self.enrich_candidate(candidate)
+        
+        with tracer.span("enrichment", candidates=len(to_enrich), concurrency=self.max_concurrency):
+            enriched = await asyncio.gather(*(enrich_one(c) for c in to_enrich))
+        logger.info(f"Enriched {len(enriched)} candidates")
+        return list(enriched) + candidates[len(to_enrich):]
+    
+    async def _enrich(self, candidate: Candidate) -> Candidate:
         # Try to find email if missing
         if not candidate.email and candidate.name:
             candidate.email = await self._find_email(candidate)
@@ -39,19 +98,18 @@ class CandidateEnricher:
             if not domain:
                 return None
             
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.hunter.io/v2/email-finder"
-                params = {
-                    'domain': domain,
-                    'first_name': candidate.name.split()[0] if candidate.name else '',
-                    'last_name': candidate.name.split()[-1] if candidate.name and len(candidate.name.split()) > 1 else '',
-                    'api_key': self.hunter_key
-                }
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('data', {}).get('email')
+            url = f"https://api.hunter.io/v2/email-finder"
+            params = {
+                'domain': domain,
+                'first_name': candidate.name.split()[0] if candidate.name else '',
+                'last_name': candidate.name.split()[-1] if candidate.name and len(candidate.name.split()) > 1 else '',
+                'api_key': self.hunter_key
+            }
+            
+            async with self._get_session().get(url, params=params, timeout=self._timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get('data', {}).get('email')
         
         except Exception as e:
             logger.error(f"Email finder error: {e}")
@@ -61,13 +119,12 @@ class CandidateEnricher:
     async def _enrich_with_clearbit(self, email: str) -> Optional[dict]:
         """Enrich with Clearbit Person API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://person.clearbit.com/v2/people/find?email={email}"
-                headers = {'Authorization': f'Bearer {self.clearbit_key}'}
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
+            url = f"https://person.clearbit.com/v2/people/find?email={email}"
+            headers = {'Authorization': f'Bearer {self.clearbit_key}'}
+            
+            async with self._get_session().get(url, headers=headers, timeout=self._timeout) as response:
+                if response.status == 200:
+                    return await response.json()
         
         except Exception as e:
             logger.error(f"Clearbit enrichment error: {e}")
@@ -0,0 +1,154 @@
+"""
+Offline job title and skill synonym table
+Answers job expansions without an LLM call for titles and skills we've expanded before
+"""
+import json
+import os
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a job title or skill for lookup"""
+    return " ".join(term.lower().split())
+
+
+class ExpansionSynonymTable:
+    """Versioned title/skill synonym table built from past LLM expansions"""
+    
+    def __init__(self, table_path: str = "data/job_expansions.json", min_skill_coverage: float = 0.5):
+        self.table_path = table_path
+        self.min_skill_coverage = min_skill_coverage
+        self.version = 0
+        self.titles: Dict[str, List[str]] = {}
+        self.skills: Dict[str, List[str]] = {}
+        self._load()
+    
+    def _load(self):
+        """Load the table from disk (missing table means every lookup misses)"""
+        if not os.path.exists(self.table_path):
+            logger.info(f"No expansion synonym table at {self.table_path}")
+            return
+        
+        try:
+            with open(self.table_path, 'r') as f:
+                data = json.load(f)
+            self.version = data.get('version', 0)
+            self.titles = {normalize_term(k): v for k, v in data.get('titles', {}).items()}
+            self.skills = {normalize_term(k): v for k, v in data.get('skills', {}).items()}
+            logger.info(f"Loaded expansion synonym table v{self.version}: "
+                        f"{len(self.titles)} titles, {len(self.skills)} skills")
+        except Exception as e:
+            logger.error(f"Error loading expansion synonym table: {e}")
+    
+    def lookup(self, job_title: str, skills: List[str], additional_count: int) -> Optional[Dict[str, List[str]]]:
+        """
+        Expand job title and skills from the table.
+        
+        Returns None when the title is unknown or too few skills are covered,
+        so the caller can fall back to the LLM.
+        """
+        title_variations = self.titles.get(normalize_term(job_title))
+        if not title_variations:
+            return None
+        
+        known_skills = [s for s in skills if normalize_term(s) in self.skills]
+        if skills and len(known_skills) / len(skills) < self.min_skill_coverage:
+            return None
+        
+        job_titles = list(dict.fromkeys([job_title] + title_variations))[:5]
+        
+        # Take related skills round-robin so each original skill contributes
+        expanded_skills = list(skills)
+        seen = {normalize_term(s) for s in skills}
+        related_lists = [self.skills[normalize_term(s)] for s in known_skills]
+        added = 0
+        position = 0
+        while added < additional_count and any(position < len(r) for r in related_lists):
+            for related in related_lists:
+                if added >= additional_count:
+                    break
+                if position < len(related) and normalize_term(related[position]) not in seen:
+                    expanded_skills.append(related[position])
+                    seen.add(normalize_term(related[position]))
+                    added += 1
+            position += 1
+        
+        return {
+            "job_titles": job_titles,
+            "skills": expanded_skills
+        }
+    
+    @staticmethod
+    def record_expansion(history_path: str, job_title: str, skills: List[str], result: Dict[str, List[str]]):
+        """Append an LLM expansion to the history file the table is built from"""
+        try:
+            os.makedirs(os.path.dirname(history_path) or ".", exist_ok=True)
+            with open(history_path, 'a') as f:
+                f.write(json.dumps({
+                    'timestamp': datetime.now().isoformat(),
+                    'job_title': job_title,
+                    'skills': skills,
+                    'expanded_titles': result['job_titles'],
+                    'expanded_skills': result['skills']
+                }) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not record expansion history: {e}")
+    
+    @staticmethod
+    def build(history_path: str, table_path: str, max_titles: int = 5, max_related_skills: int = 10) -> Dict:
+        """
+        Build a new table version from the expansion history.
+        
+        Titles map to the variations the LLM returned most often; each skill
+        maps to the skills most often added alongside it. Entries in the previous
+        version that the history doesn't cover are carried over.
+        """
+        title_counts: Dict[str, Counter] = defaultdict(Counter)
+        skill_counts: Dict[str, Counter] = defaultdict(Counter)
+        entries = 0
+        
+        with open(history_path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                entries += 1
+                
+                title_key = normalize_term(entry['job_title'])
+                for title in entry['expanded_titles']:
+                    if normalize_term(title) != title_key:
+                        title_counts[title_key][title] += 1
+                
+                originals = {normalize_term(s) for s in entry['skills']}
+                added = [s for s in entry['expanded_skills'] if normalize_term(s) not in originals]
+                for skill in originals:
+                    skill_counts[skill].update(added)
+        
+        previous = {}
+        if os.path.exists(table_path):
+            with open(table_path, 'r') as f:
+                previous = json.load(f)
+        
+        titles = dict(previous.get('titles', {}))
+        titles.update({k: [t for t, _ in c.most_common(max_titles)] for k, c in title_counts.items()})
+        skills = dict(previous.get('skills', {}))
+        skills.update({k: [s for s, _ in c.most_common(max_related_skills)] for k, c in skill_counts.items()})
+        
+        table = {
+            'version': previous.get('version', 0) + 1,
+            'generated_at': datetime.now().isoformat(),
+            'source_entries': entries,
+            'titles': dict(sorted(titles.items())),
+            'skills': dict(sorted(skills.items()))
+        }
+        
+        with open(table_path, 'w') as f:
+            json.dump(table, f, indent=2)
+        
+        logger.info(f"Built expansion synonym table v{table['version']} from {entries} expansions")
+        return table
@@ -0,0 +1,165 @@
+"""
+Per-job feature matrix
+Keeps every candidate's ranking features in columnar form so a job can be re-ranked without re-sourcing
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.models import Candidate
+
+logger = logging.getLogger(__name__)
+
+# Ranking features, in column order (missing values are NaN)
+FEATURES = ['skills_match', 'experience_match', 'location_match', 'education_match',
+            'availability', 'keyword_match', 'semantic_match']
+
+# Weight the ranker gives a feature missing from ranking.weights
+DEFAULT_WEIGHT = 0.1
+
+
+class JobFeatureMatrix:
+    """Ranking features of every scored candidate for one job"""
+    
+    def __init__(self, job_id: str, candidates: List[Candidate], features: np.ndarray):
+        self.job_id = job_id
+        self.candidates = candidates
+        self.features = features  # shape (candidates, len(FEATURES))
+        self.experience_years = np.array(
+            [c.experience_years if c.experience_years is not None else np.nan for c in candidates], dtype=np.float32
+        )
+        self.locations = [(c.location or "").lower() for c in candidates]
+        self.sources = np.array([(c.source_portal or "").lower() for c in candidates], dtype=str)
+    
+    @classmethod
+    def build(cls, job_id: str, candidates: List[Candidate],
+              score: Callable[[Candidate], Tuple[float, Dict[str, float]]]) -> 'JobFeatureMatrix':
+        """Build from candidates and a scorer returning (total, breakdown), e.g. CandidateRanker.score_candidate"""
+        features = np.full((len(candidates), len(FEATURES)), np.nan, dtype=np.float32)
+        for row, candidate in enumerate(candidates):
+            _, breakdown = score(candidate)
+            for col, name in enumerate(FEATURES):
+                if breakdown.get(name) is not None:
+                    features[row, col] = breakdown[name]
+        return cls(job_id, candidates, features)
+    
+    def __len__(self) -> int:
+        return len(self.candidates)
+    
+    def rerank(self, weights: Dict[str, float], top_n: int = 20, min_score: Optional[float] = None,
+               min_experience: Optional[float] = None, max_experience: Optional[float] = None,
+               locations: Optional[List[str]] = None, sources: Optional[List[str]] = None
+               ) -> List[Tuple[Candidate, float, Dict[str, float]]]:
+        """
+        Top candidates under new weights and filters.
+        
+        Scores match CandidateRanker.score_candidate: a weighted sum over the
+        features a candidate has, capped at 1.0.
+        """
+        weight_row = np.array([weights.get(name, DEFAULT_WEIGHT) for name in FEATURES], dtype=np.float32)
+        present = ~np.isnan(self.features)
+        totals = np.clip(np.where(present, self.features, 0.0) @ weight_row, 0.0, 1.0)
+        
+        keep = np.ones(len(self), dtype=bool)
+        if min_score is not None:
+            keep &= totals >= min_score
+        if min_experience is not None:
+            keep &= np.nan_to_num(self.experience_years, nan=0.0) >= min_experience
+        if max_experience is not None:
+            keep &= np.nan_to_num(self.experience_years, nan=0.0) <= max_experience
+        if sources:
+            keep &= np.isin(self.sources, [s.lower() for s in sources])
+        if locations:
+            wanted = [loc.lower() for loc in locations]
+            keep &= np.array([any(w in loc for w in wanted) for loc in self.locations], dtype=bool)
+        
+        indices = np.flatnonzero(keep)
+        # Stable sort so ties keep their original order
+        order = indices[np.argsort(-totals[indices], kind='stable')][:top_n]
+        
+        # Features are stored as float32; round so responses don't show its noise
+        results = []
+        for i in order:
+            breakdown = {name: round(float(self.features[i, col]), 4) for col, name in enumerate(FEATURES) if present[i, col]}
+            results.append((self.candidates[i], round(float(totals[i]), 4), breakdown))
+        return results
+    
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            features=self.features,
+            candidates=np.array([json.dumps([c.dict() for c in self.candidates], default=str)])
+        )
+    
+    @classmethod
+    def load(cls, job_id: str, path: str) -> 'JobFeatureMatrix':
+        with np.load(path, allow_pickle=False) as data:
+            candidates = [Candidate(**c) for c in json.loads(str(data['candidates'][0]))]
+            return cls(job_id, candidates, data['features'])
+
+
+class FeatureStore:
+    """Feature matrices per job, kept in memory and persisted as compressed .npz files"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.directory = "data/features"
+        self.max_in_memory = 50
+        self._matrices: 'OrderedDict[str, JobFeatureMatrix]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def configure(self, config: dict):
+        """Apply the `feature_store` config section"""
+        feature_store = config.get('feature_store') or {}
+        self.enabled = feature_store.get('enabled', True)
+        self.directory = feature_store.get('directory', self.directory)
+        self.max_in_memory = feature_store.get('max_in_memory', self.max_in_memory)
+    
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.npz")
+    
+    def _remember(self, matrix: JobFeatureMatrix):
+        with self._lock:
+            self._matrices.pop(matrix.job_id, None)
+            self._matrices[matrix.job_id] = matrix
+            while len(self._matrices) > self.max_in_memory:
+                self._matrices.popitem(last=False)
+    
+    def save(self, matrix: JobFeatureMatrix):
+        """Keep a job's matrix for re-ranking (blocking: writes the .npz file)"""
+        if not self.enabled:
+            return
+        self._remember(matrix)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            matrix.save(self._path(matrix.job_id))
+            logger.info(f"Stored feature matrix for job {matrix.job_id} ({len(matrix)} candidates)")
+        except Exception as e:
+            logger.warning(f"Could not persist feature matrix for job {matrix.job_id}: {e}")
+    
+    def get(self, job_id: str) -> Optional[JobFeatureMatrix]:
+        with self._lock:
+            matrix = self._matrices.get(job_id)
+            if matrix is not None:
+                self._matrices.move_to_end(job_id)
+                return matrix
+        
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            matrix = JobFeatureMatrix.load(job_id, path)
+        except Exception as e:
+            logger.error(f"Error loading feature matrix for job {job_id}: {e}")
+            return None
+        self._remember(matrix)
+        return matrix
+
+
+# Global instance
+feature_store = FeatureStore()
@@ -1,12 +1,15 @@
 """
 Hard Matcher - Strict skill and experience matching
 """
-from typing import List, Dict, Set
+from typing import Any, List, Dict, Set, Tuple
 from src.models import Candidate, JobDescription
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Weights of the combined score, keyed by the ranking feature each score is stored as
+COMBINED_WEIGHTS = {'skills_match': 0.6, 'experience_match': 0.4}
+
 class HardMatcher:
     """Hard matching based on exact skills and experience requirements"""
     
@@ -111,7 +114,7 @@ class HardMatcher:
             exp_score = self._calculate_experience_match_score(required_exp, candidate_exp)
             
             # Combined score (60% skills, 40% experience)
-            combined_score = (0.6 * skill_score) + (0.4 * exp_score)
+            combined_score = (COMBINED_WEIGHTS['skills_match'] * skill_score) + (COMBINED_WEIGHTS['experience_match'] * exp_score)
             
             # Check if meets minimum requirements
             if skill_score >= min_skill_match and exp_score >= min_experience_match:
@@ -135,6 +138,12 @@ class HardMatcher:
         
         return matched
     
+    @staticmethod
+    def feature_breakdown(match: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+        """A match's scores as (total, ranking features), so rerank with COMBINED_WEIGHTS gives combined_score"""
+        return match['combined_score'], {'skills_match': match['skill_score'],
+                                         'experience_match': match['experience_score']}
+    
     def balance_by_source(
         self, 
         matched_candidates: List[Dict], 
@@ -0,0 +1,199 @@
+"""
+On-disk HTTP cache for the API scrapers
+Stores JSON API responses with their validators and revalidates them with conditional requests
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from src.rate_limiter import RateLimitExceeded, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cache entry
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+
+class CachedResponse:
+    """Status, JSON body and headers of a (possibly cached) response"""
+    
+    def __init__(self, status: int, data: Any, headers: Dict[str, str], cache_status: str):
+        self.status = status
+        self.data = data
+        self.headers = headers
+        self.cache_status = cache_status  # 'hit', 'revalidated', 'stale', 'miss' or 'bypass'
+
+
+def _cache_control(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value or None
+    return directives
+
+
+class HTTPCache:
+    """
+    Conditional GET cache for JSON APIs (GitHub, StackExchange).
+    
+    Fresh entries (Cache-Control max-age, or fallback_max_age when a response
+    gives no freshness) are served without a request. Stale entries are
+    revalidated with If-None-Match / If-Modified-Since; a 304 reuses the stored
+    body and, on GitHub, doesn't count against the rate limit.
+    """
+    
+    def __init__(self):
+        self.enabled = True
+        self.directory = "data/http_cache"
+        self.fallback_max_age = 3600
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    def configure(self, config: dict):
+        """Apply the `http.cache` config section"""
+        cache = (config.get('http') or {}).get('cache') or {}
+        self.enabled = cache.get('enabled', True)
+        self.directory = cache.get('directory', self.directory)
+        self.fallback_max_age = cache.get('fallback_max_age', self.fallback_max_age)
+    
+    @staticmethod
+    def _key(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+        # Responses can differ per credential (e.g. private emails), so the token is part of the key
+        auth = (headers or {}).get('Authorization', '')
+        raw = json.dumps([url, sorted((params or {}).items()), hashlib.sha256(auth.encode()).hexdigest()], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+    
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable HTTP cache entry {key}: {e}")
+            return None
+    
+    def _save(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write HTTP cache entry {key}: {e}")
+    
+    def _max_age(self, headers: Dict[str, str]) -> Optional[int]:
+        """Seconds the response stays fresh, or None if it must not be stored"""
+        directives = _cache_control(headers)
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        if directives.get('max-age', '').isdigit():
+            return int(directives['max-age'])
+        return self.fallback_max_age
+    
+    def _record(self, host: str, cache_status: str):
+        with self._lock:
+            host_stats = self._stats.setdefault(host, {'hit': 0, 'revalidated': 0, 'stale': 0, 'miss': 0, 'bypass': 0})
+            host_stats[cache_status] += 1
+    
+    async def get_json(self, session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """GET a JSON resource, from the cache when fresh or still valid"""
+        host = urlparse(url).hostname or ""
+        if not self.enabled:
+            response = await self._fetch(session, url, params, headers or {})
+            self._record(host, 'bypass')
+            return response
+        
+        key = self._key(url, params, headers)
+        entry = await asyncio.to_thread(self._load, key)
+        now = time.time()
+        
+        if entry and now < entry['stored_at'] + entry['max_age']:
+            self._record(host, 'hit')
+            return CachedResponse(entry['status'], entry['data'], entry['headers'], 'hit')
+        
+        request_headers = dict(headers or {})
+        if entry:
+            if entry['headers'].get('ETag'):
+                request_headers['If-None-Match'] = entry['headers']['ETag']
+            if entry['headers'].get('Last-Modified'):
+                request_headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        
+        try:
+            response = await self._fetch(session, url, params, request_headers)
+        except RateLimitExceeded:
+            if not entry:
+                raise
+            # Better a stale answer now than none until the quota resets
+            logger.info(f"Serving stale cached response for {url}: host is rate limited")
+            self._record(host, 'stale')
+            return CachedResponse(entry['status'], entry['data'], entry['headers'], 'stale')
+        
+        if response.status == 304 and entry:
+            # Still valid: keep the stored body, refresh freshness from the new headers
+            merged_headers = {**entry['headers'], **response.headers}
+            max_age = self._max_age(merged_headers)
+            entry.update(stored_at=now, max_age=max_age or 0,
+                         headers={k: v for k, v in merged_headers.items() if k in CACHED_HEADERS})
+            await asyncio.to_thread(self._save, key, entry)
+            self._record(host, 'revalidated')
+            return CachedResponse(entry['status'], entry['data'], merged_headers, 'revalidated')
+        
+        self._record(host, 'miss')
+        if response.status == 200:
+            max_age = self._max_age(response.headers)
+            if max_age is not None:
+                await asyncio.to_thread(self._save, key, {
+                    'url': url,
+                    'status': response.status,
+                    'headers': {k: v for k, v in response.headers.items() if k in CACHED_HEADERS},
+                    'data': response.data,
+                    'stored_at': now,
+                    'max_age': max_age
+                })
+        return response
+    
+    @staticmethod
+    async def _fetch(session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]],
+                     headers: Dict[str, str]) -> CachedResponse:
+        # Only requests that reach the network count against the host's rate limit
+        await rate_limiter.acquire(url)
+        async with session.get(url, params=params, headers=headers) as response:
+            kept = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+            # Rate-limit headers are passed through for the caller but never cached
+            passthrough = {name: value for name, value in response.headers.items()
+                           if name.lower().startswith('x-ratelimit') or name.lower() == 'retry-after'}
+            data = await response.json() if response.status == 200 else None
+            rate_limiter.update(url, response.status, dict(response.headers), data if isinstance(data, dict) else None)
+            return CachedResponse(response.status, data, {**passthrough, **kept}, 'miss')
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates per host; revalidated (304) and stale (served while rate limited) responses count as hits"""
+        with self._lock:
+            hosts = {}
+            for host, counts in self._stats.items():
+                total = sum(counts.values())
+                hits = counts['hit'] + counts['revalidated'] + counts['stale']
+                hosts[host] = {**counts, 'hit_rate': round(hits / total, 3) if total else 0.0}
+        return {'enabled': self.enabled, 'hosts': hosts}
+
+
+# Global instance
+http_cache = HTTPCache()
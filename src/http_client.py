@@ -0,0 +1,212 @@
+"""
+Process-wide pooled HTTP clients
+Shares keep-alive connections across every LLMProvider instance in the process,
+and across scrapers and enrichment for their API calls
+"""
+import asyncio
+import importlib.util
+import logging
+import ssl
+import threading
+from typing import Dict, Optional
+
+import aiohttp
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_llm_client: Optional[httpx.Client] = None
+_llm_client_lock = threading.Lock()
+
+# aiohttp sessions are bound to an event loop, so there is one per loop
+_http_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+# Per-loop task that closes the loop's session while the loop winds down
+_session_closers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+
+class ConnectionStats:
+    """Counts requests served on new versus reused pooled connections"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.tls_handshakes = 0
+    
+    def record(self, opened: bool, tls_handshake: bool):
+        with self._lock:
+            self.requests += 1
+            if opened:
+                self.connections_opened += 1
+            else:
+                self.connections_reused += 1
+            if tls_handshake:
+                self.tls_handshakes += 1
+    
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'connections_reused': self.connections_reused,
+                'tls_handshakes': self.tls_handshakes,
+                'reuse_rate': self.connections_reused / self.requests if self.requests else 0.0
+            }
+
+
+llm_connection_stats = ConnectionStats()
+
+
+def _trace_request(request: httpx.Request):
+    """Attach an httpcore trace callback that notes whether a new connection was opened"""
+    state = {'opened': False, 'tls': False}
+    
+    def trace(event_name: str, info: dict):
+        if event_name == 'connection.connect_tcp.complete':
+            state['opened'] = True
+        elif event_name == 'connection.start_tls.complete':
+            state['tls'] = True
+    
+    request.extensions['trace'] = trace
+    request.extensions['connection_state'] = state
+
+
+def _record_response(response: httpx.Response):
+    state = response.request.extensions.get('connection_state')
+    if state is not None:
+        llm_connection_stats.record(opened=state['opened'], tls_handshake=state['tls'])
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])"""
+    return importlib.util.find_spec('h2') is not None
+
+
+def get_llm_http_client(config: dict) -> httpx.Client:
+    """
+    Get the shared HTTP client used by all LLM SDK clients.
+    
+    Created once per process from the `llm.http` config section; later calls
+    return the same client so Groq/OpenAI requests reuse warm connections.
+    """
+    global _llm_client
+    
+    with _llm_client_lock:
+        if _llm_client is not None and not _llm_client.is_closed:
+            return _llm_client
+        
+        http_config = config.get('llm', {}).get('http') or {}
+        use_http2 = http_config.get('http2', True) and _http2_available()
+        
+        _llm_client = httpx.Client(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=http_config.get('max_connections', 20),
+                max_keepalive_connections=http_config.get('max_keepalive_connections', 10),
+                keepalive_expiry=http_config.get('keepalive_expiry', 60)
+            ),
+            timeout=httpx.Timeout(
+                connect=http_config.get('connect_timeout', 5),
+                read=http_config.get('read_timeout', 60),
+                write=http_config.get('write_timeout', 10),
+                pool=http_config.get('pool_timeout', 10)
+            ),
+            event_hooks={'request': [_trace_request], 'response': [_record_response]}
+        )
+        logger.info(f"Shared LLM HTTP client created (http2={use_http2}, "
+                    f"max_connections={http_config.get('max_connections', 20)})")
+        return _llm_client
+
+
+def close_llm_http_client():
+    """Close the shared LLM HTTP client (on shutdown)"""
+    global _llm_client
+    
+    with _llm_client_lock:
+        if _llm_client is not None:
+            _llm_client.close()
+            _llm_client = None
+
+
+def _ssl_context(http_config: dict):
+    """Verified TLS, using certifi's CA bundle when installed; verify_ssl: false is for local debugging only"""
+    if not http_config.get('verify_ssl', True):
+        logger.warning("TLS certificate verification is disabled for scraper/enrichment HTTP requests")
+        return False
+    
+    ca_bundle = http_config.get('ca_bundle')
+    if not ca_bundle and importlib.util.find_spec('certifi') is not None:
+        import certifi
+        ca_bundle = certifi.where()
+    return ssl.create_default_context(cafile=ca_bundle)
+
+
+def get_http_session(config: dict) -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session for the running event loop.
+    
+    Created on first use from the `http` config section (per-host connection
+    limits, DNS cache, timeouts, verified TLS); scrapers and enrichment borrow
+    it instead of opening their own, so keep-alive connections are reused.
+    Callers must not close it: it is closed by close_http_session(), or when
+    asyncio.run() cancels the loop's leftover tasks before closing it.
+    """
+    loop = asyncio.get_running_loop()
+    
+    # Forget sessions whose loops closed without cancelling their tasks (e.g. a bare
+    # loop.close()); their connections can't be closed without the loop
+    for stale in [l for l in _http_sessions if l.is_closed()]:
+        session = _http_sessions.pop(stale)
+        _session_closers.pop(stale, None)
+        if not session.closed:
+            logger.warning("An event loop was closed without closing its shared HTTP session; "
+                           "call close_http_session() before closing the loop")
+    
+    session = _http_sessions.get(loop)
+    if session is not None and not session.closed:
+        return session
+    
+    http_config = config.get('http') or {}
+    connector = aiohttp.TCPConnector(
+        limit=http_config.get('max_connections', 100),
+        limit_per_host=http_config.get('max_connections_per_host', 10),
+        ttl_dns_cache=http_config.get('dns_cache_ttl', 300),
+        keepalive_timeout=http_config.get('keepalive_timeout', 30),
+        ssl=_ssl_context(http_config)
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=http_config.get('total_timeout', 60),
+            connect=http_config.get('connect_timeout', 10),
+            sock_read=http_config.get('read_timeout', 30)
+        ),
+        headers={'User-Agent': http_config.get('user_agent', 'ai-sourcing-agent')}
+    )
+    _http_sessions[loop] = session
+    _session_closers[loop] = loop.create_task(_close_on_loop_exit(session))
+    logger.info(f"Shared HTTP session created (max_connections_per_host="
+                f"{http_config.get('max_connections_per_host', 10)})")
+    return session
+
+
+async def _close_on_loop_exit(session: aiohttp.ClientSession):
+    """Wait until cancelled (asyncio.run() cancels leftover tasks before closing its loop), then close the session"""
+    try:
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        await session.close()
+        raise
+
+
+async def close_http_session():
+    """Close the running loop's shared aiohttp session (on shutdown)"""
+    loop = asyncio.get_running_loop()
+    closer = _session_closers.pop(loop, None)
+    session = _http_sessions.pop(loop, None)
+    if closer is not None:
+        closer.cancel()
+        await asyncio.gather(closer, return_exceptions=True)
+    if session is not None and not session.closed:
+        await session.close()
@@ -0,0 +1,104 @@
+"""
+Job result memoization
+Reuses ranked results for job descriptions that were sourced recently
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.cache import CacheManager
+from src.expansion_table import normalize_term
+from src.models import JobDescription, RankedCandidate
+
+logger = logging.getLogger(__name__)
+
+# Bump when the canonical form or stored result format changes
+KEY_VERSION = 2
+
+
+def canonical_job_key(job_description: JobDescription) -> str:
+    """
+    Hash of a job description that ignores case, whitespace and skill order.
+    
+    Two submissions of the same JD (UI resubmits, retries, Celery reruns)
+    map to the same key. The quality target and time budget are part of it,
+    since a run they cut short must not answer one with a larger budget.
+    """
+    canonical = {
+        'title': normalize_term(job_description.title),
+        'description': normalize_term(job_description.description),
+        'skills': sorted({normalize_term(s) for s in job_description.required_skills}),
+        'experience_years': job_description.experience_years,
+        'location': normalize_term(job_description.location or ""),
+        'salary_range': sorted((job_description.salary_range or {}).items()),
+        'quality_target': job_description.quality_target.dict() if job_description.quality_target else None,
+        'time_budget_seconds': job_description.time_budget_seconds
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+class JobResultCache:
+    """Ranked results per canonical JD, plus markers for identical jobs still running"""
+    
+    def __init__(self, cache: Optional[CacheManager] = None, ttl_seconds: int = 6 * 3600,
+                 running_ttl_seconds: int = 3600, enabled: bool = True):
+        self.cache = cache or CacheManager()
+        self.ttl_seconds = ttl_seconds
+        self.running_ttl_seconds = running_ttl_seconds
+        self.enabled = enabled
+    
+    @classmethod
+    def from_config(cls, config: dict, cache: Optional[CacheManager] = None) -> 'JobResultCache':
+        """Build cache from the `job_cache` config section"""
+        job_cache = config.get('job_cache') or {}
+        return cls(
+            cache=cache,
+            ttl_seconds=job_cache.get('ttl_seconds', 6 * 3600),
+            running_ttl_seconds=job_cache.get('running_ttl_seconds', 3600),
+            enabled=job_cache.get('enabled', True)
+        )
+    
+    @staticmethod
+    def _result_key(job_description: JobDescription) -> str:
+        return f"job_result:v{KEY_VERSION}:{canonical_job_key(job_description)}"
+    
+    @staticmethod
+    def _running_key(job_description: JobDescription) -> str:
+        return f"job_running:v{KEY_VERSION}:{canonical_job_key(job_description)}"
+    
+    def get(self, job_description: JobDescription) -> Optional[Dict[str, Any]]:
+        """Cached result ({'job_id', 'completed_at', 'candidates'}) if still fresh"""
+        if not self.enabled:
+            return None
+        return self.cache.get(self._result_key(job_description))
+    
+    def store(self, job_description: JobDescription, job_id: str, candidates: List[RankedCandidate]):
+        """Cache a completed job's ranked candidates (empty results are not cached)"""
+        if not self.enabled or not candidates:
+            return
+        self.cache.set(self._result_key(job_description), {
+            'job_id': job_id,
+            'completed_at': datetime.now().isoformat(),
+            'candidates': [c.dict() for c in candidates]
+        }, ttl=self.ttl_seconds)
+        logger.info(f"Cached {len(candidates)} ranked candidates for job {job_id}")
+    
+    def invalidate(self, job_description: JobDescription):
+        self.cache.delete(self._result_key(job_description))
+    
+    def running_job(self, job_description: JobDescription) -> Optional[str]:
+        """ID of an identical job that is still running, if any"""
+        if not self.enabled:
+            return None
+        return self.cache.get(self._running_key(job_description))
+    
+    def mark_running(self, job_description: JobDescription, job_id: str):
+        if self.enabled:
+            self.cache.set(self._running_key(job_description), job_id, ttl=self.running_ttl_seconds)
+    
+    def mark_done(self, job_description: JobDescription, job_id: str):
+        """Clear the running marker if it still belongs to this job"""
+        if self.enabled and self.running_job(job_description) == job_id:
+            self.cache.delete(self._running_key(job_description))
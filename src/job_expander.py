@@ -1,21 +1,45 @@
 """Job Title and Skills Expander using LLM"""
 
 import json
+import hashlib
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.llm_provider import LLMProvider
+from src.cache import CacheManager
+from src.expansion_table import ExpansionSynonymTable, normalize_term
+from src.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 class JobExpander:
     """Expands job titles and skills using LLM in a single call"""
     
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(self, llm_provider: LLMProvider, cache: Optional[CacheManager] = None):
         self.llm_provider = llm_provider
+        
+        expansion_config = llm_provider.config.get('job_expansion') or {}
+        self.cache_ttl = expansion_config.get('cache_ttl_seconds', 7 * 24 * 3600)
+        self.history_path = expansion_config.get('history_file', 'data/expansion_history.jsonl')
+        self.cache = cache or CacheManager()
+        self.synonym_table = ExpansionSynonymTable(
+            table_path=expansion_config.get('synonym_table', 'data/job_expansions.json'),
+            min_skill_coverage=expansion_config.get('min_skill_coverage', 0.5)
+        )
+        
+        # Which layer answered each expansion
+        self.stats = {'cache_hits': 0, 'table_hits': 0, 'llm_calls': 0}
+    
+    def _cache_key(self, job_title: str, skills: List[str]) -> str:
+        """Cache key from normalized title and sorted skills (scoped to the table version)"""
+        normalized_skills = sorted({normalize_term(s) for s in skills})
+        digest = hashlib.sha1(json.dumps([normalize_term(job_title), normalized_skills]).encode()).hexdigest()
+        return f"job_expansion:v{self.synonym_table.version}:{digest}"
     
     def expand_job_data(self, job_title: str, skills: List[str]) -> Dict[str, List[str]]:
         """
-        Expand job title and skills in a single LLM call.
+        Expand job title and skills, using the LLM only for new combinations.
+        
+        Lookup order: expansion cache, offline synonym table, then a single LLM call.
         
         Args:
             job_title: Original job title (e.g., "Python Developer")
@@ -33,6 +57,28 @@ class JobExpander:
         # Use 27.5% as the midpoint, but ensure at least 2 skills are added
         additional_skills_count = max(2, int(len(skills) * 0.275))
         
+        # 1. Cached expansion for this title and skill set
+        cache_key = self._cache_key(job_title, skills)
+        cached = self.cache.get(cache_key)
+        if cached:
+            self.stats['cache_hits'] += 1
+            tracer.set_attribute('expansion_source', 'cache')
+            logger.info(f"✓ Expansion cache hit ({len(cached['job_titles'])} titles, {len(cached['skills'])} skills)")
+            return cached
+        
+        # 2. Offline synonym table
+        table_result = self.synonym_table.lookup(job_title, skills, additional_skills_count)
+        if table_result:
+            self.stats['table_hits'] += 1
+            tracer.set_attribute('expansion_source', 'table')
+            logger.info(f"✓ Expanded from synonym table v{self.synonym_table.version} without LLM")
+            self.cache.set(cache_key, table_result, ttl=self.cache_ttl)
+            return table_result
+        
+        # 3. LLM expansion for a new combination
+        self.stats['llm_calls'] += 1
+        tracer.set_attribute('expansion_source', 'llm')
+        
         # Build prompt for single LLM call
         prompt = self._build_expansion_prompt(job_title, skills, additional_skills_count)
         
@@ -52,7 +98,8 @@ class JobExpander:
             response = self.llm_provider.chat_completion(
                 messages=messages,
                 max_tokens=1000,
-                temperature=0.5
+                temperature=0.5,
+                purpose="job_expansion"
             )
             
             # Parse JSON response
@@ -61,6 +108,11 @@ class JobExpander:
             logger.info(f"✓ Expanded to {len(result['job_titles'])} job titles")
             logger.info(f"✓ Expanded to {len(result['skills'])} total skills (+{len(result['skills']) - len(skills)} new)")
             
+            # Only keep real expansions, not the fallback to the original data
+            if result['job_titles'] != [job_title] or result['skills'] != skills:
+                self.cache.set(cache_key, result, ttl=self.cache_ttl)
+                ExpansionSynonymTable.record_expansion(self.history_path, job_title, skills, result)
+            
             return result
             
         except Exception as e:
@@ -73,7 +125,8 @@ class JobExpander:
     
     def _build_expansion_prompt(self, job_title: str, skills: List[str], additional_count: int) -> str:
         """Build the prompt for LLM expansion"""
-        skills_str = ", ".join(skills)
+        # Trim long skill lists to the prompt budget; originals are re-added when parsing
+        skills_str = self.llm_provider.prompt_budgeter.fit_list(skills)
         
         prompt = f"""Given the job title "{job_title}" and skills list, expand both in a single response.
 
@@ -0,0 +1,107 @@
+"""
+Near-duplicate job detection
+Finds a recent job with a semantically similar JD so its scraped candidate pool can be re-scored
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.models import Candidate, JobDescription
+
+logger = logging.getLogger(__name__)
+
+
+class SimilarJob:
+    """A recent job whose JD is similar to the one being submitted"""
+    
+    def __init__(self, job_id: str, similarity: float, candidates: List[Candidate]):
+        self.job_id = job_id
+        self.similarity = similarity
+        self.candidates = candidates
+
+
+class SimilarJobIndex:
+    """In-process index of recent JD embeddings and the candidates scraped for them"""
+    
+    def __init__(self, embed: Callable[[str], List[float]], threshold: float = 0.92,
+                 max_entries: int = 200, ttl_seconds: int = 24 * 3600):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # job_id -> (added_at, normalized embedding, candidate dicts)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: dict, embed: Callable[[str], List[float]]) -> 'SimilarJobIndex':
+        """Build index from the `job_cache.similar` config section"""
+        similar = (config.get('job_cache') or {}).get('similar') or {}
+        return cls(
+            embed=embed,
+            threshold=similar.get('threshold', 0.92),
+            max_entries=similar.get('max_entries', 200),
+            ttl_seconds=similar.get('ttl_seconds', 24 * 3600)
+        )
+    
+    @staticmethod
+    def job_text(job_description: JobDescription) -> str:
+        """Text embedded for a JD (same fields the matcher uses)"""
+        return " | ".join([
+            f"Title: {job_description.title}",
+            f"Description: {job_description.description}",
+            f"Required Skills: {', '.join(job_description.required_skills)}",
+            f"Experience: {job_description.experience_years or 0} years",
+            f"Location: {job_description.location or 'Any'}"
+        ])
+    
+    def _embed(self, job_description: JobDescription) -> np.ndarray:
+        vector = np.asarray(self.embed(self.job_text(job_description)), dtype=float)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def add(self, job_id: str, job_description: JobDescription, candidates: List[Candidate]):
+        """Remember a job's scraped candidate pool (blocking: computes an embedding)"""
+        if not candidates:
+            return
+        try:
+            embedding = self._embed(job_description)
+        except Exception as e:
+            logger.warning(f"Could not index job {job_id} for reuse: {e}")
+            return
+        with self._lock:
+            self._entries.pop(job_id, None)
+            self._entries[job_id] = (time.time(), embedding, [c.dict() for c in candidates])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"Indexed job {job_id} with {len(candidates)} scraped candidates for reuse")
+    
+    def find(self, job_description: JobDescription) -> Optional[SimilarJob]:
+        """Most similar recent job above the threshold (blocking: computes an embedding)"""
+        try:
+            embedding = self._embed(job_description)
+        except Exception as e:
+            logger.warning(f"Could not look up similar jobs: {e}")
+            return None
+        cutoff = time.time() - self.ttl_seconds
+        
+        best_id, best_score, best_pool = None, self.threshold, None
+        with self._lock:
+            for job_id in [j for j, entry in self._entries.items() if entry[0] < cutoff]:
+                del self._entries[job_id]
+            
+            for job_id, (_, other, pool) in self._entries.items():
+                score = float(np.dot(embedding, other))
+                if score >= best_score:
+                    best_id, best_score, best_pool = job_id, score, pool
+        
+        if best_id is None:
+            return None
+        
+        logger.info(f"JD is {best_score:.3f} similar to job {best_id}, reusing its {len(best_pool)} candidates")
+        # Fresh copies so re-scoring doesn't touch the indexed pool
+        return SimilarJob(best_id, best_score, [Candidate(**c) for c in best_pool])
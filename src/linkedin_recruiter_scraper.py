@@ -2,15 +2,17 @@
 LinkedIn Recruiter Lite Scraper
 Uses the advanced search with filters for better results
 """
-import asyncio
 import time
-from typing import List
+from typing import List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 import undetected_chromedriver as uc
 from src.models import Candidate, JobDescription
+from src.page_snapshot import all_texts, first_link, first_text, snapshot_cards
+from src.browser_waits import (StepTimings, document_ready, network_idle, results_changed, results_signature,
+                               visible_element, wait_until)
 import logging
 import hashlib
 
@@ -20,11 +22,35 @@ logger = logging.getLogger(__name__)
 class LinkedInRecruiterScraper:
     """Scraper for LinkedIn Recruiter Lite with advanced filters"""
     
+    # Result cards, in the order they are tried
+    CARD_SELECTORS = [
+        "article.profile-list-item",  # LinkedIn Recruiter Lite profile cards
+        "li.artdeco-list__item",
+        "[data-test-search-result]",
+        ".search-results__result-item",
+        "div.entity-result",
+        "li[class*='search-result']"
+    ]
+    CARD_SELECTOR = ", ".join(CARD_SELECTORS)
+    COUNT_SELECTOR = "[data-test-search-results-count], [class*='results-count'], [class*='search-results__total']"
+    SEARCH_BOX_SELECTOR = "input[placeholder*='search']"
+    FACET_BUTTON_SELECTOR = "button[class*='facet-edit-button']"
+    TYPEAHEAD_SELECTORS = ["[role='listbox'] [role='option']", ".artdeco-typeahead__result", "li[class*='typeahead']"]
+    
+    # Wait timeouts in seconds (waits end as soon as their condition holds)
+    PAGE_TIMEOUT = 15
+    IDLE_TIMEOUT = 3
+    ELEMENT_TIMEOUT = 3
+    FILTER_TIMEOUT = 8
+    RESULTS_TIMEOUT = 20
+    SCROLL_TIMEOUT = 2
+    
     def __init__(self, config: dict):
         self.config = config
         self.portal_name = "linkedin"  # Add portal_name for compatibility
         self.driver = None
         self.is_logged_in = False
+        self.timings = StepTimings("linkedin_recruiter")
     
     def _get_driver(self, use_profile: bool = True):
         """Create Chrome driver with saved profile"""
@@ -49,20 +75,21 @@ class LinkedInRecruiterScraper:
     async def scrape(self, job_description: JobDescription, max_candidates: int = 20) -> List[Candidate]:
         """Scrape using LinkedIn Recruiter Lite advanced search"""
         candidates = []
+        self.timings = StepTimings("linkedin_recruiter")
         
         try:
             self.driver = self._get_driver(use_profile=True)
             
             # Check if logged in
             logger.info("Checking LinkedIn login status...")
-            self.driver.get("https://www.linkedin.com/talent/home")
-            await asyncio.sleep(3)
+            with self.timings.step("open_recruiter", 3):
+                await self._load("https://www.linkedin.com/talent/home")
             
             # If not on talent page, try to login or navigate
             if "talent" not in self.driver.current_url:
                 logger.info("Not on Recruiter Lite, checking regular LinkedIn...")
-                self.driver.get("https://www.linkedin.com/feed")
-                await asyncio.sleep(2)
+                with self.timings.step("open_feed", 2):
+                    await self._load("https://www.linkedin.com/feed")
                 
                 if "feed" not in self.driver.current_url:
                     logger.error("Not logged in to LinkedIn. Please run: python setup_linkedin_cookies.py")
@@ -70,8 +97,8 @@ class LinkedInRecruiterScraper:
                 
                 # Navigate to Recruiter Lite
                 logger.info("Navigating to Recruiter Lite...")
-                self.driver.get("https://www.linkedin.com/talent/home")
-                await asyncio.sleep(3)
+                with self.timings.step("open_recruiter_retry", 3):
+                    await self._load("https://www.linkedin.com/talent/home")
             
             logger.info("✅ On LinkedIn Recruiter Lite")
             
@@ -79,112 +106,139 @@ class LinkedInRecruiterScraper:
             logger.info("Starting advanced search...")
             
             # Navigate directly to advanced search
-            self.driver.get("https://www.linkedin.com/talent/search?start=0&uiOrigin=GLOBAL_SEARCH_HEADER")
-            await asyncio.sleep(3)
+            with self.timings.step("open_search", 3):
+                await self._load("https://www.linkedin.com/talent/search?start=0&uiOrigin=GLOBAL_SEARCH_HEADER")
+                await wait_until(visible_element(self.driver, [self.SEARCH_BOX_SELECTOR, self.FACET_BUTTON_SELECTOR]),
+                                 self.ELEMENT_TIMEOUT)
             
             logger.info("✅ On advanced search page")
             
             # Try to use the main search box first (simpler approach)
-            try:
-                logger.info("Trying main search box...")
-                search_box = self.driver.find_element(By.CSS_SELECTOR, "input[placeholder*='search']")
-                search_query = f"{job_description.title} {' '.join(job_description.required_skills[:3])}"
-                search_box.send_keys(search_query)
-                search_box.send_keys(Keys.RETURN)
-                await asyncio.sleep(5)
-                logger.info("✓ Search via main search box")
-            except:
-                logger.info("Main search box not found, using filters...")
+            with self.timings.step("main_search", 5):
+                try:
+                    logger.info("Trying main search box...")
+                    search_box = self.driver.find_element(By.CSS_SELECTOR, self.SEARCH_BOX_SELECTOR)
+                    search_query = f"{job_description.title} {' '.join(job_description.required_skills[:3])}"
+                    before = self._signature()
+                    search_box.send_keys(search_query)
+                    search_box.send_keys(Keys.RETURN)
+                    await self._wait_for_results_update(before, timeout=self.RESULTS_TIMEOUT)
+                    logger.info("✓ Search via main search box")
+                except:
+                    logger.info("Main search box not found, using filters...")
             
-            # Add filters one by one
+            # Add filters one by one (each waits for the results to refresh)
             logger.info("Adding search filters...")
             
             # Add Job Title filter
-            await self._add_job_title_filter(job_description.title)
-            await asyncio.sleep(2)
+            with self.timings.step("title_filter", 5):
+                await self._add_job_title_filter(job_description.title)
             
             # Add Skills filter
             if job_description.required_skills:
-                await self._add_skills_filter(job_description.required_skills)
-                await asyncio.sleep(2)
+                with self.timings.step("skills_filter", 3 + len(job_description.required_skills[:5])):
+                    await self._add_skills_filter(job_description.required_skills)
             
             # Add Location filter
             if job_description.location:
-                await self._add_location_filter(job_description.location)
-                await asyncio.sleep(2)
+                with self.timings.step("location_filter", 6.5):
+                    await self._add_location_filter(job_description.location)
             
             # Add Experience filter
             if job_description.experience_years:
-                await self._add_experience_filter(job_description.experience_years)
-                await asyncio.sleep(2)
+                with self.timings.step("experience_filter", 4):
+                    await self._add_experience_filter(job_description.experience_years)
             
             logger.info("✅ All filters added")
             
-            # Click Search button (or wait for auto-search)
-            await self._click_search()
-            
-            # Wait for results to load
-            logger.info("Waiting for search results...")
-            await asyncio.sleep(8)
+            # Click Search button (or wait for auto-search), then wait for result cards
+            with self.timings.step("search_results", 8):
+                before = self._signature()
+                if await self._click_search():
+                    await wait_until(results_changed(self.driver, self.CARD_SELECTOR, self.COUNT_SELECTOR, before),
+                                     self.FILTER_TIMEOUT)
+                logger.info("Waiting for search results...")
+                await wait_until(lambda: self.driver.find_elements(By.CSS_SELECTOR, self.CARD_SELECTOR),
+                                 self.RESULTS_TIMEOUT)
+                await wait_until(network_idle(self.driver), self.IDLE_TIMEOUT)
             
             # Extract candidates from results
-            candidates = await self._extract_candidates(max_candidates)
+            with self.timings.step("extract", 9):
+                candidates = await self._extract_candidates(max_candidates)
             
             logger.info(f"✅ Scraped {len(candidates)} candidates from LinkedIn Recruiter")
             
         except Exception as e:
             logger.error(f"Error in LinkedIn Recruiter scraping: {e}", exc_info=True)
         finally:
+            self.timings.log()
             if self.driver:
                 self.driver.quit()
         
         return candidates
     
+    async def _load(self, url: str):
+        """Open a page and wait until it and its follow-up requests (redirects, XHR) have settled"""
+        self.driver.get(url)
+        await wait_until(document_ready(self.driver), self.PAGE_TIMEOUT)
+        await wait_until(network_idle(self.driver), self.IDLE_TIMEOUT)
+    
+    def _signature(self) -> str:
+        try:
+            return results_signature(self.driver, self.CARD_SELECTOR, self.COUNT_SELECTOR)
+        except Exception:
+            return ""
+    
+    async def _wait_for_results_update(self, before: str, timeout: Optional[float] = None) -> bool:
+        """Wait for the results list to change after a filter, then for its requests to finish"""
+        changed = await wait_until(results_changed(self.driver, self.CARD_SELECTOR, self.COUNT_SELECTOR, before),
+                                   timeout or self.FILTER_TIMEOUT)
+        await wait_until(network_idle(self.driver), self.IDLE_TIMEOUT)
+        return bool(changed)
+    
+    async def _open_facet(self, button_texts: List[str], input_selectors: List[str]):
+        """Click a filter's edit button and wait for its input to show; returns the input or None"""
+        for text in button_texts:
+            try:
+                add_button = self.driver.find_element(
+                    By.XPATH, 
+                    f"//button[contains(@class, 'facet-edit-button')]//span[contains(text(), '{text}')]/.."
+                )
+                add_button.click()
+                break
+            except:
+                continue
+        return await wait_until(visible_element(self.driver, input_selectors), self.ELEMENT_TIMEOUT)
+    
+    async def _wait_for_suggestions(self):
+        """Wait for the typeahead dropdown of a filter input"""
+        await wait_until(visible_element(self.driver, self.TYPEAHEAD_SELECTORS), self.ELEMENT_TIMEOUT)
+    
     async def _add_job_title_filter(self, title: str):
         """Add job title filter"""
         try:
             logger.info(f"Adding job title filter: {title}")
             
-            # Click the facet edit button for job titles
-            button_texts = [
-                "Job titles or boolean",
-                "Add a Job title",
-                "Job titles"
-            ]
-            
-            for text in button_texts:
-                try:
-                    add_button = self.driver.find_element(
-                        By.XPATH, 
-                        f"//button[contains(@class, 'facet-edit-button')]//span[contains(text(), '{text}')]/.."
-                    )
-                    add_button.click()
-                    await asyncio.sleep(1)
-                    break
-                except:
-                    continue
-            
-            # Find input field - try multiple selectors
-            input_selectors = [
-                "//input[@placeholder='Job titles or boolean']",
-                "//input[contains(@placeholder, 'job title')]",
-                "//input[contains(@placeholder, 'Job title')]"
-            ]
-            
-            for selector in input_selectors:
-                try:
-                    input_field = self.driver.find_element(By.XPATH, selector)
-                    input_field.clear()
-                    input_field.send_keys(title)
-                    await asyncio.sleep(1)
-                    input_field.send_keys(Keys.RETURN)
-                    await asyncio.sleep(1)
-                    logger.info("✓ Job title filter added")
-                    return
-                except:
-                    continue
+            # Click the facet edit button for job titles, then find the input field
+            input_field = await self._open_facet(
+                ["Job titles or boolean", "Add a Job title", "Job titles"],
+                [
+                    "//input[@placeholder='Job titles or boolean']",
+                    "//input[contains(@placeholder, 'job title')]",
+                    "//input[contains(@placeholder, 'Job title')]"
+                ]
+            )
+            if input_field is None:
+                logger.warning("Could not find job title input field")
+                return
             
-            logger.warning("Could not find job title input field")
+            before = self._signature()
+            input_field.clear()
+            input_field.send_keys(title)
+            await self._wait_for_suggestions()
+            input_field.send_keys(Keys.RETURN)
+            await self._wait_for_results_update(before)
+            logger.info("✓ Job title filter added")
             
         except Exception as e:
             logger.warning(f"Could not add job title filter: {e}")
@@ -194,54 +248,34 @@ class LinkedInRecruiterScraper:
         try:
             logger.info(f"Adding skills filter: {skills}")
             
-            # Click the facet edit button for skills
-            button_texts = [
-                "Skill keywords anywhere on profile",
-                "Add a Skill keyword",
-                "Skills",
-                "Skill keywords"
-            ]
-            
-            for text in button_texts:
-                try:
-                    add_button = self.driver.find_element(
-                        By.XPATH, 
-                        f"//button[contains(@class, 'facet-edit-button')]//span[contains(text(), '{text}')]/.."
-                    )
-                    add_button.click()
-                    await asyncio.sleep(1)
-                    break
-                except:
-                    continue
-            
-            # Find input field
-            input_selectors = [
-                "//input[@placeholder='Skill keywords anywhere on profile']",
-                "//input[contains(@placeholder, 'Skill keyword')]",
-                "//input[contains(@placeholder, 'skill')]"
-            ]
+            # Click the facet edit button for skills, then find the input field
+            input_field = await self._open_facet(
+                ["Skill keywords anywhere on profile", "Add a Skill keyword", "Skills", "Skill keywords"],
+                [
+                    "//input[@placeholder='Skill keywords anywhere on profile']",
+                    "//input[contains(@placeholder, 'Skill keyword')]",
+                    "//input[contains(@placeholder, 'skill')]"
+                ]
+            )
+            if input_field is None:
+                logger.warning("Could not find skills input field")
+                return
             
-            for selector in input_selectors:
+            # Add each skill
+            before = self._signature()
+            for skill in skills[:5]:  # Limit to 5 skills
                 try:
-                    input_field = self.driver.find_element(By.XPATH, selector)
-                    
-                    # Add each skill
-                    for skill in skills[:5]:  # Limit to 5 skills
-                        try:
-                            input_field.clear()
-                            input_field.send_keys(skill)
-                            await asyncio.sleep(0.5)
-                            input_field.send_keys(Keys.RETURN)
-                            await asyncio.sleep(0.5)
-                        except:
-                            continue
-                    
-                    logger.info("✓ Skills filter added")
-                    return
+                    input_field.clear()
+                    input_field.send_keys(skill)
+                    await self._wait_for_suggestions()
+                    input_field.send_keys(Keys.RETURN)
+                    # The input is cleared once the skill is added as a pill
+                    await wait_until(lambda: not input_field.get_attribute("value"), self.ELEMENT_TIMEOUT)
                 except:
                     continue
             
-            logger.warning("Could not find skills input field")
+            await self._wait_for_results_update(before)
+            logger.info("✓ Skills filter added")
             
         except Exception as e:
             logger.warning(f"Could not add skills filter: {e}")
@@ -251,48 +285,29 @@ class LinkedInRecruiterScraper:
         try:
             logger.info(f"Adding location filter: {location}")
             
-            # Click the facet edit button for locations
-            button_texts = [
-                "Candidate geographic locations",
-                "Add a Candidate geographic location",
-                "Locations"
-            ]
-            
-            for text in button_texts:
-                try:
-                    add_button = self.driver.find_element(
-                        By.XPATH, 
-                        f"//button[contains(@class, 'facet-edit-button')]//span[contains(text(), '{text}')]/.."
-                    )
-                    add_button.click()
-                    await asyncio.sleep(1)
-                    break
-                except:
-                    continue
-            
-            # Find input field
-            input_selectors = [
-                "//input[@placeholder='Candidate geographic locations']",
-                "//input[contains(@placeholder, 'geographic location')]",
-                "//input[contains(@placeholder, 'location')]"
-            ]
-            
-            for selector in input_selectors:
-                try:
-                    input_field = self.driver.find_element(By.XPATH, selector)
-                    input_field.clear()
-                    input_field.send_keys(location)
-                    await asyncio.sleep(2)  # Wait for dropdown
-                    input_field.send_keys(Keys.ARROW_DOWN)
-                    await asyncio.sleep(0.5)
-                    input_field.send_keys(Keys.RETURN)
-                    await asyncio.sleep(1)
-                    logger.info("✓ Location filter added")
-                    return
-                except:
-                    continue
+            # Click the facet edit button for locations, then find the input field
+            input_field = await self._open_facet(
+                ["Candidate geographic locations", "Add a Candidate geographic location", "Locations"],
+                [
+                    "//input[@placeholder='Candidate geographic locations']",
+                    "//input[contains(@placeholder, 'geographic location')]",
+                    "//input[contains(@placeholder, 'location')]"
+                ]
+            )
+            if input_field is None:
+                logger.warning("Could not find location input field")
+                return
             
-            logger.warning("Could not find location input field")
+            before = self._signature()
+            input_field.clear()
+            input_field.send_keys(location)
+            await self._wait_for_suggestions()
+            input_field.send_keys(Keys.ARROW_DOWN)
+            # Wait for the first suggestion to be highlighted
+            await wait_until(lambda: input_field.get_attribute("aria-activedescendant"), self.ELEMENT_TIMEOUT)
+            input_field.send_keys(Keys.RETURN)
+            await self._wait_for_results_update(before)
+            logger.info("✓ Location filter added")
             
         except Exception as e:
             logger.warning(f"Could not add location filter: {e}")
@@ -302,31 +317,6 @@ class LinkedInRecruiterScraper:
         try:
             logger.info(f"Adding experience filter: {years}+ years")
             
-            # Click the facet edit button for experience
-            button_texts = [
-                "Years of experience",
-                "Add Years of experience",
-                "Experience"
-            ]
-            
-            clicked = False
-            for text in button_texts:
-                try:
-                    add_button = self.driver.find_element(
-                        By.XPATH, 
-                        f"//button[contains(@class, 'facet-edit-button')]//span[contains(text(), '{text}')]/.."
-                    )
-                    add_button.click()
-                    await asyncio.sleep(1)
-                    clicked = True
-                    break
-                except:
-                    continue
-            
-            if not clicked:
-                logger.warning("Could not find experience button")
-                return
-            
             # Select appropriate range based on years
             checkbox_texts = []
             if years >= 10:
@@ -338,23 +328,25 @@ class LinkedInRecruiterScraper:
             else:
                 checkbox_texts = ["0-2", "0 to 2", "0-2 years", "1-2"]
             
-            for text in checkbox_texts:
-                try:
-                    checkbox = self.driver.find_element(By.XPATH, f"//label[contains(text(), '{text}')]")
-                    checkbox.click()
-                    await asyncio.sleep(1)
-                    logger.info("✓ Experience filter added")
-                    return
-                except:
-                    continue
+            # Click the facet edit button for experience, then wait for its options
+            checkbox = await self._open_facet(
+                ["Years of experience", "Add Years of experience", "Experience"],
+                [f"//label[contains(text(), '{text}')]" for text in checkbox_texts]
+            )
+            if checkbox is None:
+                logger.warning("Could not find experience checkbox")
+                return
             
-            logger.warning("Could not find experience checkbox")
+            before = self._signature()
+            checkbox.click()
+            await self._wait_for_results_update(before)
+            logger.info("✓ Experience filter added")
             
         except Exception as e:
             logger.warning(f"Could not add experience filter: {e}")
     
-    def _calculate_total_experience(self, experience_items) -> int:
-        """Calculate total years of experience from experience items"""
+    def _calculate_total_experience(self, experience_items: List[str]) -> int:
+        """Calculate total years of experience from experience entry texts"""
         import re
         from datetime import datetime
         
@@ -363,7 +355,7 @@ class LinkedInRecruiterScraper:
         
         for item in experience_items:
             try:
-                text = item.text
+                text = item
                 
                 # Look for date patterns like "2024 – Present", "2023 – 2024", etc.
                 # Pattern: YYYY – YYYY or YYYY – Present
@@ -386,8 +378,8 @@ class LinkedInRecruiterScraper:
         
         return total_years
     
-    async def _click_search(self):
-        """Click the Search button or wait for auto-search"""
+    async def _click_search(self) -> bool:
+        """Click the Search button (returns False when LinkedIn auto-searches)"""
         try:
             logger.info("Looking for Search button...")
             
@@ -417,9 +409,11 @@ class LinkedInRecruiterScraper:
             if not search_clicked:
                 logger.info("ℹ️  No search button found - LinkedIn Recruiter may auto-search")
                 logger.info("Waiting for results to load...")
+            return search_clicked
             
         except Exception as e:
             logger.info(f"Search button not needed or auto-search enabled: {e}")
+            return False
     
     async def _extract_candidates(self, max_candidates: int) -> List[Candidate]:
         """Extract candidate data from search results"""
@@ -429,32 +423,23 @@ class LinkedInRecruiterScraper:
             logger.info("Extracting candidates from results...")
             
             # Wait for results to load
-            await asyncio.sleep(3)
+            count_cards = lambda: len(self.driver.find_elements(By.CSS_SELECTOR, self.CARD_SELECTOR))
+            await wait_until(count_cards, self.RESULTS_TIMEOUT)
             
-            # Scroll to load more results
+            # Scroll to load more results, until scrolling loads nothing new
             for i in range(3):
+                loaded = count_cards()
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                await asyncio.sleep(2)
+                if not await wait_until(lambda: count_cards() > loaded, self.SCROLL_TIMEOUT):
+                    logger.info(f"No more results after scroll {i+1}")
+                    break
                 logger.info(f"Scrolled {i+1}/3")
             
-            # Try multiple selectors for candidate cards
-            candidate_cards = []
-            selectors = [
-                "article.profile-list-item",  # LinkedIn Recruiter Lite profile cards
-                "li.artdeco-list__item",
-                "[data-test-search-result]",
-                ".search-results__result-item",
-                "div.entity-result",
-                "li[class*='search-result']"
-            ]
-            
-            for selector in selectors:
-                candidate_cards = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if candidate_cards:
-                    logger.info(f"✓ Found {len(candidate_cards)} candidate cards using: {selector}")
-                    break
-                else:
-                    logger.warning(f"No cards with selector: {selector}")
+            # Read all candidate cards in one call - try multiple selectors
+            parse_started = time.perf_counter()
+            selector, candidate_cards = snapshot_cards(self.driver, self.CARD_SELECTORS)
+            if candidate_cards:
+                logger.info(f"✓ Found {len(candidate_cards)} candidate cards using: {selector}")
             
             if not candidate_cards:
                 logger.error("❌ Could not find any candidate cards!")
@@ -467,8 +452,7 @@ class LinkedInRecruiterScraper:
             for i, card in enumerate(candidate_cards[:max_candidates]):
                 try:
                     # Extract name - try multiple approaches
-                    name = "LinkedIn User"
-                    name_selectors = [
+                    name = first_text(card, [
                         "div.artdeco-entity-lockup__title a",  # Main name link
                         "span[data-test-row-lockup-full-name] a",
                         "a[data-test-link-to-profile-link]",
@@ -476,98 +460,42 @@ class LinkedInRecruiterScraper:
                         "a.app-aware-link span[aria-hidden='true']",
                         "[data-test-search-result-person-name]",
                         "a[data-control-name='view_profile']"
-                    ]
-                    
-                    for selector in name_selectors:
-                        try:
-                            name_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            name_text = name_elem.text.strip()
-                            if name_text and len(name_text) > 2:
-                                name = name_text
-                                break
-                        except:
-                            continue
+                    ], accept=lambda text: len(text) > 2) or "LinkedIn User"
                     
                     # Extract title/headline
-                    title = ""
-                    title_selectors = [
+                    title = first_text(card, [
                         "span[data-test-row-lockup-headline]",  # Main headline
                         "div.artdeco-entity-lockup__subtitle span",
                         "span.artdeco-entity-lockup__subtitle",
                         "div.artdeco-entity-lockup__subtitle",
                         "[data-test-search-result-person-headline]"
-                    ]
-                    
-                    for selector in title_selectors:
-                        try:
-                            title_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            title = title_elem.text.strip()
-                            if title:
-                                break
-                        except:
-                            continue
+                    ]) or ""
                     
-                    # Extract location
-                    location = ""
-                    location_selectors = [
+                    # Extract location (skip texts that contain a separator)
+                    location = first_text(card, [
                         "div[data-test-row-lockup-location]",  # Main location
                         "div.artdeco-entity-lockup__metadata div",
                         "span.artdeco-entity-lockup__caption",
                         "div.artdeco-entity-lockup__caption",
                         "[data-test-search-result-person-location]"
-                    ]
-                    
-                    for selector in location_selectors:
-                        try:
-                            location_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            location = location_elem.text.strip()
-                            if location and "·" not in location:  # Skip if it contains separator
-                                break
-                        except:
-                            continue
+                    ], accept=lambda text: "·" not in text) or ""
                     
                     # Extract profile URL
-                    profile_url = ""
-                    url_selectors = [
+                    profile_url = first_link(card, [
                         "a[href*='/talent/profile/']",  # Recruiter profile URL
                         "div.artdeco-entity-lockup__title a",
                         "a[data-test-link-to-profile-link]",
                         "a[href*='/in/']",
                         "a.app-aware-link"
-                    ]
-                    
-                    for selector in url_selectors:
-                        try:
-                            link_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            profile_url = link_elem.get_attribute("href")
-                            if profile_url and ("/talent/profile/" in profile_url or "/in/" in profile_url):
-                                break
-                        except:
-                            continue
+                    ], "https://www.linkedin.com",
+                        accept=lambda url: "/talent/profile/" in url or "/in/" in url) or ""
                     
-                    # Extract experience years
-                    experience_years = 0
-                    experience_text = ""
-                    try:
-                        # Look for the experience section in the history
-                        experience_section = card.find_element(By.CSS_SELECTOR, "div[data-test-history]")
-                        
-                        # Get all experience entries
-                        experience_items = experience_section.find_elements(
-                            By.CSS_SELECTOR, 
-                            "li[data-test-description-description]"
-                        )
-                        
-                        # Calculate total years from all experience entries
-                        experience_years = self._calculate_total_experience(experience_items)
-                        
-                        # Store experience text for reference
-                        if experience_items:
-                            experience_text = " | ".join([item.text.strip() for item in experience_items[:3]])
-                        
+                    # Extract experience years from the entries in the history section
+                    experience_items = all_texts(card, "div[data-test-history] li[data-test-description-description]")
+                    experience_years = self._calculate_total_experience(experience_items)
+                    experience_text = " | ".join(experience_items[:3])
+                    if experience_items:
                         logger.info(f"  → Experience: {experience_years} years")
-                    except Exception as e:
-                        logger.debug(f"Could not extract experience for {name}: {e}")
                     
                     # Create candidate
                     if name and name != "LinkedIn User":
@@ -591,6 +519,8 @@ class LinkedInRecruiterScraper:
                 except Exception as e:
                     logger.warning(f"Error extracting candidate {i}: {e}")
                     continue
+            
+            logger.info(f"Extracted {len(candidates)} candidates in {(time.perf_counter() - parse_started) * 1000:.0f} ms")
         
         except Exception as e:
             logger.error(f"Error in candidate extraction: {e}")
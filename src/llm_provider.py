@@ -1,10 +1,15 @@
 """LLM Provider abstraction to support both Groq and OpenAI"""
 
 import os
-from typing import List, Optional
+import time
+import asyncio
+import threading
+from typing import AsyncIterator, List, Optional
 from groq import Groq
 from openai import OpenAI
 from sentence_transformers import SentenceTransformer
+from src.prompt_budget import PromptBudgeter, token_usage
+from src.http_client import get_llm_http_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,22 +21,28 @@ class LLMProvider:
         self.config = config
         self.provider = config['llm'].get('provider', 'groq')
         
+        # All provider clients in the process share one pooled keep-alive HTTP client
+        http_client = get_llm_http_client(config)
+        
         # Initialize LLM client
         if self.provider == 'groq':
             groq_key = os.getenv('GROQ_API_KEY') or config['llm'].get('groq_api_key')
             if not groq_key:
                 raise ValueError("GROQ_API_KEY not found in environment or config")
-            self.client = Groq(api_key=groq_key)
+            self.client = Groq(api_key=groq_key, http_client=http_client)
             self.model = config['llm'].get('groq_model', 'llama-3.3-70b-versatile')
             logger.info(f"Using Groq with model: {self.model}")
         else:
             openai_key = os.getenv('OPENAI_API_KEY') or config['llm'].get('openai_api_key')
             if not openai_key:
                 raise ValueError("OPENAI_API_KEY not found in environment or config")
-            self.client = OpenAI(api_key=openai_key)
+            self.client = OpenAI(api_key=openai_key, http_client=http_client)
             self.model = config['llm'].get('openai_model', 'gpt-4')
             logger.info(f"Using OpenAI with model: {self.model}")
         
+        # Prompt size budgeting
+        self.prompt_budgeter = PromptBudgeter.from_config(config)
+        
         # Initialize embedding model
         embedding_model = config['llm'].get('embedding_model', 'sentence-transformers')
         if embedding_model == 'sentence-transformers':
@@ -43,20 +54,113 @@ class LLMProvider:
             self.use_local_embeddings = False
             logger.info("Using OpenAI embeddings")
     
-    def chat_completion(self, messages: List[dict], max_tokens: int = 500, temperature: float = 0.3) -> str:
+    def chat_completion(self, messages: List[dict], max_tokens: int = 500, temperature: float = 0.3,
+                        purpose: Optional[str] = None) -> str:
         """Get chat completion from LLM"""
+        prompt_estimate = self.prompt_budgeter.check(messages)
+        
         try:
+            start_time = time.time()
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature
             )
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content.strip()
+            
+            # Prefer provider-reported usage, fall back to estimates
+            usage = getattr(response, 'usage', None)
+            prompt_tokens = getattr(usage, 'prompt_tokens', None)
+            completion_tokens = getattr(usage, 'completion_tokens', None)
+            token_usage.record(
+                prompt_tokens=prompt_tokens if prompt_tokens is not None else prompt_estimate,
+                completion_tokens=completion_tokens if completion_tokens is not None else self.prompt_budgeter.estimate_tokens(content),
+                model=self.model,
+                purpose=purpose,
+                estimated=usage is None,
+                latency=time.time() - start_time
+            )
+            return content
         except Exception as e:
             logger.error(f"LLM completion error: {e}")
             raise
     
+    async def stream_chat_completion(self, messages: List[dict], max_tokens: int = 500, temperature: float = 0.3,
+                                     purpose: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream chat completion text chunks as they are generated"""
+        prompt_estimate = self.prompt_budgeter.check(messages)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def produce():
+            # The SDK stream is blocking, so read it in a worker thread and hand chunks to the loop
+            stream = None
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        loop.call_soon_threadsafe(queue.put_nowait, delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                if stream is not None and hasattr(stream, 'close'):
+                    stream.close()
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        start_time = time.time()
+        first_token_time = None
+        parts = []
+        loop.run_in_executor(None, produce)
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    logger.error(f"LLM streaming error: {item}")
+                    raise item
+                if first_token_time is None:
+                    first_token_time = time.time()
+                parts.append(item)
+                yield item
+        finally:
+            # Stops the worker early if the consumer stopped reading
+            stop.set()
+        
+        end_time = time.time()
+        completion_tokens = self.prompt_budgeter.estimate_tokens("".join(parts))
+        time_to_first_token = (first_token_time or end_time) - start_time
+        generation_time = end_time - (first_token_time or end_time)
+        tokens_per_second = completion_tokens / generation_time if generation_time > 0 else None
+        
+        token_usage.record(
+            prompt_tokens=prompt_estimate,
+            completion_tokens=completion_tokens,
+            model=self.model,
+            purpose=purpose,
+            estimated=True,
+            latency=end_time - start_time,
+            time_to_first_token=time_to_first_token,
+            tokens_per_second=tokens_per_second
+        )
+        logger.info(f"Streamed {purpose or 'chat'} completion: first token in {time_to_first_token:.2f}s, "
+                    f"{tokens_per_second or 0:.1f} tokens/s")
+    
     def get_embedding(self, text: str) -> List[float]:
         """Get embedding for text"""
         if self.use_local_embeddings:
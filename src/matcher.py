@@ -3,11 +3,25 @@ import numpy as np
 from src.models import Candidate, JobDescription
 from src.llm_provider import LLMProvider
 from src.jd_skills_extractor import JDSkillsExtractor
+from src.tracing import tracer
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+class ScoredCandidates:
+    """Every candidate scored against one job, best first; thresholds are filters over these scores"""
+    
+    def __init__(self, candidates: List[Candidate]):
+        self.candidates = sorted(candidates, key=lambda c: c.combined_match_score or 0.0, reverse=True)
+    
+    def __len__(self) -> int:
+        return len(self.candidates)
+    
+    def above(self, threshold: float) -> List[Candidate]:
+        """Candidates scoring at least threshold, best first"""
+        return [c for c in self.candidates if (c.combined_match_score or 0.0) >= threshold]
+
 class CandidateMatcher:
     """Matches candidates to job descriptions using embeddings and enhanced skill matching"""
     
@@ -108,10 +122,8 @@ class CandidateMatcher:
         vec2_np = np.array(vec2)
         return float(np.dot(vec1_np, vec2_np) / (np.linalg.norm(vec1_np) * np.linalg.norm(vec2_np)))
     
-    def match_candidates(self, job: JobDescription, candidates: List[Candidate], threshold: float = 0.25) -> List[Candidate]:
-        """Match candidates to job description using enhanced skill-based matching"""
-        logger.info(f"Matching {len(candidates)} candidates to job")
-        
+    def prepare_job(self, job: JobDescription) -> Dict:
+        """Extract the job's skill set and embedding once for scoring many candidates"""
         # Extract comprehensive skill matrix from job description
         job_skill_matrix = self.skills_extractor.extract_from_job_description(job)
         job_skills = set(job_skill_matrix['all_skills'])
@@ -119,36 +131,60 @@ class CandidateMatcher:
         logger.info(f"📊 Job requires {len(job_skills)} skills: {', '.join(list(job_skills)[:5])}...")
         
         # Get job embedding for semantic matching
-        job_text = self._job_to_text(job)
-        job_embedding = self._get_embedding(job_text)
-        
-        matched = []
-        for candidate in candidates:
-            # 1. Enhanced skill matching (50% weight)
-            candidate_skills = self.skills_extractor.normalize_candidate_skills(candidate.skills)
-            skill_match = self.skills_extractor.calculate_skill_match_score(job_skills, candidate_skills)
-            skill_score = skill_match['score']
-            
-            # 2. Semantic matching with embeddings (50% weight)
-            candidate_text = self._candidate_to_text(candidate)
-            candidate_embedding = self._get_embedding(candidate_text)
-            semantic_score = self._cosine_similarity(job_embedding, candidate_embedding)
-            
-            # 3. Combined score (prioritize semantic/context matching)
-            combined_score = (0.3 * skill_score) + (0.7 * semantic_score)
+        job_embedding = self._get_embedding(self._job_to_text(job))
+        
+        return {'skills': job_skills, 'embedding': job_embedding}
+    
+    def embed_candidate(self, candidate: Candidate) -> List[float]:
+        """Get the embedding used for semantic matching"""
+        return self._get_embedding(self._candidate_to_text(candidate))
+    
+    def score_candidate(self, job_context: Dict, candidate: Candidate, candidate_embedding: List[float]) -> float:
+        """Score one candidate against a prepared job; stores the scores on the candidate"""
+        # 1. Enhanced skill matching
+        candidate_skills = self.skills_extractor.normalize_candidate_skills(candidate.skills)
+        skill_match = self.skills_extractor.calculate_skill_match_score(job_context['skills'], candidate_skills)
+        skill_score = skill_match['score']
+        
+        # 2. Semantic matching with embeddings
+        semantic_score = self._cosine_similarity(job_context['embedding'], candidate_embedding)
+        
+        # 3. Combined score (prioritize semantic/context matching)
+        combined_score = (0.3 * skill_score) + (0.7 * semantic_score)
+        
+        # Store detailed scores for ranking
+        candidate.keyword_match_score = skill_score
+        candidate.semantic_match_score = semantic_score
+        candidate.combined_match_score = combined_score
+        candidate.matched_skills = skill_match['matched_skills']
+        candidate.missing_skills = skill_match['missing_skills']
+        
+        return combined_score
+    
+    def score_candidates(self, job: JobDescription, candidates: List[Candidate]) -> ScoredCandidates:
+        """
+        Score every candidate against the job once.
+        
+        Skills are extracted and embeddings computed (in one batch) here only;
+        threshold changes and fallbacks then filter the returned scores.
+        """
+        logger.info(f"Scoring {len(candidates)} candidates against job")
+        
+        with tracer.span("matching", candidates=len(candidates)):
+            job_context = self.prepare_job(job)
             
-            # Store detailed scores for ranking
-            candidate.keyword_match_score = skill_score
-            candidate.semantic_match_score = semantic_score
-            candidate.combined_match_score = combined_score
-            candidate.matched_skills = skill_match['matched_skills']
-            candidate.missing_skills = skill_match['missing_skills']
+            embeddings = []
+            if candidates:
+                embeddings = self.llm_provider.get_embeddings_batch([self._candidate_to_text(c) for c in candidates])
             
-            if combined_score >= threshold:
-                matched.append(candidate)
+            for candidate, embedding in zip(candidates, embeddings):
+                self.score_candidate(job_context, candidate, embedding)
         
-        # Sort by combined score
-        matched.sort(key=lambda c: c.combined_match_score, reverse=True)
+        return ScoredCandidates(candidates)
+    
+    def match_candidates(self, job: JobDescription, candidates: List[Candidate], threshold: float = 0.25) -> List[Candidate]:
+        """Match candidates to job description using enhanced skill-based matching"""
+        matched = self.score_candidates(job, candidates).above(threshold)
         
         logger.info(f"Matched {len(matched)} candidates above threshold {threshold}")
         if matched:
@@ -9,6 +9,15 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class ReusePolicy(str, Enum):
+    NONE = "none"  # Always source from scratch
+    EXACT = "exact"  # Reuse results of an identical JD
+    SIMILAR = "similar"  # Also re-score the scraped candidates of a near-identical JD
+
+class QualityTarget(BaseModel):
+    min_candidates: Optional[int] = Field(default=None, ge=0)  # 0 = never stop early
+    min_score: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
 class JobDescription(BaseModel):
     title: str
     description: str
@@ -16,6 +25,10 @@ class JobDescription(BaseModel):
     experience_years: Optional[int] = None
     location: Optional[str] = None
     salary_range: Optional[Dict[str, float]] = None
+    
+    # Per-job overrides of pipeline.quality_target and pipeline.time_budget_seconds
+    quality_target: Optional[QualityTarget] = None
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0)
 
 class Candidate(BaseModel):
     id: str
@@ -30,6 +43,7 @@ class Candidate(BaseModel):
     profile_url: str
     source_portal: str
     summary: Optional[str] = None
+    matched_titles: Optional[List[str]] = None  # Job titles whose search found this candidate
     
     # Matching scores (added dynamically during matching)
     keyword_match_score: Optional[float] = None
@@ -47,9 +61,21 @@ class RankedCandidate(BaseModel):
     match_breakdown: Dict[str, Any]  # Can contain floats, lists, etc.
     reasoning: str
 
+class RerankRequest(BaseModel):
+    weights: Optional[Dict[str, float]] = None  # Overrides ranking.weights per feature
+    top_n: int = Field(default=20, ge=1, le=500)
+    min_score: Optional[float] = None
+    min_experience: Optional[float] = None
+    max_experience: Optional[float] = None
+    locations: Optional[List[str]] = None  # Substring match on candidate location
+    sources: Optional[List[str]] = None  # Source portals to keep
+
 class Job(BaseModel):
     id: str
     description: JobDescription
     status: JobStatus
     created_at: datetime
     candidates: List[RankedCandidate] = []
+    token_usage: Optional[Dict[str, int]] = None  # LLM prompt/completion tokens spent on this job
+    timings: Optional[Dict[str, Any]] = None  # Per-stage timing summary from the job's trace
+    reused_from: Optional[str] = None  # Job whose cached results or scraped candidates this job reused
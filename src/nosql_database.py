@@ -1,7 +1,8 @@
 """
 NoSQL Database using MongoDB for candidate and job storage
 """
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 from typing import List, Dict, Optional
 import os
@@ -46,6 +47,7 @@ class MongoDBManager:
         
         # Scraped candidates indexes
         self.scraped_candidates.create_index("profile_url", unique=True)
+        self.scraped_candidates.create_index("id")
         self.scraped_candidates.create_index("source_portal")
         self.scraped_candidates.create_index("scraped_at")
     
@@ -63,10 +65,37 @@ class MongoDBManager:
         
         return candidate_data['id']
     
+    def insert_candidates_bulk(self, candidates: List[Dict]) -> int:
+        """Upsert many candidates in one round-trip; returns how many were written"""
+        now = datetime.now()
+        requests = [
+            UpdateOne({'id': c['id']}, {'$set': {**c, 'updated_at': now}, '$setOnInsert': {'created_at': now}}, upsert=True)
+            for c in self._dedupe(candidates, 'id')
+        ]
+        return self._bulk_upsert(self.candidates, requests)
+    
     def get_candidate(self, candidate_id: str) -> Optional[Dict]:
         """Get candidate by ID"""
         return self.candidates.find_one({'id': candidate_id}, {'_id': 0})
     
+    def get_candidates_by_ids(self, candidate_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get many candidates by ID with one $in query per collection
+        
+        Final candidates take precedence; IDs not found there are looked up
+        in the scraped collection. Returns {id: candidate}.
+        """
+        wanted = list(dict.fromkeys(candidate_ids))
+        if not wanted:
+            return {}
+        
+        found = {c['id']: c for c in self.candidates.find({'id': {'$in': wanted}}, {'_id': 0})}
+        missing = [i for i in wanted if i not in found]
+        if missing:
+            for c in self.scraped_candidates.find({'id': {'$in': missing}}, {'_id': 0}):
+                found.setdefault(c['id'], c)
+        return found
+    
     def get_all_candidates(self) -> List[Dict]:
         """Get all candidates"""
         return list(self.candidates.find({}, {'_id': 0}).sort('created_at', -1))
@@ -94,6 +123,15 @@ class MongoDBManager:
         
         return job_data['id']
     
+    def insert_jobs_bulk(self, jobs: List[Dict]) -> int:
+        """Upsert many jobs in one round-trip; returns how many were written"""
+        now = datetime.now()
+        requests = [
+            UpdateOne({'id': j['id']}, {'$set': {**j, 'updated_at': now}, '$setOnInsert': {'created_at': now}}, upsert=True)
+            for j in self._dedupe(jobs, 'id')
+        ]
+        return self._bulk_upsert(self.jobs, requests)
+    
     def get_job(self, job_id: str) -> Optional[Dict]:
         """Get job by ID"""
         return self.jobs.find_one({'id': job_id}, {'_id': 0})
@@ -124,6 +162,34 @@ class MongoDBManager:
         
         return str(result.upserted_id) if result.upserted_id else candidate_data.get('profile_url')
     
+    def insert_scraped_candidates_bulk(self, candidates: List[Dict]) -> int:
+        """Upsert many scraped candidates in one round-trip; returns how many were written"""
+        now = datetime.now()
+        requests = [
+            UpdateOne({'profile_url': c.get('profile_url')}, {'$set': {**c, 'scraped_at': now}}, upsert=True)
+            for c in self._dedupe(candidates, 'profile_url')
+        ]
+        return self._bulk_upsert(self.scraped_candidates, requests)
+    
+    @staticmethod
+    def _dedupe(candidates: List[Dict], key: str) -> List[Dict]:
+        """Last record per key, so one batch never upserts the same document twice"""
+        return list({c.get(key): c for c in candidates}.values())
+    
+    @staticmethod
+    def _bulk_upsert(collection, requests: List[UpdateOne]) -> int:
+        """Unordered bulk write: one bad document doesn't stop the rest"""
+        if not requests:
+            return 0
+        try:
+            result = collection.bulk_write(requests, ordered=False)
+            return result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            details = e.details
+            logger.error(f"{len(details.get('writeErrors', []))} of {len(requests)} "
+                         f"writes to {collection.name} failed: {details.get('writeErrors', [])[:1]}")
+            return details.get('nUpserted', 0) + details.get('nMatched', 0)
+    
     def get_scraped_candidates(self, source_portal: Optional[str] = None) -> List[Dict]:
         """Get all scraped candidates"""
         query = {'source_portal': source_portal} if source_portal else {}
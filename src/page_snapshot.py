@@ -0,0 +1,94 @@
+"""
+Local parsing of browser result pages
+Reads all result cards in one WebDriver call and runs the scrapers' selector fallbacks on the HTML,
+instead of one WebDriver round-trip per selector per card
+"""
+import importlib.util
+from typing import Callable, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Tag
+
+# lxml parses several times faster than the built-in parser when it is installed
+PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# Returns the outerHTML of every match of the first selector with at least minCount matches
+_CARDS_SCRIPT = """
+const [selectors, minCount] = arguments;
+for (const selector of selectors) {
+    const cards = document.querySelectorAll(selector);
+    if (cards.length >= minCount) {
+        return {selector: selector, html: Array.from(cards, card => card.outerHTML)};
+    }
+}
+return {selector: null, html: []};
+"""
+
+_CARD_WRAPPER = "snapshot-card"
+
+
+def parse_cards(fragments: Sequence[str]) -> List[Tag]:
+    """Parse card HTML fragments in one pass; returns each fragment's root element"""
+    html = "".join(f"<div class='{_CARD_WRAPPER}'>{fragment}</div>" for fragment in fragments)
+    soup = BeautifulSoup(html, PARSER)
+    cards = []
+    for wrapper in soup.select(f"div.{_CARD_WRAPPER}"):
+        root = wrapper.find(recursive=False)
+        if root is not None:
+            cards.append(root)
+    return cards
+
+
+def snapshot_cards(driver, selectors: Sequence[str], min_count: int = 1) -> Tuple[Optional[str], List[Tag]]:
+    """
+    Result cards of the current page as parsed elements, from a single WebDriver call.
+    
+    Selectors are tried in order (in the browser) like a find_elements fallback
+    chain; returns the selector that matched and its cards, or (None, []).
+    """
+    result = driver.execute_script(_CARDS_SCRIPT, list(selectors), min_count) or {}
+    return result.get('selector'), parse_cards(result.get('html') or [])
+
+
+def text_of(element: Tag) -> str:
+    """Element text with whitespace collapsed, close to WebElement.text for inline content"""
+    return " ".join(element.get_text(" ").split())
+
+
+def first_text(card: Tag, selectors: Sequence[str], accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+    """Text of the first selector whose first match has non-empty text that `accept` allows"""
+    for selector in selectors:
+        element = card.select_one(selector)
+        if element is None:
+            continue
+        text = text_of(element)
+        if text and (accept is None or accept(text)):
+            return text
+    return None
+
+
+def all_texts(card: Tag, selector: str) -> List[str]:
+    """Non-empty texts of every match of a selector"""
+    return [text for text in (text_of(e) for e in card.select(selector)) if text]
+
+
+def first_link(card: Tag, selectors: Sequence[str], base_url: str,
+               accept: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+    """Absolute href of the first selector match that `accept` allows (like get_attribute('href'))"""
+    for selector in selectors:
+        element = card.select_one(selector)
+        if element is None or not element.get('href'):
+            continue
+        url = urljoin(base_url, element['href'])
+        if accept is None or accept(url):
+            return url
+    return None
+
+
+def first_attr(card: Tag, selectors: Sequence[str], attribute: str) -> Optional[str]:
+    """Value of `attribute` on the first selector match that has it"""
+    for selector in selectors:
+        element = card.select_one(selector)
+        if element is not None and element.get(attribute):
+            return element[attribute]
+    return None
@@ -0,0 +1,212 @@
+"""
+Write-behind persistence
+Queues database writes in a local SQLite file and flushes them in batches off the job's critical path
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Handler for one kind of write: receives a batch of payloads and raises on failure
+BatchHandler = Callable[[List[Dict[str, Any]]], None]
+
+
+class PersistenceQueue:
+    """
+    Durable write-behind queue.
+    
+    Writes are appended to a SQLite file before enqueue() returns, so they
+    survive a crash or restart. A background thread groups pending writes by
+    kind and hands each batch to the registered handler; failed batches are
+    retried with exponential backoff and parked after max_retries.
+    
+    Writes are only queued between start() and stop(); before and after, or
+    with write-behind off, enqueue() writes inline, so code that never starts
+    the queue (scripts, workers) cannot strand writes in the SQLite file.
+    """
+    
+    def __init__(self):
+        self.enabled = True
+        self.path = "data/persistence_queue.db"
+        self.batch_size = 200
+        self.flush_interval = 1.0
+        self.max_retries = 5
+        self.retry_backoff = 2.0
+        self._handlers: Dict[str, BatchHandler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._accepting = False
+    
+    def configure(self, config: dict):
+        """Apply the `persistence` config section"""
+        persistence = config.get('persistence') or {}
+        self.enabled = persistence.get('write_behind', True)
+        self.path = persistence.get('queue_path', self.path)
+        self.batch_size = persistence.get('batch_size', self.batch_size)
+        self.flush_interval = persistence.get('flush_interval_seconds', self.flush_interval)
+        self.max_retries = persistence.get('max_retries', self.max_retries)
+        self.retry_backoff = persistence.get('retry_backoff_seconds', self.retry_backoff)
+    
+    def register(self, kind: str, handler: BatchHandler):
+        """Set the handler that writes batches of `kind` to their store"""
+        self._handlers[kind] = handler
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt REAL NOT NULL DEFAULT 0,"
+                " last_error TEXT,"
+                " dead INTEGER NOT NULL DEFAULT 0)"
+            )
+        return self._conn
+    
+    def enqueue(self, kind: str, payloads: List[Dict[str, Any]]):
+        """Queue writes of `kind` (written inline when write-behind is off or the queue isn't started)"""
+        if not payloads:
+            return
+        if not self.enabled or not self._accepting:
+            self._handlers[kind](payloads)
+            return
+        
+        rows = [(kind, json.dumps(p, default=str)) for p in payloads]
+        with self._lock:
+            self._connection().executemany("INSERT INTO writes (kind, payload) VALUES (?, ?)", rows)
+        self._wakeup.set()
+    
+    def flush(self, force: bool = False) -> int:
+        """
+        Write every due batch now; returns how many writes succeeded.
+        
+        force also retries writes that are still backing off (used on shutdown).
+        """
+        written = 0
+        last_seq = 0  # Each write is attempted at most once per flush
+        while True:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT seq, kind, payload, attempts FROM writes"
+                    " WHERE dead = 0 AND seq > ? AND (next_attempt <= ? OR ?) ORDER BY seq LIMIT ?",
+                    (last_seq, time.time(), force, self.batch_size)
+                ).fetchall()
+            if not rows:
+                return written
+            last_seq = rows[-1][0]
+            
+            by_kind = defaultdict(list)
+            for row in rows:
+                by_kind[row[1]].append(row)
+            
+            for kind, batch in by_kind.items():
+                if self._write_batch(kind, batch):
+                    written += len(batch)
+    
+    def _write_batch(self, kind: str, batch: List[tuple]) -> bool:
+        seqs = [row[0] for row in batch]
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise RuntimeError(f"No persistence handler registered for '{kind}'")
+            handler([json.loads(row[2]) for row in batch])
+        except Exception as e:
+            now = time.time()
+            updates = []
+            for seq, _, _, attempts in batch:
+                attempts += 1
+                delay = self.retry_backoff * (2 ** (attempts - 1))
+                updates.append((attempts, now + delay, str(e), int(attempts >= self.max_retries), seq))
+            with self._lock:
+                self._connection().executemany(
+                    "UPDATE writes SET attempts = ?, next_attempt = ?, last_error = ?, dead = ? WHERE seq = ?",
+                    updates
+                )
+            
+            dead = sum(u[3] for u in updates)
+            if dead:
+                logger.error(f"Giving up on {dead} '{kind}' writes after {self.max_retries} attempts: {e}")
+            logger.warning(f"Failed to write {len(batch)} '{kind}' records, retrying {len(batch) - dead} "
+                           f"with backoff: {e}")
+            return False
+        
+        with self._lock:
+            self._connection().executemany("DELETE FROM writes WHERE seq = ?", [(seq,) for seq in seqs])
+        logger.debug(f"Flushed {len(batch)} '{kind}' writes")
+        return True
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Persistence flush failed: {e}")
+    
+    def start(self, background: bool = True):
+        """
+        Start queueing writes and the background flusher (writes queued before a
+        restart are picked up). With background=False writes are queued for
+        explicit flush() calls instead.
+        """
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._accepting = True
+        if not background:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="persistence-queue", daemon=True)
+        self._thread.start()
+        pending = self.stats()['pending']
+        logger.info(f"Write-behind persistence started ({pending} pending writes)")
+    
+    def stop(self, timeout: float = 30.0):
+        """Stop the flusher and write everything still pending (later writes go inline)"""
+        self._accepting = False
+        if self._thread:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+        if self.enabled:
+            written = self.flush(force=True)
+            pending = self.stats()['pending']
+            logger.info(f"Flushed {written} writes on shutdown"
+                        + (f", {pending} left for next start" if pending else ""))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pending and parked write counts per kind"""
+        if not self.enabled:
+            return {'enabled': False, 'pending': 0, 'failed': 0, 'by_kind': {}}
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT kind, dead, COUNT(*) FROM writes GROUP BY kind, dead"
+            ).fetchall()
+        by_kind: Dict[str, Dict[str, int]] = defaultdict(lambda: {'pending': 0, 'failed': 0})
+        for kind, dead, count in rows:
+            by_kind[kind]['failed' if dead else 'pending'] += count
+        return {
+            'enabled': True,
+            'pending': sum(k['pending'] for k in by_kind.values()),
+            'failed': sum(k['failed'] for k in by_kind.values()),
+            'by_kind': dict(by_kind)
+        }
+
+
+# Global instance
+persistence_queue = PersistenceQueue()
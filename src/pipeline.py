@@ -0,0 +1,235 @@
+"""
+Pipelined candidate processing
+Runs sourcing stages as workers connected by bounded queues so stages overlap
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from src.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StageMetrics:
+    """Throughput, busy time and queue depth for one pipeline stage"""
+    
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+    
+    def sample_depth(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'concurrency': self.concurrency,
+            'received': self.received,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'max_queue_depth': self.max_queue_depth,
+            'avg_queue_depth': round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0
+        }
+
+
+class PipelineStage:
+    """
+    A pipeline stage.
+    
+    handler receives one item and returns the item to pass on, or None to
+    drop it (filtered out, or consumed by the last stage).
+    """
+    
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[Optional[Any]]], concurrency: int = 1):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+
+
+class StagePipeline:
+    """Runs stages concurrently, each fed by a bounded queue from the stage before it"""
+    
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 50, source_name: str = "source"):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.source_name = source_name
+        self.metrics: Dict[str, StageMetrics] = {source_name: StageMetrics(source_name, 1)}
+        for stage in stages:
+            self.metrics[stage.name] = StageMetrics(stage.name, stage.concurrency)
+    
+    async def _feed(self, source: AsyncIterator[Any], queue: asyncio.Queue):
+        """Push source items into the first stage; blocks when that stage falls behind"""
+        metrics = self.metrics[self.source_name]
+        start_time = time.time()
+        async for item in source:
+            metrics.emitted += 1
+            await queue.put(item)
+        metrics.busy_seconds = time.time() - start_time
+        
+        for _ in range(self.stages[0].concurrency):
+            await queue.put(_DONE)
+    
+    async def _run_stage(self, index: int, queues: List[asyncio.Queue]):
+        stage = self.stages[index]
+        metrics = self.metrics[stage.name]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+        
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                metrics.sample_depth(inbox.qsize())
+                metrics.received += 1
+                
+                start_time = time.time()
+                try:
+                    result = await stage.handler(item)
+                except Exception as e:
+                    logger.error(f"Pipeline stage '{stage.name}' failed on an item: {e}")
+                    metrics.errors += 1
+                    result = None
+                metrics.busy_seconds += time.time() - start_time
+                
+                if result is None:
+                    continue
+                metrics.emitted += 1
+                if outbox is not None:
+                    await outbox.put(result)
+        
+        with tracer.span(stage.name, concurrency=stage.concurrency) as span:
+            await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+            span.set_attributes(received=metrics.received, emitted=metrics.emitted, errors=metrics.errors,
+                                max_queue_depth=metrics.max_queue_depth)
+        
+        # Every worker has finished, so tell the next stage's workers to stop
+        if outbox is not None:
+            for _ in range(self.stages[index + 1].concurrency):
+                await outbox.put(_DONE)
+    
+    async def run(self, source: AsyncIterator[Any]) -> Dict[str, Dict[str, Any]]:
+        """Drive items from source through every stage; returns per-stage metrics"""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        tasks = [asyncio.create_task(self._feed(source, queues[0]))]
+        tasks.extend(asyncio.create_task(self._run_stage(i, queues)) for i in range(len(self.stages)))
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        return self.summary()
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metrics.summary() for name, metrics in self.metrics.items()}
+    
+    def log_summary(self):
+        for name, metrics in self.summary().items():
+            logger.info(f"  {name:<8} in={metrics['received']:<4} out={metrics['emitted']:<4} "
+                        f"busy={metrics['busy_seconds']:.1f}s max_queue={metrics['max_queue_depth']} "
+                        f"avg_queue={metrics['avg_queue_depth']}")
+
+
+class TopKSelector:
+    """Keeps the K highest-scoring items seen so far"""
+    
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: list = []
+        self._counter = itertools.count()  # Tie-breaker so items are never compared
+    
+    def add(self, score: float, item: Any, key: Optional[Any] = None):
+        """Offer an item; a key lets it be discarded later"""
+        entry = (score, -next(self._counter), key, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+    
+    def discard(self, key: Any):
+        """Drop the selected item added with this key, if it is still selected"""
+        remaining = [entry for entry in self._heap if entry[2] != key]
+        if len(remaining) != len(self._heap):
+            self._heap = remaining
+            heapq.heapify(self._heap)
+    
+    def items(self) -> List[Any]:
+        """Selected items, best first"""
+        return [item for _, _, _, item in sorted(self._heap, reverse=True)]
+
+
+class SourcingLimits:
+    """
+    Quality target and time budget of one sourcing run.
+    
+    A job's own quality_target and time_budget_seconds override the `pipeline`
+    config. The budget runs from when the limits are created and covers every
+    stage: scraping, enrichment, matching and AI reasoning.
+    """
+    
+    def __init__(self, min_candidates: Optional[int] = None, min_score: float = 0.0,
+                 time_budget_seconds: Optional[float] = None):
+        self.min_candidates = min_candidates
+        self.min_score = min_score or 0.0
+        self.time_budget_seconds = time_budget_seconds
+        self.qualified = 0
+        self.deadline = None  # Event loop time
+        if time_budget_seconds:
+            self.deadline = asyncio.get_running_loop().time() + time_budget_seconds
+    
+    @classmethod
+    def for_job(cls, config: dict, job_description) -> 'SourcingLimits':
+        pipeline_config = config.get('pipeline') or {}
+        target = dict(pipeline_config.get('quality_target') or {})
+        if job_description.quality_target is not None:
+            target.update(job_description.quality_target.dict(exclude_none=True))
+        time_budget = job_description.time_budget_seconds or pipeline_config.get('time_budget_seconds')
+        return cls(target.get('min_candidates'), target.get('min_score', 0.0), time_budget)
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left of the budget (None without one)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - asyncio.get_running_loop().time())
+    
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and self.remaining() <= 0
+    
+    def record(self, score: float) -> bool:
+        """Count a candidate's ranking score; True when it is the one that meets the quality target"""
+        if not self.min_candidates or score < self.min_score:
+            return False
+        self.qualified += 1
+        return self.qualified == self.min_candidates
+    
+    async def within(self, awaitable: Awaitable[Any], default: Any = None, stage: str = "stage") -> Any:
+        """Await `awaitable` until the deadline; cancels it and returns `default` if the budget runs out"""
+        if self.deadline is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            if not self.expired:
+                raise  # A timeout of the awaitable itself
+            logger.info(f"⏱️  Time budget reached during {stage}, continuing without it")
+            return default
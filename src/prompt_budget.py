@@ -0,0 +1,184 @@
+"""
+Prompt size budgeting and LLM token accounting
+Keeps prompts inside a configured token budget and records token usage per call and per job
+"""
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Llama and GPT tokenizers average roughly 4 characters per token on English text
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead for role and formatting tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Summary appended to a trimmed list field
+MORE_ITEMS_SUFFIX = " (+{count} more)"
+
+# Job the current task is working on (set by the API/Celery entry points)
+_current_job_id: ContextVar[Optional[str]] = ContextVar('llm_current_job_id', default=None)
+
+
+class PromptBudgeter:
+    """Estimates prompt size and trims prompt fields to fit a token budget"""
+    
+    def __init__(self, max_prompt_tokens: int = 1500, max_list_tokens: int = 120):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_list_tokens = max_list_tokens
+    
+    @classmethod
+    def from_config(cls, config: dict) -> 'PromptBudgeter':
+        """Build budgeter from the `llm.prompt_budget` config section"""
+        budget = config.get('llm', {}).get('prompt_budget') or {}
+        return cls(
+            max_prompt_tokens=budget.get('max_prompt_tokens', 1500),
+            max_list_tokens=budget.get('max_list_tokens', 120)
+        )
+    
+    @staticmethod
+    def estimate_tokens(text: Optional[str]) -> int:
+        """Estimate token count for text (no tokenizer needed)"""
+        if not text:
+            return 0
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    
+    def estimate_messages_tokens(self, messages: List[dict]) -> int:
+        """Estimate prompt tokens for a list of chat messages"""
+        return sum(
+            self.estimate_tokens(message.get('content')) + MESSAGE_OVERHEAD_TOKENS
+            for message in messages
+        )
+    
+    def fit_list(self, items: List[str], max_tokens: Optional[int] = None, separator: str = ", ") -> str:
+        """
+        Join list items into a prompt field that fits the token budget.
+        
+        Items are kept in order, so callers should put the most important first.
+        Items that don't fit are summarised as "(+N more)".
+        """
+        budget = max_tokens if max_tokens is not None else self.max_list_tokens
+        
+        costs = [self.estimate_tokens(f"{item}{separator}") for item in items]
+        if sum(costs) <= budget:
+            return separator.join(items)
+        
+        # Leave room for the summary suffix (sized for the most items it could count)
+        available = budget - self.estimate_tokens(MORE_ITEMS_SUFFIX.format(count=len(items)))
+        kept = []
+        used = 0
+        for item, cost in zip(items, costs):
+            # Always keep at least one item
+            if kept and used + cost > available:
+                break
+            kept.append(item)
+            used += cost
+        
+        return separator.join(kept) + MORE_ITEMS_SUFFIX.format(count=len(items) - len(kept))
+    
+    def truncate(self, text: Optional[str], max_tokens: int) -> str:
+        """Truncate free text to roughly max_tokens"""
+        if not text:
+            return ""
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars].rstrip() + "..."
+    
+    def check(self, messages: List[dict]) -> int:
+        """Estimate prompt tokens and warn when the prompt is over budget"""
+        estimate = self.estimate_messages_tokens(messages)
+        if estimate > self.max_prompt_tokens:
+            logger.warning(f"Prompt estimate {estimate} tokens exceeds budget of {self.max_prompt_tokens}")
+        return estimate
+
+
+class TokenUsageTracker:
+    """Records prompt and completion tokens per LLM call and per job (for the max_jobs most recent jobs)"""
+    
+    def __init__(self, max_recent_calls: int = 200, max_jobs: int = 1000):
+        self._lock = threading.Lock()
+        self.totals = self._empty_usage()
+        self.max_jobs = max_jobs
+        self.by_job: 'OrderedDict[str, Dict[str, int]]' = OrderedDict()
+        self.recent_calls = deque(maxlen=max_recent_calls)
+    
+    @staticmethod
+    def _empty_usage() -> Dict[str, int]:
+        return {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    
+    @staticmethod
+    def _add(usage: Dict[str, int], prompt_tokens: int, completion_tokens: int):
+        usage['calls'] += 1
+        usage['prompt_tokens'] += prompt_tokens
+        usage['completion_tokens'] += completion_tokens
+        usage['total_tokens'] += prompt_tokens + completion_tokens
+    
+    def record(self, prompt_tokens: int, completion_tokens: int, model: str = "",
+               purpose: Optional[str] = None, estimated: bool = False, latency: Optional[float] = None,
+               time_to_first_token: Optional[float] = None, tokens_per_second: Optional[float] = None,
+               job_id: Optional[str] = None):
+        """Record token usage for a single LLM call"""
+        job_id = job_id or _current_job_id.get()
+        
+        with self._lock:
+            self._add(self.totals, prompt_tokens, completion_tokens)
+            if job_id:
+                self._add(self.by_job.setdefault(job_id, self._empty_usage()), prompt_tokens, completion_tokens)
+                self.by_job.move_to_end(job_id)
+                while len(self.by_job) > self.max_jobs:
+                    self.by_job.popitem(last=False)
+            self.recent_calls.append({
+                'timestamp': datetime.now().isoformat(),
+                'job_id': job_id,
+                'model': model,
+                'purpose': purpose or 'chat',
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'estimated': estimated,
+                'latency_seconds': round(latency, 3) if latency is not None else None,
+                'time_to_first_token': round(time_to_first_token, 3) if time_to_first_token is not None else None,
+                'tokens_per_second': round(tokens_per_second, 1) if tokens_per_second is not None else None
+            })
+        
+        logger.debug(f"LLM usage ({purpose or 'chat'}): {prompt_tokens} prompt + {completion_tokens} completion tokens")
+    
+    def bind_job(self, job_id: str) -> Token:
+        """Attribute LLM calls in the current task to job_id (for task-scoped coroutines); pass the result to unbind_job"""
+        return _current_job_id.set(job_id)
+    
+    def unbind_job(self, token: Token):
+        """Undo a bind_job when the job's task is done"""
+        _current_job_id.reset(token)
+    
+    @contextmanager
+    def track_job(self, job_id: str):
+        """Attribute LLM calls made inside this block to job_id"""
+        token = _current_job_id.set(job_id)
+        try:
+            yield
+        finally:
+            _current_job_id.reset(token)
+    
+    def get_job_usage(self, job_id: str) -> Dict[str, int]:
+        """Get accumulated token usage for a job"""
+        with self._lock:
+            return dict(self.by_job.get(job_id) or self._empty_usage())
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get process-wide token usage summary"""
+        with self._lock:
+            return {
+                'totals': dict(self.totals),
+                'jobs_tracked': len(self.by_job),
+                'recent_calls': list(self.recent_calls)[-20:]
+            }
+
+
+# Global instance
+token_usage = TokenUsageTracker()
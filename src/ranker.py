@@ -1,6 +1,8 @@
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from src.models import Candidate, JobDescription, RankedCandidate
 from src.llm_provider import LLMProvider
+from src.tracing import tracer
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,77 +48,119 @@ class CandidateRanker:
         
         return 1.0 if job.location.lower() in candidate.location.lower() else 0.3
     
-    def _get_ai_reasoning(self, job: JobDescription, candidate: Candidate, scores: Dict[str, float]) -> str:
-        """Get AI-generated reasoning for the match"""
-        prompt = f"""Analyze this candidate match:
+    def _build_reasoning_prompt(self, job: JobDescription, candidate: Candidate, scores: Dict[str, Any]) -> str:
+        """Build the prompt for AI match reasoning"""
+        budgeter = self.llm_provider.prompt_budgeter
+        return f"""Analyze this candidate match:
 
 Job: {job.title}
-Required Skills: {', '.join(job.required_skills)}
+Required Skills: {budgeter.fit_list(job.required_skills)}
 Experience: {job.experience_years} years
 
 Candidate: {candidate.name}
-Skills: {', '.join(candidate.skills)}
+Skills: {budgeter.fit_list(candidate.skills)}
 Experience: {candidate.experience_years} years
 
 Match Scores:
-- Skills: {scores['skills_match']:.2f}
-- Experience: {scores['experience_match']:.2f}
-- Location: {scores['location_match']:.2f}
+- Skills: {scores.get('skills_match', 0):.2f}
+- Experience: {scores.get('experience_match', 0):.2f}
+- Location: {scores.get('location_match', 0):.2f}
 
 Provide a brief 2-3 sentence reasoning for this match."""
-
-        messages = [{"role": "user", "content": prompt}]
-        return self.llm_provider.chat_completion(messages, max_tokens=150)
     
-    def rank_candidates(self, job: JobDescription, candidates: List[Candidate], top_n: int = 20) -> List[RankedCandidate]:
-        """Rank candidates and return top N using enhanced scoring"""
+    def _get_ai_reasoning(self, job: JobDescription, candidate: Candidate, scores: Dict[str, float]) -> str:
+        """Get AI-generated reasoning for the match"""
+        messages = [{"role": "user", "content": self._build_reasoning_prompt(job, candidate, scores)}]
+        with tracer.span("reasoning", candidate=candidate.id):
+            return self.llm_provider.chat_completion(messages, max_tokens=150, purpose="candidate_reasoning")
+    
+    async def stream_ai_reasoning(self, job: JobDescription, candidate: Candidate, scores: Dict[str, Any],
+                                  on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """Stream AI-generated reasoning, reporting the partial text as chunks arrive"""
+        messages = [{"role": "user", "content": self._build_reasoning_prompt(job, candidate, scores)}]
+        
+        text = ""
+        with tracer.span("reasoning", candidate=candidate.id, streamed=True):
+            async for chunk in self.llm_provider.stream_chat_completion(messages, max_tokens=150, purpose="candidate_reasoning"):
+                text += chunk
+                if on_partial:
+                    on_partial(text)
+        
+        return text.strip()
+    
+    def score_candidate(self, job: JobDescription, candidate: Candidate) -> Tuple[float, Dict[str, float]]:
+        """Weighted match score (0-1) and its breakdown, without AI reasoning"""
+        # Use keyword and semantic scores from matcher if available
+        keyword_score = getattr(candidate, 'keyword_match_score', None)
+        semantic_score = getattr(candidate, 'semantic_match_score', None)
+        
+        scores = {
+            'skills_match': self._calculate_skills_match(job, candidate),
+            'experience_match': self._calculate_experience_match(job, candidate),
+            'location_match': self._calculate_location_match(job, candidate),
+            'education_match': 0.7,  # Simplified
+            'availability': 0.8  # Simplified
+        }
+        
+        # Add keyword and semantic scores if available
+        if keyword_score is not None:
+            scores['keyword_match'] = keyword_score
+        if semantic_score is not None:
+            scores['semantic_match'] = semantic_score
+        
+        # Calculate weighted score
+        total_score = sum(scores[k] * self.weights.get(k, 0.1) for k in scores.keys())
+        
+        # Normalize to 0-1 range
+        return min(1.0, total_score), scores
+    
+    def rank_candidates(self, job: JobDescription, candidates: List[Candidate], top_n: int = 20,
+                        time_budget: Optional[float] = None, reasoning: bool = True) -> List[RankedCandidate]:
+        """
+        Rank candidates and return top N using enhanced scoring
+        
+        time_budget, if given, caps the seconds spent on AI reasoning; candidates
+        left when it runs out get the score summary instead. With reasoning=False
+        every candidate gets the score summary, for callers that add (or stream)
+        AI reasoning for the top candidates themselves.
+        """
         logger.info(f"Ranking {len(candidates)} candidates")
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
         
         ranked = []
-        for candidate in candidates:
-            # Use keyword and semantic scores from matcher if available
-            keyword_score = getattr(candidate, 'keyword_match_score', None)
-            semantic_score = getattr(candidate, 'semantic_match_score', None)
-            
-            scores = {
-                'skills_match': self._calculate_skills_match(job, candidate),
-                'experience_match': self._calculate_experience_match(job, candidate),
-                'location_match': self._calculate_location_match(job, candidate),
-                'education_match': 0.7,  # Simplified
-                'availability': 0.8  # Simplified
-            }
-            
-            # Add keyword and semantic scores if available
-            if keyword_score is not None:
-                scores['keyword_match'] = keyword_score
-            if semantic_score is not None:
-                scores['semantic_match'] = semantic_score
-            
-            # Calculate weighted score
-            total_score = sum(scores[k] * self.weights.get(k, 0.1) for k in scores.keys())
-            
-            # Normalize to 0-1 range
-            total_score = min(1.0, total_score)
+        with tracer.span("ranking", candidates=len(candidates), top_n=top_n):
+            for candidate in candidates:
+                total_score, scores = self.score_candidate(job, candidate)
+                
+                # Get AI reasoning
+                if reasoning and (deadline is None or time.monotonic() < deadline):
+                    text = self._get_ai_reasoning(job, candidate, scores)
+                else:
+                    text = self._score_summary(total_score, scores)
+                
+                ranked_candidate = RankedCandidate(
+                    candidate=candidate,
+                    match_score=total_score,
+                    match_breakdown=scores,
+                    reasoning=text
+                )
+                ranked.append(ranked_candidate)
             
-            # Get AI reasoning
-            reasoning = self._get_ai_reasoning(job, candidate, scores)
-            
-            ranked_candidate = RankedCandidate(
-                candidate=candidate,
-                match_score=total_score,
-                match_breakdown=scores,
-                reasoning=reasoning
-            )
-            ranked.append(ranked_candidate)
-        
-        # Sort by score descending
-        ranked.sort(key=lambda x: x.match_score, reverse=True)
+            # Sort by score descending
+            ranked.sort(key=lambda x: x.match_score, reverse=True)
         
+        if reasoning and deadline is not None and time.monotonic() >= deadline:
+            logger.info("⏱️  Time budget reached during AI reasoning, remaining candidates use score summaries")
         logger.info(f"Returning top {top_n} candidates")
         if ranked:
             logger.info(f"Top 3 scores: {[f'{r.candidate.name}: {r.match_score:.2f}' for r in ranked[:3]]}")
         return ranked[:top_n]
     
+    @staticmethod
+    def _score_summary(total_score: float, scores: Dict[str, float]) -> str:
+        """Reasoning text without LLM"""
+        return f"Match: {int(total_score*100)}% - Skills: {int(scores['skills_match']*100)}%, Experience: {int(scores['experience_match']*100)}%, Location: {int(scores['location_match']*100)}%"
+    
     def rank_candidates_simple(self, job: JobDescription, candidates: List[Candidate], top_n: int = 50) -> List[RankedCandidate]:
         """Rank candidates WITHOUT expensive LLM calls - much faster"""
         logger.info(f"Ranking {len(candidates)} candidates (simple mode - no LLM)")
@@ -135,7 +179,7 @@ Provide a brief 2-3 sentence reasoning for this match."""
             total_score = min(1.0, total_score)
             
             # Simple reasoning without LLM
-            reasoning = f"Match: {int(total_score*100)}% - Skills: {int(scores['skills_match']*100)}%, Experience: {int(scores['experience_match']*100)}%, Location: {int(scores['location_match']*100)}%"
+            reasoning = self._score_summary(total_score, scores)
             
             ranked_candidate = RankedCandidate(
                 candidate=candidate,
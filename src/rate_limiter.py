@@ -0,0 +1,228 @@
+"""
+Adaptive per-host rate limiting
+Token buckets keyed by host that slow down or speed up from what each site reports about its quota
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """A host's next request slot is further away than the caller may wait"""
+    
+    def __init__(self, key: str, wait: float):
+        super().__init__(f"{key} is rate limited for another {wait:.0f}s")
+        self.key = key
+        self.wait = wait
+
+
+class TokenBucket:
+    """
+    Token bucket as a reservation schedule (GCRA), so callers on any event
+    loop or thread can share it: reserve() books the next slot and returns
+    how long to wait for it.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.blocked_until = 0.0
+        self._tat = 0.0  # Theoretical arrival time of the next request
+    
+    def reserve(self, now: float, max_wait: Optional[float] = None) -> Optional[float]:
+        """Book the next slot and return the wait for it, or None (nothing booked) if it exceeds max_wait"""
+        interval = 1.0 / self.rate
+        tat = max(self._tat, now, self.blocked_until)
+        start = max(now, self.blocked_until, tat - (self.burst - 1) * interval)
+        if max_wait is not None and start - now > max_wait:
+            return None
+        self._tat = tat + interval
+        return start - now
+    
+    def block(self, until: float):
+        """Hold every request until `until`"""
+        self.blocked_until = max(self.blocked_until, until)
+    
+    @property
+    def blocked_for(self) -> float:
+        return max(0.0, self.blocked_until - time.monotonic())
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostRateLimiter:
+    """
+    Shared rate limiter for scraper requests, one token bucket per host.
+    
+    Buckets start at their configured rate and adapt to responses:
+    X-RateLimit-Remaining/Reset spread what is left of a quota once it runs
+    low, StackExchange `backoff` and `quota_remaining` are honoured, and 429s
+    (or 403s with no quota left) halve the rate and pause the host for
+    Retry-After. Successful responses recover the rate towards its maximum.
+    Configured keys may be a host or a host/path prefix, for APIs with
+    separate limits per endpoint (e.g. api.github.com/search).
+    """
+    
+    def __init__(self):
+        self.default_rate = 0.5
+        self.default_burst = 1
+        self.hosts: Dict[str, Dict[str, float]] = {}
+        self.min_rate = 0.02
+        self.reserve_fraction = 0.2
+        self.max_wait = 30.0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, config: dict):
+        """Apply the `scraping.rate_limits` config section"""
+        scraping = config.get('scraping') or {}
+        rate_limits = scraping.get('rate_limits') or {}
+        default = rate_limits.get('default') or {}
+        # Without explicit limits, pace like the old fixed rate_limit_delay
+        delay = scraping.get('rate_limit_delay', 2) or 2
+        self.default_rate = default.get('rate', 1.0 / delay)
+        self.default_burst = default.get('burst', 1)
+        self.hosts = rate_limits.get('hosts') or {}
+        self.min_rate = rate_limits.get('min_rate', self.min_rate)
+        self.reserve_fraction = rate_limits.get('reserve_fraction', self.reserve_fraction)
+        # Never wait longer for a slot than a scrape may take overall
+        self.max_wait = rate_limits.get('max_wait', scraping.get('timeout_seconds', self.max_wait))
+        with self._lock:
+            self._buckets.clear()
+    
+    def _key(self, url: str) -> str:
+        parsed = urlsplit(url if "://" in url else f"//{url}")
+        host = (parsed.hostname or url).lower()
+        target = f"{host}{parsed.path}"
+        # Longest configured prefix wins, falling back to the bare host
+        matches = [k for k in self.hosts if target == k or target.startswith(f"{k.rstrip('/')}/")]
+        return max(matches, key=len) if matches else host
+    
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limits = self.hosts.get(key) or {}
+            bucket = TokenBucket(limits.get('rate', self.default_rate), limits.get('burst', self.default_burst))
+            self._buckets[key] = bucket
+        return bucket
+    
+    async def acquire(self, url: str):
+        """
+        Wait for this host's next request slot (`url` may be a full URL or a host).
+        
+        Raises RateLimitExceeded, without booking a slot, when the wait would be
+        longer than max_wait (e.g. a quota that only resets in an hour).
+        """
+        key = self._key(url)
+        with self._lock:
+            bucket = self._bucket(key)
+            now = time.monotonic()
+            wait = bucket.reserve(now, self.max_wait)
+            if wait is None:
+                raise RateLimitExceeded(key, max(bucket.blocked_until - now, 1.0 / bucket.rate))
+        if wait > 0:
+            logger.debug(f"Rate limiting {key}: waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+    
+    def _set_rate(self, bucket: TokenBucket, rate: float):
+        bucket.rate = min(bucket.max_rate, max(self.min_rate, rate))
+    
+    def update(self, url: str, status: int, headers: Optional[Dict[str, str]] = None,
+               data: Optional[Dict[str, Any]] = None):
+        """Adapt the host's rate from a response's status, headers and (StackExchange) body"""
+        headers = headers or {}
+        key = self._key(url)
+        now = time.monotonic()
+        
+        remaining = _number(_header(headers, 'x-ratelimit-remaining'))
+        limit = _number(_header(headers, 'x-ratelimit-limit'))
+        reset = _number(_header(headers, 'x-ratelimit-reset'))  # Epoch seconds
+        reset_in = max(1.0, reset - time.time()) if reset is not None else None
+        retry_after = _number(_header(headers, 'retry-after'))
+        
+        with self._lock:
+            bucket = self._bucket(key)
+            
+            if status == 429 or (status == 403 and remaining == 0):
+                self._set_rate(bucket, bucket.rate / 2)
+                pause = retry_after or reset_in or 1.0 / bucket.rate
+                bucket.block(now + pause)
+                logger.warning(f"{key} is throttling requests (HTTP {status}), pausing {pause:.0f}s "
+                               f"and slowing to {bucket.rate:.2f} req/s")
+                return
+            
+            if retry_after:
+                bucket.block(now + retry_after)
+            
+            if remaining is not None and reset_in is not None:
+                if remaining <= 0:
+                    bucket.block(now + reset_in)
+                    logger.warning(f"{key} quota exhausted, pausing {reset_in:.0f}s until it resets")
+                elif limit and remaining > limit * self.reserve_fraction:
+                    self._recover(bucket)
+                else:
+                    # Quota is running low: spread what is left until the reset
+                    self._set_rate(bucket, remaining / reset_in)
+            elif data:
+                self._update_stackexchange(key, bucket, now, data)
+            elif 200 <= status < 400:
+                self._recover(bucket)
+    
+    def _recover(self, bucket: TokenBucket):
+        """Additive increase back towards the configured rate"""
+        if bucket.rate < bucket.max_rate:
+            self._set_rate(bucket, bucket.rate + bucket.max_rate * 0.1)
+    
+    def _update_stackexchange(self, key: str, bucket: TokenBucket, now: float, data: Dict[str, Any]):
+        backoff = _number(data.get('backoff'))
+        if backoff:
+            # The API rejects further calls to the method until the backoff has passed
+            bucket.block(now + backoff)
+            logger.info(f"{key} asked to back off for {backoff:.0f}s")
+        
+        quota_remaining = _number(data.get('quota_remaining'))
+        quota_max = _number(data.get('quota_max'))
+        if quota_remaining is None:
+            self._recover(bucket)
+        elif quota_remaining <= 0:
+            # Daily quota, reset at midnight UTC
+            utc_now = datetime.now(timezone.utc)
+            midnight = (utc_now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            bucket.block(now + (midnight - utc_now).total_seconds())
+            logger.warning(f"{key} daily quota exhausted, pausing until midnight UTC")
+        elif quota_max and quota_remaining < quota_max * self.reserve_fraction:
+            self._set_rate(bucket, bucket.max_rate * quota_remaining / (quota_max * self.reserve_fraction))
+        else:
+            self._recover(bucket)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Current rate and pause per bucket"""
+        with self._lock:
+            return {
+                key: {'rate': round(bucket.rate, 3), 'max_rate': bucket.max_rate,
+                      'paused_seconds': round(bucket.blocked_for, 1)}
+                for key, bucket in self._buckets.items()
+            }
+
+
+# Global instance
+rate_limiter = HostRateLimiter()
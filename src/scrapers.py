@@ -1,7 +1,7 @@
 import asyncio
 import aiohttp
 import ssl
-from typing import List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -11,12 +11,17 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from src.models import Candidate, JobDescription
+from src.tracing import tracer
+from src.http_client import get_http_session
+from src.http_cache import http_cache
+from src.rate_limiter import RateLimitExceeded, rate_limiter
+from src.page_snapshot import first_link, first_text, all_texts, first_attr, snapshot_cards
 import logging
 import hashlib
 import time
 import re
 import os
-from urllib.parse import quote_plus, urlencode
+from urllib.parse import quote, quote_plus, urlencode
 
 import undetected_chromedriver as uc
 
@@ -25,13 +30,16 @@ logger = logging.getLogger(__name__)
 class BasePortalScraper:
     """Base class for job portal scrapers"""
     
+    # Query planning (see PortalScraperManager.plan_queries)
+    uses_title = True  # False when the search ignores the job title
+    max_titles_per_query = 1  # >1 when several titles can be OR-ed into one search (scrape() then gets the titles)
+    
     def __init__(self, portal_name: str, base_url: str, config: dict):
         self.portal_name = portal_name
         self.base_url = base_url
         self.config = config
         self.max_candidates = config['scraping']['max_candidates_per_portal']
         self.timeout = config['scraping']['timeout_seconds']
-        self.rate_limit_delay = config['scraping'].get('rate_limit_delay', 2)
     
     def _get_driver(self, headless: bool = True, use_profile: bool = False):
         """Create Selenium WebDriver with anti-detection and optional profile"""
@@ -72,6 +80,28 @@ class BasePortalScraper:
         match = re.search(phone_pattern, text)
         return match.group(0) if match else None
     
+    def query_key(self, job_description: JobDescription) -> tuple:
+        """
+        Search inputs other than the title.
+        
+        Job descriptions with the same key can share a query.
+        """
+        return (
+            tuple(skill.lower() for skill in job_description.required_skills),
+            (job_description.location or "").lower(),
+            job_description.experience_years
+        )
+    
+    def merge_titles(self, titles: List[str]) -> str:
+        """Combine job titles into one search string"""
+        return " OR ".join(f'"{title}"' for title in titles)
+    
+    @staticmethod
+    def titles_in(headline: str, titles: List[str]) -> List[str]:
+        """Titles whose words all appear in a profile headline"""
+        headline = headline.lower()
+        return [title for title in titles if all(word in headline for word in title.lower().split())]
+    
     async def scrape(self, job_description: JobDescription) -> List[Candidate]:
         """Override in subclass"""
         raise NotImplementedError
@@ -79,6 +109,13 @@ class BasePortalScraper:
 class LinkedInScraper(BasePortalScraper):
     """Real LinkedIn scraper using Selenium (most reliable)"""
     
+    # People search accepts boolean keywords; longer OR chains dilute relevance
+    max_titles_per_query = 3
+    
+    def query_key(self, job_description: JobDescription) -> tuple:
+        # People search uses only the title and location
+        return ((job_description.location or "").lower(),)
+    
     # Class-level shared browser instance
     _shared_driver = None
     _is_logged_in = False
@@ -125,16 +162,21 @@ class LinkedInScraper(BasePortalScraper):
             cls._is_logged_in = False
             logger.info("✓ Browser closed")
     
-    async def scrape(self, job_description: JobDescription) -> List[Candidate]:
-        """Scrape LinkedIn for candidates"""
+    async def scrape(self, job_description: JobDescription, titles: Optional[List[str]] = None) -> List[Candidate]:
+        """
+        Scrape LinkedIn for candidates
+        
+        When several titles were merged into the query's title, `titles` holds
+        them as readable text for the candidates' titles and summaries.
+        """
         logger.info(f"Scraping LinkedIn for: {job_description.title}")
         
         # Use Selenium as primary method (most reliable)
-        return await self._scrape_with_selenium(job_description)
+        return await self._scrape_with_selenium(job_description, titles or [job_description.title])
     
 
     
-    async def _scrape_with_selenium(self, job_description: JobDescription) -> List[Candidate]:
+    async def _scrape_with_selenium(self, job_description: JobDescription, titles: List[str]) -> List[Candidate]:
         """Scrape LinkedIn with Selenium - optimized for people search"""
         candidates = []
         driver = None
@@ -236,23 +278,17 @@ class LinkedInScraper(BasePortalScraper):
                 await asyncio.sleep(2)
                 logger.info(f"Scroll {i+1}/3 complete")
             
-            # Find all profile cards - try multiple selectors
-            profile_cards = []
+            # Read all profile cards in one call - try multiple selectors
             selectors_to_try = [
                 "li.reusable-search__result-container",  # New LinkedIn structure
                 "[data-chameleon-result-urn]",  # Old structure
                 "div.entity-result",  # Alternative
                 "li[class*='search-result']",  # Fallback
             ]
-            
-            for selector in selectors_to_try:
-                try:
-                    profile_cards = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if len(profile_cards) > 0:
-                        logger.info(f"Found {len(profile_cards)} profile cards using selector: {selector}")
-                        break
-                except:
-                    continue
+            parse_started = time.perf_counter()
+            selector, profile_cards = snapshot_cards(driver, selectors_to_try)
+            if profile_cards:
+                logger.info(f"Found {len(profile_cards)} profile cards using selector: {selector}")
             
             if not profile_cards:
                 logger.warning("⚠️  No profile cards found with any selector")
@@ -269,67 +305,37 @@ class LinkedInScraper(BasePortalScraper):
                 
                 try:
                     # Extract name - try multiple selectors
-                    name = "LinkedIn User"
-                    name_selectors = [
+                    name = first_text(card, [
                         "span.entity-result__title-text a span[aria-hidden='true']",  # New structure
                         ".entity-result__title-text span[aria-hidden='true']",
                         "a.app-aware-link span[aria-hidden='true']",
                         "span[dir='ltr'] span[aria-hidden='true']",
                         ".entity-result__title-text span",
                         "a span[dir='ltr']",
-                    ]
-                    for name_selector in name_selectors:
-                        try:
-                            name_elem = card.find_element(By.CSS_SELECTOR, name_selector)
-                            name_text = name_elem.text.strip()
-                            if name_text and len(name_text) > 2 and not name_text.startswith("View"):
-                                name = name_text
-                                break
-                        except:
-                            continue
+                    ], accept=lambda text: len(text) > 2 and not text.startswith("View")) or "LinkedIn User"
                     
                     # Extract title/headline - try multiple selectors
-                    title = job_description.title
-                    for title_selector in [
+                    headline = first_text(card, [
                         ".entity-result__primary-subtitle",
                         "[class*='primary-subtitle']",
                         "div[class*='subtitle'] div:first-child"
-                    ]:
-                        try:
-                            title_elem = card.find_element(By.CSS_SELECTOR, title_selector)
-                            title_text = title_elem.text.strip()
-                            if title_text:
-                                title = title_text
-                                break
-                        except:
-                            continue
+                    ])
+                    title = headline or titles[0]
                     
                     # Extract location - try multiple selectors
-                    location = job_description.location or ""
-                    for loc_selector in [
+                    location = first_text(card, [
                         ".entity-result__secondary-subtitle",
                         "[class*='secondary-subtitle']",
                         "div[class*='subtitle'] div:nth-child(2)"
-                    ]:
-                        try:
-                            location_elem = card.find_element(By.CSS_SELECTOR, loc_selector)
-                            loc_text = location_elem.text.strip()
-                            if loc_text:
-                                location = loc_text
-                                break
-                        except:
-                            continue
+                    ]) or job_description.location or ""
                     
                     # Extract profile URL
-                    profile_url = f"https://www.linkedin.com/search/results/people/?keywords={keywords}"
-                    try:
-                        profile_link = card.find_element(By.CSS_SELECTOR, "a[href*='/in/']")
-                        profile_url = profile_link.get_attribute("href")
+                    profile_url = first_link(card, ["a[href*='/in/']"], "https://www.linkedin.com")
+                    if profile_url:
                         # Clean URL
-                        if "?" in profile_url:
-                            profile_url = profile_url.split("?")[0]
-                    except:
-                        pass
+                        profile_url = profile_url.split("?")[0]
+                    else:
+                        profile_url = f"https://www.linkedin.com/search/results/people/?keywords={keywords}"
                     
                     # Extract profile ID for unique identification
                     profile_id = profile_url.split("/in/")[-1].rstrip("/") if "/in/" in profile_url else f"user_{i}"
@@ -343,18 +349,20 @@ class LinkedInScraper(BasePortalScraper):
                         location=location,
                         profile_url=profile_url,
                         source_portal="linkedin",
-                        summary=f"Found via LinkedIn search for: {job_description.title}"
+                        summary=f"Found via LinkedIn search for: {', '.join(titles)}",
+                        # Only the headline says which title matched; the summary lists them all
+                        matched_titles=(self.titles_in(headline, titles) or list(titles)) if headline else None
                     )
                     
                     candidates.append(candidate)
                     logger.info(f"  {i+1}. {name} - {title}")
                     
-                    await asyncio.sleep(1)  # Rate limiting
-                    
                 except Exception as e:
                     logger.error(f"Error extracting profile {i}: {e}")
                     continue
             
+            logger.info(f"Extracted {len(candidates)} LinkedIn profiles in {(time.perf_counter() - parse_started) * 1000:.0f} ms")
+            
         except Exception as e:
             logger.error(f"LinkedIn scraping error: {e}")
         finally:
@@ -404,6 +412,7 @@ class IndeedScraper(BasePortalScraper):
                     
                     # Try to get job description
                     try:
+                        await rate_limiter.acquire(driver.current_url)
                         card.click()
                         await asyncio.sleep(1)
                         description_elem = driver.find_element(By.ID, "jobDescriptionText")
@@ -435,8 +444,6 @@ class IndeedScraper(BasePortalScraper):
                     )
                     candidates.append(candidate)
                     
-                    await asyncio.sleep(self.rate_limit_delay)
-                    
                 except Exception as e:
                     logger.error(f"Error extracting Indeed job: {e}")
                     continue
@@ -475,6 +482,11 @@ class GlassdoorScraper(BasePortalScraper):
             for i, card in enumerate(job_cards[:self.max_candidates]):
                 try:
                     # Click to view details
+                    try:
+                        await rate_limiter.acquire(driver.current_url)
+                    except RateLimitExceeded as e:
+                        logger.warning(f"Stopping Glassdoor extraction: {e}")
+                        break
                     card.click()
                     await asyncio.sleep(2)
                     
@@ -507,8 +519,6 @@ class GlassdoorScraper(BasePortalScraper):
                     )
                     candidates.append(candidate)
                     
-                    await asyncio.sleep(self.rate_limit_delay)
-                    
                 except Exception as e:
                     logger.error(f"Error extracting Glassdoor job: {e}")
                     continue
@@ -525,58 +535,159 @@ class GlassdoorScraper(BasePortalScraper):
 class GitHubJobsScraper(BasePortalScraper):
     """Scrape GitHub for developer profiles"""
     
+    uses_title = False
+    
+    API_URL = "https://api.github.com"
+    SEARCH_PAGE_SIZE = 30
+    USER_FIELDS = "login name email bio location url followers { totalCount } repositories(ownerAffiliations: OWNER) { totalCount }"
+    
+    def __init__(self, portal_name: str, base_url: str, config: dict):
+        super().__init__(portal_name, base_url, config)
+        github = config['scraping'].get('github') or {}
+        self.results_per_skill = github.get('results_per_skill', 40)
+        self.detail_concurrency = github.get('detail_concurrency', 10)
+        self.graphql_batch_size = github.get('graphql_batch_size', 50)
+        # A token lifts the search rate limit and enables batched GraphQL lookups
+        self.token = os.getenv('GITHUB_TOKEN')
+    
+    def query_key(self, job_description: JobDescription) -> tuple:
+        # Searches by the first 3 skills only
+        return tuple(skill.lower() for skill in job_description.required_skills[:3])
+    
+    def _headers(self) -> Dict[str, str]:
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        return headers
+    
+    async def _search_page(self, session: aiohttp.ClientSession, skill: str, page: int) -> List[str]:
+        """Logins on one page of user search results"""
+        search_url = (f"{self.API_URL}/search/users?q={quote_plus(skill)}+type:user"
+                      f"&per_page={self.SEARCH_PAGE_SIZE}&page={page}")
+        response = await http_cache.get_json(session, search_url, headers=self._headers())
+        if response.status != 200:
+            logger.warning(f"GitHub search for '{skill}' page {page} returned HTTP {response.status}")
+            return []
+        return [user['login'] for user in response.data.get('items', [])]
+    
+    async def _search_logins(self, session: aiohttp.ClientSession, skill: str) -> List[str]:
+        """Logins matching a skill, fetching every results page at once"""
+        pages = max(1, -(-self.results_per_skill // self.SEARCH_PAGE_SIZE))
+        results = await asyncio.gather(
+            *(self._search_page(session, skill, page) for page in range(1, pages + 1)),
+            return_exceptions=True
+        )
+        logins = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error searching GitHub for '{skill}': {result}")
+            else:
+                logins.extend(result)
+        return logins[:self.results_per_skill]
+    
+    async def _hydrate_graphql(self, session: aiohttp.ClientSession, logins: List[str]) -> Dict[str, Dict]:
+        """User details for many logins, one GraphQL query per batch (needs a token)"""
+        async def fetch_batch(batch: List[str]) -> Dict[str, Dict]:
+            variables = {f"l{i}": login for i, login in enumerate(batch)}
+            query = "query({}) {{ {} }}".format(
+                ", ".join(f"${name}: String!" for name in variables),
+                " ".join(f"u{i}: user(login: $l{i}) {{ {self.USER_FIELDS} }}" for i in range(len(batch)))
+            )
+            await rate_limiter.acquire(f"{self.API_URL}/graphql")
+            async with session.post(f"{self.API_URL}/graphql", json={'query': query, 'variables': variables},
+                                    headers=self._headers()) as response:
+                rate_limiter.update(f"{self.API_URL}/graphql", response.status, dict(response.headers))
+                if response.status != 200:
+                    raise RuntimeError(f"GitHub GraphQL returned HTTP {response.status}")
+                data = (await response.json()).get('data') or {}
+            
+            users = {}
+            for user in data.values():
+                if user:
+                    users[user['login'].lower()] = {
+                        'login': user['login'],
+                        'name': user.get('name'),
+                        'email': user.get('email') or None,
+                        'bio': user.get('bio'),
+                        'location': user.get('location'),
+                        'html_url': user['url'],
+                        'public_repos': user['repositories']['totalCount'],
+                        'followers': user['followers']['totalCount']
+                    }
+            return users
+        
+        batches = [logins[i:i + self.graphql_batch_size] for i in range(0, len(logins), self.graphql_batch_size)]
+        users = {}
+        for result in await asyncio.gather(*(fetch_batch(b) for b in batches)):
+            users.update(result)
+        return users
+    
+    async def _hydrate_rest(self, session: aiohttp.ClientSession, logins: List[str]) -> Dict[str, Dict]:
+        """User details for many logins over REST, a bounded number at a time"""
+        semaphore = asyncio.Semaphore(self.detail_concurrency)
+        
+        async def fetch_user(login: str) -> Optional[Dict]:
+            async with semaphore:
+                try:
+                    response = await http_cache.get_json(session, f"{self.API_URL}/users/{login}", headers=self._headers())
+                    if response.status == 200:
+                        return response.data
+                    logger.warning(f"GitHub user {login} returned HTTP {response.status}")
+                except Exception as e:
+                    logger.error(f"Error fetching GitHub user: {e}")
+                return None
+        
+        users = await asyncio.gather(*(fetch_user(login) for login in logins))
+        return {user['login'].lower(): user for user in users if user}
+    
+    def _to_candidate(self, user_data: Dict, skills: List[str]) -> Candidate:
+        # Ensure name is not None
+        name = user_data.get('name') or user_data.get('login') or 'GitHub User'
+        
+        return Candidate(
+            id=hashlib.md5(f"github_{user_data['login']}".encode()).hexdigest(),
+            name=name,
+            email=user_data.get('email'),
+            current_title=user_data.get('bio') or 'Developer',
+            skills=skills,
+            location=user_data.get('location') or '',
+            profile_url=user_data['html_url'],
+            source_portal="github",
+            summary=f"GitHub: {user_data.get('public_repos', 0)} repos, {user_data.get('followers', 0)} followers"
+        )
+    
     async def scrape(self, job_description: JobDescription) -> List[Candidate]:
         logger.info(f"Scraping GitHub for: {job_description.title}")
         candidates = []
         
         try:
-            # Create SSL context that doesn't verify certificates (for development)
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            session = get_http_session(self.config)
             
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                # Search for users with relevant skills
-                for skill in job_description.required_skills[:3]:
-                    search_url = f"https://api.github.com/search/users?q={quote_plus(skill)}+type:user&per_page=30"
-                    
-                    async with session.get(search_url) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            
-                            for user in data.get('items', [])[:20]:
-                                try:
-                                    # Get user details
-                                    user_url = user['url']
-                                    async with session.get(user_url) as user_response:
-                                        if user_response.status == 200:
-                                            user_data = await user_response.json()
-                                            
-                                            # Ensure name is not None
-                                            name = user_data.get('name') or user_data.get('login') or 'GitHub User'
-                                            
-                                            candidate = Candidate(
-                                                id=hashlib.md5(f"github_{user_data['login']}".encode()).hexdigest(),
-                                                name=name,
-                                                email=user_data.get('email'),
-                                                current_title=user_data.get('bio') or 'Developer',
-                                                skills=[skill],
-                                                location=user_data.get('location') or '',
-                                                profile_url=user_data['html_url'],
-                                                source_portal="github",
-                                                summary=f"GitHub: {user_data.get('public_repos', 0)} repos, {user_data.get('followers', 0)} followers"
-                                            )
-                                            candidates.append(candidate)
-                                    
-                                    await asyncio.sleep(1)  # Rate limiting
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error fetching GitHub user: {e}")
-                                    continue
-                    
-                    await asyncio.sleep(2)
+            # Search for users with relevant skills (all skills and pages at once)
+            skills = job_description.required_skills[:3]
+            results = await asyncio.gather(*(self._search_logins(session, skill) for skill in skills))
+            
+            # Each user is fetched once, with every skill they were found for
+            user_skills: Dict[str, List[str]] = {}
+            for skill, logins in zip(skills, results):
+                for login in logins:
+                    user_skills.setdefault(login, []).append(skill)
+            logins = list(user_skills)[:self.max_candidates]
+            
+            with tracer.span("github_hydration", users=len(logins), graphql=bool(self.token)):
+                users = {}
+                if self.token and logins:
+                    try:
+                        users = await self._hydrate_graphql(session, logins)
+                    except Exception as e:
+                        logger.warning(f"GitHub GraphQL lookup failed, falling back to REST: {e}")
+                if not users and logins:
+                    users = await self._hydrate_rest(session, logins)
+            
+            for login in logins:
+                user_data = users.get(login.lower())
+                if user_data:
+                    candidates.append(self._to_candidate(user_data, user_skills[login]))
         
         except Exception as e:
             logger.error(f"GitHub scraping error: {e}")
@@ -587,41 +698,168 @@ class GitHubJobsScraper(BasePortalScraper):
 class StackOverflowScraper(BasePortalScraper):
     """Scrape StackOverflow for developer profiles"""
     
+    uses_title = False
+    
+    API_URL = "https://api.stackexchange.com/2.3"
+    USERS_PER_BATCH = 100  # Max ids per /users/{ids} call
+    # Fields kept by the custom response filter (wrapper, user, top-answerer)
+    FILTER_FIELDS = [
+        ".items", ".has_more", ".backoff", ".quota_remaining", ".quota_max",
+        "user.user_id", "user.display_name", "user.reputation", "user.location", "user.link", "user.badge_counts",
+        "badge_count.gold", "tag_score.user", "tag_score.score", "shallow_user.user_id"
+    ]
+    _filter: Optional[str] = None  # Created once per process
+    
+    def __init__(self, portal_name: str, base_url: str, config: dict):
+        super().__init__(portal_name, base_url, config)
+        stackoverflow = config['scraping'].get('stackoverflow') or {}
+        self.skills_limit = stackoverflow.get('skills', 3)
+        self.search_pages = stackoverflow.get('search_pages', 2)
+        self.page_size = stackoverflow.get('page_size', 50)
+        self.answerer_periods = stackoverflow.get('answerer_periods', ['all_time', 'month'])
+        if stackoverflow.get('filter'):
+            StackOverflowScraper._filter = stackoverflow['filter']
+        # A key raises the daily quota from 300 to 10,000 requests
+        self.api_key = os.getenv('STACKEXCHANGE_KEY')
+    
+    def query_key(self, job_description: JobDescription) -> tuple:
+        # Searches by the first few skills only
+        return tuple(skill.lower() for skill in job_description.required_skills[:self.skills_limit])
+    
+    @staticmethod
+    def _tag(skill: str) -> str:
+        return skill.strip().lower().replace(' ', '-')
+    
+    def _params(self, **params) -> Dict[str, Any]:
+        params['site'] = 'stackoverflow'
+        if self.api_key:
+            params['key'] = self.api_key
+        if self._filter:
+            params['filter'] = self._filter
+        return params
+    
+    async def _get(self, session: aiohttp.ClientSession, path: str, **params) -> List[Dict]:
+        """Items of one API call, or [] on error"""
+        response = await http_cache.get_json(session, f"{self.API_URL}{path}", params=self._params(**params))
+        if response.status != 200:
+            logger.warning(f"StackExchange {path} returned HTTP {response.status}")
+            return []
+        return response.data.get('items', [])
+    
+    async def _ensure_filter(self, session: aiohttp.ClientSession):
+        """Create the custom filter that trims responses to the fields we read"""
+        if StackOverflowScraper._filter:
+            return
+        try:
+            response = await http_cache.get_json(session, f"{self.API_URL}/filters/create", params={
+                'include': ";".join(self.FILTER_FIELDS), 'base': 'none', 'unsafe': 'false'
+            })
+            if response.status == 200 and response.data.get('items'):
+                StackOverflowScraper._filter = response.data['items'][0]['filter']
+                return
+            logger.warning(f"Could not create StackExchange filter (HTTP {response.status}), using default fields")
+        except Exception as e:
+            logger.warning(f"Could not create StackExchange filter, using default fields: {e}")
+    
+    async def _search_users(self, session: aiohttp.ClientSession, skill: str) -> List[Dict]:
+        """Users whose name matches a skill, every page at once"""
+        pages = await asyncio.gather(*(
+            self._get(session, "/users", order='desc', sort='reputation', inname=skill,
+                      page=page, pagesize=self.page_size)
+            for page in range(1, self.search_pages + 1)
+        ))
+        return [user for page in pages for user in page]
+    
+    async def _top_answerers(self, session: aiohttp.ClientSession, skill: str) -> List[Dict]:
+        """Top answerers in the skill's tag, for each configured period"""
+        tag = quote(self._tag(skill), safe='+')
+        periods = await asyncio.gather(*(
+            self._get(session, f"/tags/{tag}/top-answerers/{period}", pagesize=self.page_size)
+            for period in self.answerer_periods
+        ))
+        return [item for period in periods for item in period]
+    
+    async def _fetch_users(self, session: aiohttp.ClientSession, user_ids: List[int]) -> List[Dict]:
+        """Full profiles for many ids, 100 per /users/{ids} call, batches in parallel"""
+        batches = [user_ids[i:i + self.USERS_PER_BATCH] for i in range(0, len(user_ids), self.USERS_PER_BATCH)]
+        results = await asyncio.gather(*(
+            self._get(session, f"/users/{';'.join(str(i) for i in batch)}", pagesize=len(batch))
+            for batch in batches
+        ))
+        return [user for batch in results for user in batch]
+    
+    async def _scrape_skill(self, session: aiohttp.ClientSession, skill: str) -> Tuple[List[Dict], Dict[int, int]]:
+        """(users found by name search, {user_id: tag answer score} of top answerers) for one skill"""
+        search, answerers = await asyncio.gather(
+            self._search_users(session, skill), self._top_answerers(session, skill), return_exceptions=True
+        )
+        if isinstance(search, Exception):
+            logger.error(f"Error searching StackOverflow users for '{skill}': {search}")
+            search = []
+        if isinstance(answerers, Exception):
+            logger.error(f"Error fetching StackOverflow top answerers for '{skill}': {answerers}")
+            answerers = []
+        scores = {}
+        for item in answerers:
+            user_id = (item.get('user') or {}).get('user_id')
+            if user_id is not None:
+                scores[user_id] = max(scores.get(user_id, 0), item.get('score', 0))
+        return search, scores
+    
+    def _to_candidate(self, user: Dict, skills: List[str], answer_scores: Dict[str, int]) -> Candidate:
+        summary = f"Reputation: {user.get('reputation', 0)}, Badges: {user.get('badge_counts', {}).get('gold', 0)} gold"
+        if answer_scores:
+            summary += ", top answerer in " + ", ".join(f"{tag} (score {score})" for tag, score in answer_scores.items())
+        return Candidate(
+            id=hashlib.md5(f"stackoverflow_{user['user_id']}".encode()).hexdigest(),
+            name=user.get('display_name', 'Anonymous'),
+            current_title=f"Developer (Reputation: {user.get('reputation', 0)})",
+            skills=skills,
+            location=user.get('location', ''),
+            profile_url=user.get('link', ''),
+            source_portal="stackoverflow",
+            summary=summary
+        )
+    
     async def scrape(self, job_description: JobDescription) -> List[Candidate]:
         logger.info(f"Scraping StackOverflow for: {job_description.title}")
         candidates = []
         
         try:
-            # Create SSL context that doesn't verify certificates (for development)
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            session = get_http_session(self.config)
+            await self._ensure_filter(session)
             
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                # Use StackExchange API
-                for skill in job_description.required_skills[:3]:
-                    api_url = f"https://api.stackexchange.com/2.3/users?order=desc&sort=reputation&inname={quote_plus(skill)}&site=stackoverflow&pagesize=30"
-                    
-                    async with session.get(api_url) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            
-                            for user in data.get('items', [])[:20]:
-                                candidate = Candidate(
-                                    id=hashlib.md5(f"stackoverflow_{user['user_id']}".encode()).hexdigest(),
-                                    name=user.get('display_name', 'Anonymous'),
-                                    current_title=f"Developer (Reputation: {user.get('reputation', 0)})",
-                                    skills=[skill],
-                                    location=user.get('location', ''),
-                                    profile_url=user.get('link', ''),
-                                    source_portal="stackoverflow",
-                                    summary=f"Reputation: {user.get('reputation', 0)}, Badges: {user.get('badge_counts', {}).get('gold', 0)} gold"
-                                )
-                                candidates.append(candidate)
-                            
-                            await asyncio.sleep(2)
+            # All skills, pages and answerer periods at once; the rate limiter keeps them within quota
+            skills = job_description.required_skills[:self.skills_limit]
+            results = await asyncio.gather(*(self._scrape_skill(session, skill) for skill in skills))
+            
+            # Each user is kept once, with every skill they were found for
+            users: Dict[int, Dict] = {}
+            user_skills: Dict[int, List[str]] = {}
+            answer_scores: Dict[int, Dict[str, int]] = {}
+            for skill, (search, scores) in zip(skills, results):
+                for user in search:
+                    users.setdefault(user['user_id'], user)
+                    user_skills.setdefault(user['user_id'], []).append(skill)
+                for user_id, score in scores.items():
+                    if skill not in user_skills.setdefault(user_id, []):
+                        user_skills[user_id].append(skill)
+                    answer_scores.setdefault(user_id, {})[self._tag(skill)] = score
+            
+            # Top answerers first: they are the strongest signal for the skill
+            ranked = sorted(user_skills, key=lambda uid: -sum(answer_scores.get(uid, {}).values()))
+            user_ids = ranked[:self.max_candidates]
+            
+            missing = [uid for uid in user_ids if uid not in users]
+            if missing:
+                with tracer.span("stackoverflow_hydration", users=len(missing)):
+                    for user in await self._fetch_users(session, missing):
+                        users[user['user_id']] = user
+            
+            for user_id in user_ids:
+                if user_id in users:
+                    candidates.append(self._to_candidate(users[user_id], user_skills[user_id],
+                                                         answer_scores.get(user_id, {})))
         
         except Exception as e:
             logger.error(f"StackOverflow scraping error: {e}")
@@ -632,6 +870,12 @@ class StackOverflowScraper(BasePortalScraper):
 class NaukriScraper(BasePortalScraper):
     """Scrape Naukri Resdex (Recruiter platform) for candidates"""
     
+    # Results come from the configured Resdex requirement, not the job description
+    uses_title = False
+    
+    def query_key(self, job_description: JobDescription) -> tuple:
+        return ()
+    
     # Class-level shared browser instance
     _shared_driver = None
     _is_logged_in = False
@@ -785,6 +1029,11 @@ class NaukriScraper(BasePortalScraper):
                 # Navigate to specific page
                 page_url = f"{search_url}&pageNo={page_num}"
                 if page_num > 1:
+                    try:
+                        await rate_limiter.acquire(page_url)
+                    except RateLimitExceeded as e:
+                        logger.warning(f"Stopping Naukri pagination: {e}")
+                        break
                     driver.get(page_url)
                     await asyncio.sleep(3)
                 
@@ -798,36 +1047,15 @@ class NaukriScraper(BasePortalScraper):
                 logger.info("⏳ Waiting for page to load...")
                 await asyncio.sleep(2)
                 
-                # Find candidate cards - look for the actual structure
+                # Read all candidate cards (the parent divs) in one call
                 logger.info("🔍 Looking for candidate cards...")
-                candidate_elements = []
-            
-                # Try to find the candidate profile summary links (these contain the data)
-                try:
-                    candidate_elements = driver.find_elements(By.CSS_SELECTOR, "a.candidate-profile-summary")
-                    if candidate_elements:
-                        logger.info(f"✅ Found {len(candidate_elements)} candidates using profile summary selector")
-                except:
-                    pass
-                
-                # Fallback: try other selectors
-                if not candidate_elements:
-                    resdex_selectors = [
-                        "div[class*='candidate']",
-                        "div[class*='Card']",
-                        "article"
-                    ]
-                    
-                    for selector in resdex_selectors:
-                        try:
-                            candidate_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                            if len(candidate_elements) > 5:
-                                logger.info(f"✅ Found {len(candidate_elements)} elements with selector: {selector}")
-                                break
-                        except:
-                            continue
+                parse_started = time.perf_counter()
+                selector, candidate_cards = snapshot_cards(driver, [
+                    "div.left-section",
+                    "div[class*='left-section'], div[class*='candidate']"
+                ])
                 
-                if not candidate_elements or len(candidate_elements) < 1:
+                if not candidate_cards:
                     logger.warning(f"⚠️  No candidate cards found on page {page_num}")
                     if page_num == 1:
                         # Save page source for debugging only on first page
@@ -838,34 +1066,19 @@ class NaukriScraper(BasePortalScraper):
                     continue
             
                 # Extract candidate information
-                logger.info(f"📊 Extracting data from {len(candidate_elements)} candidates on page {page_num}...")
-                
-                # Find all candidate cards (the parent divs)
-                candidate_cards = driver.find_elements(By.CSS_SELECTOR, "div.left-section")
-            
-                if not candidate_cards:
-                    logger.warning("⚠️  Could not find candidate cards, trying alternative selector")
-                    candidate_cards = driver.find_elements(By.CSS_SELECTOR, "div[class*='left-section'], div[class*='candidate']")
-                
-                logger.info(f"📋 Found {len(candidate_cards)} candidate cards on page {page_num}")
+                logger.info(f"📋 Found {len(candidate_cards)} candidate cards on page {page_num} using: {selector}")
                 
                 page_candidates = []
                 for i, card in enumerate(candidate_cards):
                     try:
                         # Extract name
-                        name = "Candidate"
-                        try:
-                            name_elem = card.find_element(By.CSS_SELECTOR, "a.candidate-name, [class*='candidate-name']")
-                            name = name_elem.text.strip()
-                        except:
-                            pass
+                        name = first_text(card, ["a.candidate-name, [class*='candidate-name']"]) or "Candidate"
                         
                         # Extract current title and company
                         title = job_description.title
                         company = ""
-                        try:
-                            current_elem = card.find_element(By.CSS_SELECTOR, "#currentEmp, [id='currentEmp']")
-                            current_text = current_elem.text.strip()
+                        current_text = first_text(card, ["#currentEmp, [id='currentEmp']"])
+                        if current_text:
                             # Parse "Python Developer at Company Name"
                             if " at " in current_text:
                                 parts = current_text.split(" at ")
@@ -873,73 +1086,27 @@ class NaukriScraper(BasePortalScraper):
                                 company = parts[1].strip() if len(parts) > 1 else ""
                             else:
                                 title = current_text
-                        except:
-                            pass
-                        
-                        # Extract experience
-                        experience = ""
-                        try:
-                            exp_elem = card.find_element(By.CSS_SELECTOR, "i.ico-work ~ span, [title*='Experience'] ~ span")
-                            experience = exp_elem.text.strip()
-                        except:
-                            pass
                         
-                        # Extract salary
-                        salary = ""
-                        try:
-                            salary_elem = card.find_element(By.CSS_SELECTOR, "i.naukri-icon-account_balance_wallet ~ span")
-                            salary = salary_elem.text.strip()
-                        except:
-                            pass
-                        
-                        # Extract location
-                        location = job_description.location or ""
-                        try:
-                            location_elem = card.find_element(By.CSS_SELECTOR, "span.location, i.ico-place ~ span")
-                            location = location_elem.text.strip()
-                        except:
-                            pass
+                        # Extract experience, salary and location
+                        experience = first_text(card, ["i.ico-work ~ span, [title*='Experience'] ~ span"]) or ""
+                        salary = first_text(card, ["i.naukri-icon-account_balance_wallet ~ span"]) or ""
+                        location = first_text(card, ["span.location, i.ico-place ~ span"]) or job_description.location or ""
                         
                         # Extract education
-                        education = []
-                        try:
-                            edu_elems = card.find_elements(By.CSS_SELECTOR, "#education .education")
-                            for edu in edu_elems[:2]:
-                                education.append(edu.text.strip())
-                        except:
-                            pass
+                        education = all_texts(card, "#education .education")[:2]
                         
                         # Extract key skills
-                        skills = []
-                        try:
-                            skill_elems = card.find_elements(By.CSS_SELECTOR, ".key-skills .cand-skill")
-                            for skill_elem in skill_elems:
-                                skill_text = skill_elem.text.strip().replace(" | ", "")
-                                if skill_text:
-                                    skills.append(skill_text)
-                        except:
-                            # Fallback to job description skills
-                            skills = job_description.required_skills[:3]
+                        skills = [s.replace("|", "").strip() for s in all_texts(card, ".key-skills .cand-skill")]
+                        skills = [s for s in skills if s]
                         
                         # Extract preferred locations
                         pref_locations = []
-                        try:
-                            pref_loc_elem = card.find_element(By.CSS_SELECTOR, "[title*='Hyderabad'], [title*='Bengaluru']")
-                            pref_loc_text = pref_loc_elem.get_attribute("title")
-                            if pref_loc_text:
-                                pref_locations = [loc.strip() for loc in pref_loc_text.split(',')][:5]
-                        except:
-                            pass
+                        pref_loc_text = first_attr(card, ["[title*='Hyderabad'], [title*='Bengaluru']"], "title")
+                        if pref_loc_text:
+                            pref_locations = [loc.strip() for loc in pref_loc_text.split(',')][:5]
                         
                         # Get profile URL
-                        profile_url = search_url
-                        try:
-                            link_elem = card.find_element(By.CSS_SELECTOR, "a.candidate-name")
-                            profile_url = link_elem.get_attribute("href")
-                            if profile_url and not profile_url.startswith('http'):
-                                profile_url = f"https://resdex.naukri.com{profile_url}"
-                        except:
-                            pass
+                        profile_url = first_link(card, ["a.candidate-name"], "https://resdex.naukri.com") or search_url
                         
                         # Build summary
                         summary_parts = []
@@ -973,11 +1140,8 @@ class NaukriScraper(BasePortalScraper):
                         continue
                 
                 all_candidates.extend(page_candidates)
-                logger.info(f"✅ Extracted {len(page_candidates)} candidates from page {page_num}")
-                
-                # Small delay between pages
-                if page_num < max_pages:
-                    await asyncio.sleep(2)
+                logger.info(f"✅ Extracted {len(page_candidates)} candidates from page {page_num} "
+                            f"in {(time.perf_counter() - parse_started) * 1000:.0f} ms")
             
             candidates = all_candidates
             
@@ -1005,6 +1169,10 @@ class PortalScraperManager:
     def __init__(self, config: dict):
         self.config = config
         self.scrapers = self._initialize_scrapers()
+        
+        # Max concurrent scrapes per portal, shared by every title and job using this manager
+        self.portal_concurrency = config['scraping'].get('portal_concurrency') or {}
+        self._portal_semaphores: Dict[str, asyncio.Semaphore] = {}
     
     def _initialize_scrapers(self) -> List[BasePortalScraper]:
         scrapers = []
@@ -1050,7 +1218,9 @@ class PortalScraperManager:
         for scraper in self.scrapers:
             try:
                 logger.info(f"📍 Scraping {scraper.portal_name}...")
-                candidates = await scraper.scrape(job_description)
+                with tracer.span("scrape", portal=scraper.portal_name, query=job_description.title) as span:
+                    candidates = await scraper.scrape(job_description)
+                    span.set_attribute("candidates", len(candidates))
                 
                 # Add unique candidates
                 for candidate in candidates:
@@ -1070,10 +1240,6 @@ class PortalScraperManager:
                     except Exception as e:
                         logger.warning(f"⚠️  Could not save to vector DB: {e}")
                 
-                # Delay between scrapers to ensure proper completion
-                logger.info(f"⏸️  Waiting 5 seconds before next scraper...")
-                await asyncio.sleep(5)
-                
             except Exception as e:
                 logger.error(f"❌ Error scraping {scraper.portal_name}: {e}")
                 continue
@@ -1081,24 +1247,205 @@ class PortalScraperManager:
         logger.info(f"✅ Total unique candidates: {len(all_candidates)}")
         return all_candidates
     
+    def _get_portal_semaphore(self, portal_name: str) -> asyncio.Semaphore:
+        """Get the concurrency limit for a portal (created on first use)"""
+        if portal_name not in self._portal_semaphores:
+            limit = self.portal_concurrency.get(portal_name, self.portal_concurrency.get('default', 2))
+            self._portal_semaphores[portal_name] = asyncio.Semaphore(max(1, limit))
+        return self._portal_semaphores[portal_name]
+    
+    async def _scrape_portal(self, scraper, job_description: JobDescription, titles: List[str]) -> List[Candidate]:
+        """Run one planned query under the portal's concurrency limit"""
+        async with self._get_portal_semaphore(scraper.portal_name):
+            with tracer.span("scrape", portal=scraper.portal_name, query=job_description.title,
+                             titles=len(titles)) as span:
+                start_time = time.time()
+                try:
+                    if getattr(scraper, 'max_titles_per_query', 1) > 1:
+                        candidates = await scraper.scrape(job_description, titles)
+                    else:
+                        candidates = await scraper.scrape(job_description)
+                    logger.info(f"✅ {scraper.portal_name} / {job_description.title}: "
+                                f"{len(candidates)} candidates in {time.time() - start_time:.1f}s")
+                except Exception as e:
+                    logger.error(f"Scraping error ({scraper.portal_name} / {job_description.title}): {e}")
+                    span.record_error(e)
+                    return []
+                span.set_attribute("candidates", len(candidates))
+        
+        for candidate in candidates:
+            # Scrapers that can tell from the profile set matched_titles themselves
+            if not candidate.matched_titles:
+                candidate.matched_titles = self._match_titles(candidate, titles)
+        return candidates
+    
+    @staticmethod
+    def _match_titles(candidate: Candidate, titles: List[str]) -> List[str]:
+        """Work out which of a merged query's titles a candidate matched"""
+        if len(titles) == 1:
+            return list(titles)
+        
+        headline = f"{candidate.current_title or ''} {candidate.summary or ''}"
+        matched = BasePortalScraper.titles_in(headline, titles)
+        # Can't tell from the profile (or the query ignored titles): credit every title
+        return matched or list(titles)
+    
+    @staticmethod
+    def _query_key(scraper, job_description: JobDescription) -> tuple:
+        if hasattr(scraper, 'query_key'):
+            return scraper.query_key(job_description)
+        return BasePortalScraper.query_key(scraper, job_description)
+    
+    def _ignores_skills(self, scraper, job_description: JobDescription) -> bool:
+        """True when the portal's search for this job doesn't depend on the skills"""
+        probes = [job_description.model_copy(update={'required_skills': [skill]}) for skill in ("a", "b")]
+        return self._query_key(scraper, probes[0]) == self._query_key(scraper, probes[1])
+    
+    def plan_queries(self, job_descriptions: List[JobDescription],
+                     planned: Optional[Dict[Tuple, Set[str]]] = None,
+                     skill_independent_only: bool = False) -> List[Tuple]:
+        """
+        Merge job titles into as few queries per portal as each portal supports.
+        
+        Titles whose other search inputs match share a query: portals that ignore
+        the title run it once, and portals that accept boolean keywords OR up to
+        max_titles_per_query titles together. Pass the same `planned` dict to
+        later calls in a sourcing run to skip queries that were already issued.
+        skill_independent_only limits the plan to portals whose search ignores
+        the skills, i.e. queries that can run before the skills are expanded.
+        
+        Returns (scraper, query job description, titles covered) tuples.
+        """
+        if planned is None:
+            planned = {}
+        consolidate = self.config['scraping'].get('consolidate_queries', True)
+        
+        plan = []
+        for scraper in self.scrapers:
+            if skill_independent_only and not all(self._ignores_skills(scraper, jd) for jd in job_descriptions):
+                continue
+            uses_title = getattr(scraper, 'uses_title', True) or not consolidate
+            max_titles = getattr(scraper, 'max_titles_per_query', 1) if consolidate else 1
+            
+            groups: Dict[tuple, List[JobDescription]] = {}
+            for jd in job_descriptions:
+                groups.setdefault(self._query_key(scraper, jd), []).append(jd)
+            
+            for key, jds in groups.items():
+                covered = planned.setdefault((scraper.portal_name, key), set())
+                if covered and not uses_title:
+                    continue  # Same search already issued for another title
+                
+                new_jds = []
+                for jd in jds:
+                    if jd.title.strip().lower() not in covered:
+                        covered.add(jd.title.strip().lower())
+                        new_jds.append(jd)
+                
+                if not uses_title:
+                    plan.append((scraper, new_jds[0], [jd.title for jd in new_jds]))
+                    continue
+                
+                for i in range(0, len(new_jds), max_titles):
+                    chunk = new_jds[i:i + max_titles]
+                    titles = [jd.title for jd in chunk]
+                    query_jd = chunk[0]
+                    if len(chunk) > 1:
+                        query_jd = query_jd.model_copy(update={'title': scraper.merge_titles(titles)})
+                    plan.append((scraper, query_jd, titles))
+        
+        logger.info(f"Query plan: {len(plan)} queries for {len(job_descriptions)} titles "
+                    f"across {len(self.scrapers)} portals")
+        return plan
+    
+    def schedule(self, job_descriptions: List[JobDescription],
+                 planned: Optional[Dict[Tuple, Set[str]]] = None,
+                 skill_independent_only: bool = False) -> List[asyncio.Task]:
+        """Start the planned queries for a set of job titles; returns one task per query"""
+        return [
+            asyncio.create_task(self._scrape_portal(scraper, query_jd, titles))
+            for scraper, query_jd, titles in self.plan_queries(job_descriptions, planned, skill_independent_only)
+        ]
+    
+    async def iter_results(self, tasks: List[asyncio.Task]) -> AsyncIterator[Tuple[int, List[Candidate]]]:
+        """
+        Yield each scrape task's candidates as soon as it finishes, with the task's
+        position in `tasks` (its query order) so callers can dedupe by query order.
+        
+        Tasks cancelled elsewhere (e.g. early termination) are skipped. Unfinished
+        tasks are cancelled if the consumer stops early or fails.
+        """
+        order = {task: index for index, task in enumerate(tasks)}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=order.get):
+                    if not task.cancelled():
+                        yield order[task], task.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    @staticmethod
+    def cancel_outstanding(tasks: List[asyncio.Task], reason: str):
+        """Cancel the scrape tasks still running (early termination); finished results are kept"""
+        outstanding = [task for task in tasks if not task.done()]
+        if outstanding:
+            logger.info(f"⏹️  {reason}: cancelling {len(outstanding)} outstanding scrapes")
+            for task in outstanding:
+                task.cancel()
+    
+    @staticmethod
+    def merge_duplicate(existing: Candidate, candidate: Candidate):
+        """Fold a duplicate's matched titles into the candidate already kept"""
+        if candidate.matched_titles:
+            existing.matched_titles = list(dict.fromkeys(
+                (existing.matched_titles or []) + candidate.matched_titles
+            ))
+    
+    async def collect(self, tasks: List[asyncio.Task],
+                      on_candidates: Optional[Callable[[List[Candidate]], None]] = None) -> List[Candidate]:
+        """
+        Wait for scrape tasks and deduplicate candidates as each task finishes.
+        
+        Duplicates are resolved by query order, not completion order: the record
+        from the earliest task (the original title's queries come first) is kept,
+        with the union of every duplicate's matched titles, and the result is in
+        query order. on_candidates, if given, receives each batch of newly seen
+        candidates.
+        """
+        by_id: Dict[str, Tuple[Tuple[int, int], Candidate]] = {}
+        
+        results = self.iter_results(tasks)
+        try:
+            async for index, candidates in results:
+                new_candidates = []
+                for position, candidate in enumerate(candidates):
+                    kept = by_id.get(candidate.id)
+                    if kept is None:
+                        new_candidates.append(candidate)
+                        by_id[candidate.id] = ((index, position), candidate)
+                    elif index < kept[0][0]:
+                        # An earlier query's record wins even when its scrape finishes later
+                        self.merge_duplicate(candidate, kept[1])
+                        by_id[candidate.id] = ((index, position), candidate)
+                    else:
+                        self.merge_duplicate(kept[1], candidate)
+                
+                if on_candidates and new_candidates:
+                    on_candidates(new_candidates)
+        finally:
+            await results.aclose()
+        
+        return [candidate for _, candidate in sorted(by_id.values(), key=lambda kept: kept[0])]
+    
     async def scrape_all(self, job_description: JobDescription) -> List[Candidate]:
         """Scrape all enabled portals concurrently"""
         logger.info(f"Starting scraping from {len(self.scrapers)} portals")
         
-        tasks = [scraper.scrape(job_description) for scraper in self.scrapers]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        all_candidates = []
-        seen_ids = set()
-        
-        for result in results:
-            if isinstance(result, list):
-                for candidate in result:
-                    if candidate.id not in seen_ids:
-                        all_candidates.append(candidate)
-                        seen_ids.add(candidate.id)
-            else:
-                logger.error(f"Scraping error: {result}")
+        all_candidates = await self.collect(self.schedule([job_description]))
         
         logger.info(f"Total unique candidates found: {len(all_candidates)}")
         return all_candidates
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
 import yaml
 import os
 from dotenv import load_dotenv
@@ -20,12 +21,29 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_http_clients(**kwargs):
+    """Close the pooled HTTP clients when a worker (process) exits"""
+    import asyncio
+    from src.http_client import close_http_session, close_llm_http_client
+    
+    loop = asyncio.get_event_loop()
+    if not loop.is_closed():
+        loop.run_until_complete(close_http_session())
+    close_llm_http_client()
+
 @celery_app.task(name='source_candidates')
 def source_candidates_task(job_id: str, job_description: dict):
     """Celery task for candidate sourcing"""
     import asyncio
     from src.agent import CandidateSourcingAgent
     from src.models import JobDescription
+    from src.prompt_budget import token_usage
+    from src.tracing import tracer
+    from src.http_cache import http_cache
+    from src.rate_limiter import rate_limiter
+    from src.job_cache import JobResultCache
     
     # Load config
     with open("config.yaml", "r") as f:
@@ -36,17 +54,35 @@ def source_candidates_task(job_id: str, job_description: dict):
     config['linkedin']['username'] = os.getenv('LINKEDIN_USERNAME')
     config['linkedin']['password'] = os.getenv('LINKEDIN_PASSWORD')
     
-    # Initialize agent
-    agent = CandidateSourcingAgent(config)
-    
     # Create job description object
     job_desc = JobDescription(**job_description)
     
+    # Reruns of a recently sourced JD return the cached result
+    job_cache = JobResultCache.from_config(config)
+    cached = job_cache.get(job_desc)
+    if cached:
+        return {
+            'job_id': job_id,
+            'candidates': cached['candidates'],
+            'token_usage': token_usage.get_job_usage(job_id),
+            'reused_from': cached['job_id']
+        }
+    
+    # Initialize agent
+    agent = CandidateSourcingAgent(config)
+    tracer.configure(config)
+    http_cache.configure(config)
+    rate_limiter.configure(config)
+    
     # Run async sourcing
     loop = asyncio.get_event_loop()
-    candidates = loop.run_until_complete(agent.source_candidates(job_desc))
+    with token_usage.track_job(job_id), tracer.trace_job(job_id, title=job_desc.title) as trace:
+        candidates = loop.run_until_complete(agent.source_candidates(job_desc))
+    job_cache.store(job_desc, job_id, candidates)
     
     return {
         'job_id': job_id,
-        'candidates': [c.dict() for c in candidates]
+        'candidates': [c.dict() for c in candidates],
+        'token_usage': token_usage.get_job_usage(job_id),
+        'timings': tracer.summary(trace)
     }
@@ -0,0 +1,282 @@
+"""
+Lightweight tracing for sourcing jobs
+Records nested timing spans per job and exports them as JSON lines and OTLP/JSON
+"""
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Span the current task is inside (None outside a traced job)
+_current_span: ContextVar[Optional['Span']] = ContextVar('tracing_current_span', default=None)
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class _Trace:
+    """Spans recorded for one job"""
+    
+    def __init__(self, job_id: Optional[str]):
+        self.trace_id = secrets.token_hex(16)
+        self.job_id = job_id
+        self.spans: List['Span'] = []
+        self._lock = threading.Lock()
+    
+    def add(self, span: 'Span'):
+        with self._lock:
+            self.spans.append(span)
+    
+    def finished_spans(self) -> List['Span']:
+        with self._lock:
+            return list(self.spans)
+
+
+class Span:
+    """A timed operation with attributes"""
+    
+    def __init__(self, name: str, trace: _Trace, parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_OK
+        self.status_message = ""
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+    
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+    
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.add(self)
+    
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (so far, if still running)"""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'job_id': self.trace.job_id,
+            'name': self.name,
+            'start_time_unix_nano': self.start_ns,
+            'duration_ms': round(self.duration * 1000, 2),
+            'status': 'error' if self.status == STATUS_ERROR else 'ok',
+            'status_message': self.status_message or None,
+            'attributes': self.attributes
+        }
+
+
+class _NoopSpan:
+    """Returned outside a traced job so instrumented code needs no checks"""
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def set_attributes(self, **attributes):
+        pass
+    
+    def record_error(self, error: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(v) for v in value]}}
+    return {'stringValue': str(value)}
+
+
+class Tracer:
+    """Creates spans for the current job and exports each finished job trace"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.service_name = "ai-sourcing-agent"
+        self.file_path: Optional[str] = None
+        self.otlp_file_path: Optional[str] = None
+        self.otlp_endpoint: Optional[str] = None
+        self._write_lock = threading.Lock()
+    
+    def configure(self, config: dict):
+        """Apply the `tracing` config section (exports are off until configured)"""
+        tracing = config.get('tracing') or {}
+        self.enabled = tracing.get('enabled', True)
+        self.service_name = tracing.get('service_name', self.service_name)
+        self.file_path = tracing.get('file')
+        self.otlp_file_path = tracing.get('otlp_file')
+        self.otlp_endpoint = tracing.get('otlp_endpoint')
+    
+    def start_trace(self, job_id: Optional[str] = None, name: str = "job", **attributes) -> Optional[Span]:
+        """Start a job's root span and make it current for this task"""
+        if not self.enabled:
+            return None
+        root = Span(name, _Trace(job_id), attributes={'job_id': job_id, **attributes})
+        _current_span.set(root)
+        return root
+    
+    def end_trace(self, root: Optional[Span]):
+        """End a job's root span and export the trace"""
+        if root is None:
+            return
+        root.end()
+        if _current_span.get() is root:
+            _current_span.set(None)
+        self._export(root.trace)
+    
+    @contextmanager
+    def trace_job(self, job_id: Optional[str] = None, name: str = "job", **attributes):
+        """Trace a job for the duration of this block"""
+        token = _current_span.set(None)
+        root = self.start_trace(job_id, name, **attributes)
+        try:
+            yield root or _NOOP_SPAN
+        except BaseException as e:
+            if root is not None:
+                root.record_error(e)
+            raise
+        finally:
+            self.end_trace(root)
+            _current_span.reset(token)
+    
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block as a child of the current span (no-op outside a traced job)"""
+        parent = _current_span.get()
+        if parent is None:
+            yield _NOOP_SPAN
+            return
+        
+        span = Span(name, parent.trace, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+    
+    def current_span(self):
+        return _current_span.get() or _NOOP_SPAN
+    
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute on the current span"""
+        self.current_span().set_attribute(key, value)
+    
+    @staticmethod
+    def summary(root: Optional[Span]) -> Optional[Dict[str, Any]]:
+        """Timing summary for a job: total time and per-span-name totals"""
+        if not isinstance(root, Span):
+            return None
+        
+        stages: Dict[str, Dict[str, Any]] = {}
+        for span in root.trace.finished_spans():
+            if span is root:
+                continue
+            stage = stages.setdefault(span.name, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stage['count'] += 1
+            stage['total_seconds'] += span.duration
+            stage['max_seconds'] = max(stage['max_seconds'], span.duration)
+        
+        for stage in stages.values():
+            stage['total_seconds'] = round(stage['total_seconds'], 3)
+            stage['max_seconds'] = round(stage['max_seconds'], 3)
+        
+        return {
+            'trace_id': root.trace.trace_id,
+            'total_seconds': round(root.duration, 3),
+            'stages': stages
+        }
+    
+    def to_otlp(self, trace: _Trace) -> Dict[str, Any]:
+        """Build an OTLP/JSON ExportTraceServiceRequest for a trace"""
+        spans = []
+        for span in trace.finished_spans():
+            otlp_span = {
+                'traceId': trace.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.end_ns),
+                'attributes': [
+                    {'key': key, 'value': _otlp_value(value)}
+                    for key, value in span.attributes.items() if value is not None
+                ],
+                'status': {'code': span.status, 'message': span.status_message}
+            }
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            spans.append(otlp_span)
+        
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}]
+            }]
+        }
+    
+    def _append_lines(self, path: str, lines: List[str]):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._write_lock, open(path, 'a') as f:
+            f.writelines(line + "\n" for line in lines)
+    
+    def _export(self, trace: _Trace):
+        try:
+            if self.file_path:
+                self._append_lines(self.file_path, [json.dumps(s.to_dict(), default=str) for s in trace.finished_spans()])
+            if self.otlp_file_path or self.otlp_endpoint:
+                payload = self.to_otlp(trace)
+                if self.otlp_file_path:
+                    self._append_lines(self.otlp_file_path, [json.dumps(payload, default=str)])
+                if self.otlp_endpoint:
+                    # Don't hold up the job on a slow collector
+                    threading.Thread(target=self._post_otlp, args=(payload,), daemon=True).start()
+        except Exception as e:
+            logger.warning(f"Could not export trace {trace.trace_id}: {e}")
+    
+    def _post_otlp(self, payload: Dict[str, Any]):
+        try:
+            import httpx
+            response = httpx.post(f"{self.otlp_endpoint.rstrip('/')}/v1/traces", json=payload, timeout=5)
+            if response.status_code >= 400:
+                logger.warning(f"OTLP export failed: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"OTLP export failed: {e}")
+
+
+# Global instance
+tracer = Tracer()
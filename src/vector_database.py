@@ -97,37 +97,51 @@ class VectorDBManager:
             logger.error(f"Error adding candidate to vector DB: {e}")
             return ""
     
-    def add_candidates_batch(self, candidates: List[Dict], is_final: bool = True) -> List[str]:
-        """Add multiple candidates at once"""
+    def add_candidates_batch(self, candidates: List[Dict], is_final: bool = True, batch_size: int = 1000) -> List[str]:
+        """
+        Add multiple candidates at once
+        
+        Embeddings are computed in one batch with the same model the collection
+        uses for queries, then upserted in chunks of batch_size.
+        """
         ids = []
         documents = []
         metadatas = []
         
-        for candidate in candidates:
-            candidate_id = self._generate_id(candidate)
+        # Last record per ID, so one upsert never holds duplicate IDs
+        unique = {self._generate_id(c): c for c in candidates}
+        for candidate_id, candidate in unique.items():
             candidate_text = self._create_candidate_text(candidate)
             
             ids.append(candidate_id)
             documents.append(candidate_text)
+            # Chroma rejects None metadata, and one bad record would fail the whole batch
             metadatas.append({
-                'name': candidate.get('name', ''),
-                'title': candidate.get('current_title', ''),
-                'location': candidate.get('location', ''),
-                'source': candidate.get('source_portal', ''),
-                'experience_years': candidate.get('experience_years', 0),
-                'profile_url': candidate.get('profile_url', ''),
+                'name': candidate.get('name') or '',
+                'title': candidate.get('current_title') or '',
+                'location': candidate.get('location') or '',
+                'source': candidate.get('source_portal') or '',
+                'experience_years': candidate.get('experience_years') or 0,
+                'profile_url': candidate.get('profile_url') or '',
                 'is_final': is_final
             })
         
+        if not ids:
+            return []
+        
         collection = self.candidates_collection if is_final else self.scraped_collection
         
         try:
-            collection.upsert(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas
-            )
-            logger.info(f"Added {len(ids)} candidates to vector DB")
+            embeddings = self.embedding_model.encode(documents, batch_size=64, convert_to_tensor=False)
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                collection.upsert(
+                    ids=ids[start:end],
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end],
+                    embeddings=[e.tolist() for e in embeddings[start:end]]
+                )
+            logger.info(f"Added {len(ids)} candidates to {'final' if is_final else 'scraped'} collection")
             return ids
         except Exception as e:
             logger.error(f"Error adding candidates batch: {e}")
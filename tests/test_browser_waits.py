@@ -0,0 +1,57 @@
+"""Tests for condition-based browser waits and step timings"""
+import asyncio
+import time
+from src.browser_waits import StepTimings, network_idle, wait_until
+
+
+class FakeDriver:
+    """execute_script returns a resource count that grows for the first few polls"""
+    
+    def __init__(self, busy_polls):
+        self.busy_polls = busy_polls
+        self.polls = 0
+    
+    def execute_script(self, script, *args):
+        self.polls += 1
+        return min(self.polls, self.busy_polls)
+
+
+def test_wait_returns_as_soon_as_condition_holds():
+    state = {'calls': 0}
+    
+    def ready():
+        state['calls'] += 1
+        if state['calls'] < 3:
+            raise RuntimeError("stale element")  # Errors count as "not yet"
+        return "element"
+    
+    started = time.monotonic()
+    assert asyncio.run(wait_until(ready, timeout=5, poll=0.01)) == "element"
+    assert time.monotonic() - started < 1
+
+
+def test_wait_gives_up_after_timeout():
+    started = time.monotonic()
+    assert asyncio.run(wait_until(lambda: False, timeout=0.1, poll=0.02)) is None
+    assert time.monotonic() - started < 1
+
+
+def test_network_idle_waits_for_resource_count_to_settle():
+    driver = FakeDriver(busy_polls=5)
+    
+    assert asyncio.run(wait_until(network_idle(driver, quiet=0.05), timeout=2, poll=0.01))
+    assert driver.polls > 5
+
+
+def test_step_timings_report_time_saved():
+    timings = StepTimings("flow")
+    with timings.step("fast", 2):
+        pass
+    with timings.step("slow", 0):
+        time.sleep(0.01)
+    
+    report = timings.report()
+    assert [s['step'] for s in report['steps']] == ["fast", "slow"]
+    assert report['fixed_wait_seconds'] == 2
+    assert 1.9 < report['saved_seconds'] <= 2
+    assert report['steps'][1]['saved_seconds'] < 0
@@ -0,0 +1,42 @@
+"""Tests for concurrent candidate enrichment"""
+import asyncio
+import time
+from src.enrichment import CandidateEnricher
+from src.models import Candidate
+
+
+def _candidates(count):
+    return [Candidate(id=str(i), name=f"Person {i}", profile_url="u", source_portal="test") for i in range(count)]
+
+
+def test_enrichment_is_skipped_without_api_keys(monkeypatch):
+    monkeypatch.delenv('HUNTER_API_KEY', raising=False)
+    monkeypatch.delenv('CLEARBIT_API_KEY', raising=False)
+    enricher = CandidateEnricher()
+    candidates = _candidates(3)
+    
+    assert not enricher.enabled
+    assert asyncio.run(enricher.enrich_many(candidates)) is candidates
+
+
+def test_enrich_many_runs_concurrently_with_deadline(monkeypatch):
+    monkeypatch.setenv('HUNTER_API_KEY', 'test-key')
+    enricher = CandidateEnricher(max_concurrency=10, candidate_deadline=0.2)
+    
+    async def fake_enrich(candidate):
+        if candidate.id == "0":
+            await asyncio.sleep(5)  # Never finishes within the deadline
+        await asyncio.sleep(0.05)
+        candidate.email = f"{candidate.id}@example.com"
+        return candidate
+    
+    monkeypatch.setattr(enricher, '_enrich', fake_enrich)
+    
+    start = time.time()
+    result = asyncio.run(enricher.enrich_many(_candidates(12), limit=10))
+    
+    assert time.time() - start < 1
+    assert [c.id for c in result] == [str(i) for i in range(12)]
+    assert result[0].email is None
+    assert all(c.email for c in result[1:10])
+    assert result[10].email is None and result[11].email is None
@@ -0,0 +1,86 @@
+"""Tests for the offline job expansion synonym table and expansion cache"""
+import json
+from src.cache import CacheManager
+from src.expansion_table import ExpansionSynonymTable
+from src.job_expander import JobExpander
+from src.prompt_budget import PromptBudgeter
+
+
+def _write_table(path):
+    path.write_text(json.dumps({
+        "version": 3,
+        "titles": {"python developer": ["Senior Python Developer", "Python Engineer"]},
+        "skills": {"python": ["Flask", "Pytest"], "django": ["Celery", "PostgreSQL"]}
+    }))
+
+
+def test_lookup_answers_known_title_and_skills(tmp_path):
+    table_path = tmp_path / "table.json"
+    _write_table(table_path)
+    table = ExpansionSynonymTable(str(table_path))
+    
+    result = table.lookup("Python Developer", ["Python", "Django"], additional_count=3)
+    
+    assert result["job_titles"] == ["Python Developer", "Senior Python Developer", "Python Engineer"]
+    assert result["skills"] == ["Python", "Django", "Flask", "Celery", "Pytest"]
+
+
+def test_lookup_misses_unknown_title(tmp_path):
+    table_path = tmp_path / "table.json"
+    _write_table(table_path)
+    table = ExpansionSynonymTable(str(table_path))
+    
+    assert table.lookup("Rust Developer", ["Python"], additional_count=2) is None
+
+
+def test_build_bumps_version_and_learns_from_history(tmp_path):
+    table_path = tmp_path / "table.json"
+    history_path = tmp_path / "history.jsonl"
+    _write_table(table_path)
+    ExpansionSynonymTable.record_expansion(str(history_path), "Go Developer", ["Go"], {
+        "job_titles": ["Go Developer", "Golang Engineer"],
+        "skills": ["Go", "gRPC", "Kubernetes"]
+    })
+    
+    table = ExpansionSynonymTable.build(str(history_path), str(table_path))
+    
+    assert table["version"] == 4
+    assert table["titles"]["go developer"] == ["Golang Engineer"]
+    assert table["skills"]["go"] == ["gRPC", "Kubernetes"]
+    assert "python developer" in table["titles"]
+
+
+def _local_cache():
+    cache = CacheManager()
+    cache.enabled = False  # Use the in-process fallback even if Redis is running
+    return cache
+
+
+class FakeLLMProvider:
+    def __init__(self, config):
+        self.config = config
+        self.prompt_budgeter = PromptBudgeter()
+        self.calls = 0
+    
+    def chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        return json.dumps({"job_titles": ["Go Developer", "Golang Engineer"], "skills": ["Go", "gRPC"]})
+
+
+def test_expander_uses_llm_only_for_new_combinations(tmp_path):
+    table_path = tmp_path / "table.json"
+    _write_table(table_path)
+    provider = FakeLLMProvider({'job_expansion': {
+        'synonym_table': str(table_path),
+        'history_file': str(tmp_path / "history.jsonl")
+    }})
+    expander = JobExpander(provider, cache=_local_cache())
+    
+    expander.expand_job_data("Python Developer", ["Python", "Django"])
+    assert provider.calls == 0
+    
+    first = expander.expand_job_data("Go Developer", ["Go"])
+    second = expander.expand_job_data("go developer", ["go"])
+    assert provider.calls == 1
+    assert first == second
+    assert expander.stats == {'cache_hits': 1, 'table_hits': 1, 'llm_calls': 1}
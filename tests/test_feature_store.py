@@ -0,0 +1,68 @@
+"""Tests for per-job feature matrices and re-ranking"""
+import pytest
+from src.feature_store import FeatureStore, JobFeatureMatrix
+from src.hard_matcher import COMBINED_WEIGHTS, HardMatcher
+from src.models import Candidate, JobDescription
+
+
+def _candidates():
+    return [
+        Candidate(id="a", name="A", profile_url="a", source_portal="github", experience_years=2, location="Berlin"),
+        Candidate(id="b", name="B", profile_url="b", source_portal="linkedin", experience_years=8, location="Remote"),
+        Candidate(id="c", name="C", profile_url="c", source_portal="github", experience_years=5, location="Berlin")
+    ]
+
+
+def _scores(candidate):
+    features = {
+        "a": {'skills_match': 0.9, 'experience_match': 0.2},
+        "b": {'skills_match': 0.3, 'experience_match': 1.0, 'semantic_match': 0.5},
+        "c": {'skills_match': 0.6, 'experience_match': 0.6}
+    }[candidate.id]
+    return 0.0, features
+
+
+def test_rerank_applies_new_weights_and_filters():
+    matrix = JobFeatureMatrix.build("job-1", _candidates(), _scores)
+    
+    by_skills = matrix.rerank({'skills_match': 1.0, 'experience_match': 0.0, 'semantic_match': 0.0})
+    assert [c.id for c, _, _ in by_skills] == ["a", "c", "b"]
+    
+    by_experience = matrix.rerank({'skills_match': 0.0, 'experience_match': 1.0}, top_n=2)
+    assert [c.id for c, _, _ in by_experience] == ["b", "c"]
+    # Unweighted features use the ranker's default weight of 0.1, and totals are capped at 1.0
+    assert by_experience[0][1] == 1.0
+    assert by_experience[0][2] == {'skills_match': 0.3, 'experience_match': 1.0, 'semantic_match': 0.5}
+    
+    filtered = matrix.rerank({'skills_match': 1.0}, min_experience=3, sources=["GitHub"], locations=["berlin"])
+    assert [c.id for c, _, _ in filtered] == ["c"]
+
+
+def test_hard_matcher_features_rerank_to_its_combined_score():
+    job = JobDescription(title="Dev", description="", required_skills=["Python", "Django", "AWS"], experience_years=4)
+    candidates = _candidates()
+    for candidate, skills in zip(candidates, [["python"], ["python", "django", "aws"], ["python", "django"]]):
+        candidate.skills = skills
+    matcher = HardMatcher()
+    matched = matcher.match_candidates(job, candidates, min_skill_match=0.1, min_experience_match=0.1)
+    
+    hard_scores = {m['candidate'].id: matcher.feature_breakdown(m) for m in matched}
+    matrix = JobFeatureMatrix.build("job-1", [m['candidate'] for m in matched], lambda c: hard_scores[c.id])
+    reranked = matrix.rerank(COMBINED_WEIGHTS)
+    
+    assert [c.id for c, _, _ in reranked] == [m['candidate'].id for m in matched]
+    assert [score for _, score, _ in reranked] == [pytest.approx(m['combined_score'], abs=1e-4) for m in matched]
+    assert set(reranked[0][2]) == {'skills_match', 'experience_match'}
+
+
+def test_store_round_trips_through_disk(tmp_path):
+    store = FeatureStore()
+    store.configure({'feature_store': {'directory': str(tmp_path)}})
+    store.save(JobFeatureMatrix.build("job-1", _candidates(), _scores))
+    
+    fresh = FeatureStore()
+    fresh.configure({'feature_store': {'directory': str(tmp_path)}})
+    matrix = fresh.get("job-1")
+    assert [c.name for c in matrix.candidates] == ["A", "B", "C"]
+    assert [c.id for c, _, _ in matrix.rerank({'skills_match': 1.0, 'experience_match': 0.0, 'semantic_match': 0.0})] == ["a", "c", "b"]
+    assert fresh.get("missing") is None
@@ -0,0 +1,127 @@
+"""Tests for concurrent GitHub search and batched profile hydration"""
+import asyncio
+from urllib.parse import parse_qs, urlparse
+import pytest
+from src.http_cache import http_cache
+from src.models import JobDescription
+from src.rate_limiter import HostRateLimiter
+from src.scrapers import GitHubJobsScraper
+
+
+@pytest.fixture(autouse=True)
+def no_http_cache(monkeypatch):
+    monkeypatch.setattr(http_cache, 'enabled', False)
+
+
+@pytest.fixture(autouse=True)
+def unthrottled(monkeypatch):
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limits': {'default': {'rate': 1000, 'burst': 1000}}}})
+    monkeypatch.setattr("src.http_cache.rate_limiter", limiter)
+    monkeypatch.setattr("src.scrapers.rate_limiter", limiter)
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self._data = data
+        self.headers = {}
+    
+    async def json(self):
+        return self._data
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeGitHub:
+    """Stands in for aiohttp.ClientSession: 65 users per skill search, any login resolves"""
+    
+    def __init__(self):
+        self.requests = []
+        self.running = 0
+        self.max_running = 0
+    
+    def get(self, url, params=None, headers=None):
+        self.requests.append(url)
+        parsed = urlparse(url)
+        if parsed.path == "/search/users":
+            query = parse_qs(parsed.query)
+            skill = query['q'][0].split()[0]
+            page, per_page = int(query['page'][0]), int(query['per_page'][0])
+            logins = [f"{skill}{i}" for i in range(65)][(page - 1) * per_page:page * per_page]
+            return FakeResponse(200, {'items': [{'login': login} for login in logins]})
+        return self._user(parsed.path.rsplit("/", 1)[-1])
+    
+    def post(self, url, json, headers=None):
+        self.requests.append(url)
+        data = {alias.replace("l", "u"): {'login': login, 'name': None, 'email': "", 'bio': None, 'location': "Berlin",
+                                           'url': f"https://github.com/{login}",
+                                           'followers': {'totalCount': 1}, 'repositories': {'totalCount': 2}}
+                for alias, login in json['variables'].items()}
+        return FakeResponse(200, {'data': data})
+    
+    def _user(self, login):
+        session = self
+        
+        class UserResponse(FakeResponse):
+            async def __aenter__(self):
+                session.running += 1
+                session.max_running = max(session.max_running, session.running)
+                await asyncio.sleep(0.01)
+                session.running -= 1
+                return self
+        
+        return UserResponse(200, {'login': login, 'html_url': f"https://github.com/{login}", 'public_repos': 3})
+
+
+def _scraper(monkeypatch, token=None, **github):
+    if token:
+        monkeypatch.setenv('GITHUB_TOKEN', token)
+    else:
+        monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    config = {'scraping': {'max_candidates_per_portal': 100, 'timeout_seconds': 30,
+                           'github': {'results_per_skill': 40, 'detail_concurrency': 4, **github}}}
+    return GitHubJobsScraper('github_jobs', 'https://github.com', config)
+
+
+def test_search_pages_in_parallel_and_caps_per_skill(monkeypatch):
+    scraper = _scraper(monkeypatch)
+    session = FakeGitHub()
+    
+    logins = asyncio.run(scraper._search_logins(session, "python"))
+    
+    assert logins == [f"python{i}" for i in range(40)]
+    assert len(session.requests) == 2
+
+
+def test_rest_hydration_is_bounded_and_users_are_fetched_once(monkeypatch):
+    scraper = _scraper(monkeypatch)
+    session = FakeGitHub()
+    monkeypatch.setattr("src.scrapers.get_http_session", lambda config: session)
+    
+    jd = JobDescription(title="Dev", description="", required_skills=["python", "go"])
+    candidates = asyncio.run(scraper.scrape(jd))
+    
+    assert len(candidates) == 80
+    assert session.max_running == 4
+    assert len([r for r in session.requests if "/users/" in r]) == 80
+    assert candidates[0].summary == "GitHub: 3 repos, 0 followers"
+
+
+def test_graphql_batches_logins_when_token_is_set(monkeypatch):
+    scraper = _scraper(monkeypatch, token="t", graphql_batch_size=25)
+    session = FakeGitHub()
+    monkeypatch.setattr("src.scrapers.get_http_session", lambda config: session)
+    
+    jd = JobDescription(title="Dev", description="", required_skills=["python"])
+    candidates = asyncio.run(scraper.scrape(jd))
+    
+    assert len(candidates) == 40
+    assert len([r for r in session.requests if r.endswith("/graphql")]) == 2
+    assert not [r for r in session.requests if "/users/" in r]
+    assert candidates[0].email is None
+    assert candidates[0].location == "Berlin"
@@ -0,0 +1,131 @@
+"""Tests for the on-disk conditional HTTP cache"""
+import asyncio
+import pytest
+from src.http_cache import HTTPCache
+from src.rate_limiter import HostRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def unthrottled(monkeypatch):
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limits': {'default': {'rate': 1000, 'burst': 1000}}}})
+    monkeypatch.setattr("src.http_cache.rate_limiter", limiter)
+
+
+class FakeResponse:
+    def __init__(self, status, data=None, headers=None):
+        self.status = status
+        self._data = data
+        self.headers = headers or {}
+    
+    async def json(self):
+        return self._data
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Returns queued responses and records the headers of each request"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+    
+    def get(self, url, params=None, headers=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def _cache(tmp_path, **cache):
+    http_cache = HTTPCache()
+    http_cache.configure({'http': {'cache': {'directory': str(tmp_path), **cache}}})
+    return http_cache
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(FakeResponse(200, {'login': 'a'}, {'Cache-Control': 'max-age=60', 'ETag': '"v1"'}))
+    
+    first = asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    second = asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    
+    assert first.cache_status == 'miss'
+    assert second.cache_status == 'hit'
+    assert second.data == {'login': 'a'}
+    assert len(session.requests) == 1
+
+
+def test_stale_entry_is_revalidated_and_304_reuses_body(tmp_path):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(
+        FakeResponse(200, {'login': 'a'}, {'Cache-Control': 'max-age=0', 'ETag': '"v1"'}),
+        FakeResponse(304, headers={'Cache-Control': 'max-age=60', 'X-RateLimit-Remaining': '59'})
+    )
+    
+    asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    response = asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert response.cache_status == 'revalidated'
+    assert response.data == {'login': 'a'}
+    assert response.headers['X-RateLimit-Remaining'] == '59'
+
+
+def test_no_store_responses_and_errors_are_not_cached(tmp_path):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(
+        FakeResponse(200, {'n': 1}, {'Cache-Control': 'no-store'}),
+        FakeResponse(500),
+        FakeResponse(200, {'n': 2})
+    )
+    
+    for _ in range(3):
+        asyncio.run(http_cache.get_json(session, "https://api.stackexchange.com/2.3/users"))
+    
+    assert len(session.requests) == 3
+    assert all('If-None-Match' not in headers for headers in session.requests)
+
+
+def test_cache_key_includes_credentials(tmp_path):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(FakeResponse(200, {'email': 'private'}), FakeResponse(200, {'email': ''}))
+    
+    asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a", headers={'Authorization': 'token t'}))
+    response = asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    
+    assert response.cache_status == 'miss'
+    assert response.data == {'email': ''}
+
+
+def test_stats_report_hit_rate_per_host(tmp_path):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(FakeResponse(200, {}), FakeResponse(200, {}))
+    
+    for _ in range(3):
+        asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    asyncio.run(http_cache.get_json(session, "https://api.stackexchange.com/2.3/users"))
+    
+    hosts = http_cache.stats()['hosts']
+    assert hosts['api.github.com'] == {'hit': 2, 'revalidated': 0, 'stale': 0, 'miss': 1, 'bypass': 0, 'hit_rate': 0.667}
+    assert hosts['api.stackexchange.com']['hit_rate'] == 0.0
+
+
+def test_stale_entry_is_served_when_host_is_rate_limited(tmp_path, monkeypatch):
+    http_cache = _cache(tmp_path)
+    session = FakeSession(FakeResponse(200, {'login': 'a'}, {'Cache-Control': 'max-age=0'}))
+    asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limits': {'max_wait': 1}}})
+    limiter.update("https://api.github.com", 429, {'Retry-After': '600'})
+    monkeypatch.setattr("src.http_cache.rate_limiter", limiter)
+    
+    response = asyncio.run(http_cache.get_json(session, "https://api.github.com/users/a"))
+    
+    assert response.cache_status == 'stale'
+    assert response.data == {'login': 'a'}
+    assert len(session.requests) == 1
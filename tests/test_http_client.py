@@ -0,0 +1,34 @@
+"""Tests for the shared aiohttp session"""
+import asyncio
+import ssl
+from src.http_client import close_http_session, get_http_session
+
+
+def test_session_is_shared_within_a_loop_and_verifies_tls():
+    config = {'http': {'max_connections_per_host': 4, 'dns_cache_ttl': 60}}
+    
+    async def run():
+        first = get_http_session(config)
+        second = get_http_session({})
+        connector = first.connector
+        await close_http_session()
+        return first, second, connector
+    
+    first, second, connector = asyncio.run(run())
+    assert first is second
+    assert first.closed
+    assert connector.limit_per_host == 4
+    assert isinstance(connector._ssl, ssl.SSLContext)
+    assert connector._ssl.verify_mode == ssl.CERT_REQUIRED
+
+
+def test_each_event_loop_gets_its_own_session():
+    async def run():
+        return get_http_session({})
+    
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+    assert first is not second
+    # asyncio.run closes each loop's session as it shuts the loop down
+    assert first.closed and second.closed
+
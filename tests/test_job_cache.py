@@ -0,0 +1,61 @@
+"""Tests for job result memoization"""
+from src.cache import CacheManager
+from src.job_cache import JobResultCache, canonical_job_key
+from src.models import Candidate, JobDescription, QualityTarget, RankedCandidate
+
+
+def _local_cache():
+    cache = CacheManager()
+    cache.enabled = False  # Use the in-process fallback even if Redis is running
+    return cache
+
+
+def _ranked():
+    candidate = Candidate(id="c1", name="Ada", profile_url="u", source_portal="github")
+    return [RankedCandidate(candidate=candidate, match_score=0.9, match_breakdown={}, reasoning="Strong")]
+
+
+def test_canonical_key_ignores_case_whitespace_and_skill_order():
+    a = JobDescription(title="Python Developer", description="Build  APIs", required_skills=["Python", "Django"])
+    b = JobDescription(title=" python developer", description="build apis", required_skills=["django", "PYTHON"])
+    c = JobDescription(title="Python Developer", description="Build APIs", required_skills=["Python"])
+    
+    assert canonical_job_key(a) == canonical_job_key(b)
+    assert canonical_job_key(a) != canonical_job_key(c)
+
+
+def test_canonical_key_includes_quality_target_and_time_budget():
+    base = JobDescription(title="Python Developer", description="Build APIs", required_skills=["Python"])
+    budgeted = base.model_copy(update={'time_budget_seconds': 30})
+    targeted = base.model_copy(update={'quality_target': QualityTarget(min_candidates=5, min_score=0.6)})
+    
+    keys = {canonical_job_key(jd) for jd in (base, budgeted, targeted)}
+    assert len(keys) == 3
+    assert canonical_job_key(budgeted) == canonical_job_key(base.model_copy(update={'time_budget_seconds': 30}))
+
+
+def test_store_and_reuse_completed_results():
+    job_cache = JobResultCache(cache=_local_cache())
+    jd = JobDescription(title="Python Developer", description="", required_skills=["Python"])
+    
+    assert job_cache.get(jd) is None
+    job_cache.store(jd, "job-1", _ranked())
+    
+    cached = job_cache.get(jd)
+    assert cached['job_id'] == "job-1"
+    assert RankedCandidate(**cached['candidates'][0]).candidate.name == "Ada"
+    
+    job_cache.store(jd.model_copy(update={'title': 'Other'}), "job-2", [])
+    assert job_cache.get(jd.model_copy(update={'title': 'Other'})) is None
+
+
+def test_running_marker_only_cleared_by_its_job():
+    job_cache = JobResultCache(cache=_local_cache())
+    jd = JobDescription(title="Python Developer", description="")
+    
+    job_cache.mark_running(jd, "job-1")
+    job_cache.mark_done(jd, "job-2")
+    assert job_cache.running_job(jd) == "job-1"
+    
+    job_cache.mark_done(jd, "job-1")
+    assert job_cache.running_job(jd) is None
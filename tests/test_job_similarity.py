@@ -0,0 +1,46 @@
+"""Tests for near-duplicate job detection"""
+from src.job_similarity import SimilarJobIndex
+from src.models import Candidate, JobDescription
+
+
+def _embed(text):
+    # Bag-of-keywords embedding: JDs sharing most keywords are close
+    words = ["python", "django", "react", "java", "senior", "remote"]
+    return [float(text.lower().count(word)) for word in words]
+
+
+def _candidates():
+    return [Candidate(id="c1", name="Ada", profile_url="u", source_portal="github", skills=["Python"])]
+
+
+def test_finds_near_duplicate_and_returns_copies():
+    index = SimilarJobIndex(_embed, threshold=0.9)
+    jd = JobDescription(title="Senior Python Developer", description="Django APIs", required_skills=["Python", "Django"])
+    index.add("job-1", jd, _candidates())
+    
+    similar = index.find(jd.model_copy(update={'description': "Django services, remote"}))
+    assert similar is not None
+    assert similar.job_id == "job-1"
+    assert similar.similarity >= 0.9
+    
+    similar.candidates[0].skills.append("Go")
+    assert index.find(jd).candidates[0].skills == ["Python"]
+
+
+def test_ignores_dissimilar_and_expired_jobs():
+    index = SimilarJobIndex(_embed, threshold=0.9)
+    index.add("job-1", JobDescription(title="Python Developer", description="Django", required_skills=["Python"]), _candidates())
+    
+    assert index.find(JobDescription(title="Java Developer", description="React", required_skills=["Java"])) is None
+    
+    index.ttl_seconds = -1
+    assert index.find(JobDescription(title="Python Developer", description="Django", required_skills=["Python"])) is None
+    assert not index._entries
+
+
+def test_evicts_oldest_beyond_max_entries():
+    index = SimilarJobIndex(_embed, max_entries=2)
+    for i in range(3):
+        index.add(f"job-{i}", JobDescription(title=f"Python {i}", description="", required_skills=[]), _candidates())
+    
+    assert list(index._entries) == ["job-1", "job-2"]
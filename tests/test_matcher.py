@@ -0,0 +1,42 @@
+"""Tests for scoring candidates once and filtering by threshold"""
+from src.jd_skills_extractor import JDSkillsExtractor
+from src.matcher import CandidateMatcher
+from src.models import Candidate, JobDescription
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.embedded = 0
+    
+    def get_embedding(self, text):
+        self.embedded += 1
+        return [1.0, 0.0]
+    
+    def get_embeddings_batch(self, texts):
+        self.embedded += len(texts)
+        return [[1.0, 0.0] if "Python" in text else [0.0, 1.0] for text in texts]
+
+
+def _matcher():
+    matcher = CandidateMatcher.__new__(CandidateMatcher)
+    matcher.config = {}
+    matcher.llm_provider = _FakeLLM()
+    matcher.skills_extractor = JDSkillsExtractor()
+    return matcher
+
+
+def test_thresholds_filter_scores_computed_once():
+    matcher = _matcher()
+    job = JobDescription(title="Python Developer", description="APIs", required_skills=["Python"])
+    candidates = [
+        Candidate(id="java", name="B", profile_url="b", source_portal="github", skills=["Java"]),
+        Candidate(id="py", name="A", profile_url="a", source_portal="github", skills=["Python"])
+    ]
+    
+    scored = matcher.score_candidates(job, candidates)
+    embedded = matcher.llm_provider.embedded
+    
+    assert [c.id for c in scored.candidates] == ["py", "java"]
+    assert [c.id for c in scored.above(0.5)] == ["py"]
+    assert [c.id for c in scored.above(-1)] == ["py", "java"]
+    assert matcher.llm_provider.embedded == embedded  # Filtering never re-embeds
@@ -0,0 +1,106 @@
+"""Tests for MongoDB bulk writes and lookups against fake collections"""
+import importlib
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pymongo
+import pytest
+from pymongo.errors import BulkWriteError
+
+
+class FakeCollection:
+    """Records bulk writes and finds; raises `error` from bulk_write if given"""
+    
+    def __init__(self, name, docs=(), error=None):
+        self.name = name
+        self.docs = list(docs)
+        self.error = error
+        self.bulk_writes = []
+        self.queries = []
+    
+    def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append((requests, ordered))
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(upserted_count=len(requests) - 1, matched_count=1)
+    
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        wanted = query['id']['$in']
+        return [dict(doc) for doc in self.docs if doc['id'] in wanted]
+
+
+@pytest.fixture(scope="module")
+def nosql():
+    """src.nosql_database, imported without connecting (its global manager gets a mock client)"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(pymongo, "MongoClient", MagicMock())
+        yield importlib.import_module("src.nosql_database")
+
+
+def _manager(nosql, **collections):
+    manager = nosql.MongoDBManager.__new__(nosql.MongoDBManager)
+    for name, collection in collections.items():
+        setattr(manager, name, collection)
+    return manager
+
+
+def test_dedupe_keeps_the_last_record_per_key(nosql):
+    records = [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 1}, {'id': 'a', 'v': 2}]
+    assert nosql.MongoDBManager._dedupe(records, 'id') == [{'id': 'a', 'v': 2}, {'id': 'b', 'v': 1}]
+
+
+def test_bulk_upsert_sends_one_unordered_write_per_unique_record(nosql):
+    candidates = FakeCollection('candidates')
+    manager = _manager(nosql, candidates=candidates)
+    
+    written = manager.insert_candidates_bulk([{'id': 'a', 'v': 1}, {'id': 'b'}, {'id': 'a', 'v': 2}])
+    
+    assert written == 2
+    [(requests, ordered)] = candidates.bulk_writes
+    assert ordered is False
+    assert [r._filter for r in requests] == [{'id': 'a'}, {'id': 'b'}]
+    assert requests[0]._doc['$set']['v'] == 2
+    assert set(requests[0]._doc) == {'$set', '$setOnInsert'}
+    assert manager.insert_candidates_bulk([]) == 0
+    assert len(candidates.bulk_writes) == 1
+
+
+def test_bulk_write_error_counts_the_writes_that_succeeded(nosql):
+    error = BulkWriteError({'writeErrors': [{'index': 1, 'errmsg': 'duplicate key'}],
+                            'nUpserted': 2, 'nMatched': 1})
+    scraped = FakeCollection('scraped_candidates', error=error)
+    manager = _manager(nosql, scraped_candidates=scraped)
+    
+    records = [{'id': str(i), 'profile_url': f"https://example.com/{i}"} for i in range(4)]
+    assert manager.insert_scraped_candidates_bulk(records) == 3
+    assert [r._filter for r in scraped.bulk_writes[0][0]] == [{'profile_url': r['profile_url']} for r in records]
+
+
+def test_get_candidates_by_ids_prefers_final_and_only_looks_up_missing_ids(nosql):
+    candidates = FakeCollection('candidates', docs=[{'id': 'b', 'source': 'final'}, {'id': 'a', 'source': 'final'}])
+    scraped = FakeCollection('scraped_candidates', docs=[
+        {'id': 'c', 'source': 'scraped'}, {'id': 'a', 'source': 'scraped'}, {'id': 'd', 'source': 'scraped'}
+    ])
+    manager = _manager(nosql, candidates=candidates, scraped_candidates=scraped)
+    
+    found = manager.get_candidates_by_ids(['c', 'a', 'x', 'b', 'a'])
+    
+    assert found == {'a': {'id': 'a', 'source': 'final'}, 'b': {'id': 'b', 'source': 'final'},
+                     'c': {'id': 'c', 'source': 'scraped'}}
+    # One $in query per collection, duplicates dropped, scraped only asked for what final lacked
+    assert candidates.queries == [{'id': {'$in': ['c', 'a', 'x', 'b']}}]
+    assert scraped.queries == [{'id': {'$in': ['c', 'x']}}]
+    # The result does not depend on the order the IDs were asked in
+    assert manager.get_candidates_by_ids(['b', 'x', 'a', 'c']) == found
+
+
+def test_get_candidates_by_ids_skips_scraped_when_nothing_is_missing(nosql):
+    candidates = FakeCollection('candidates', docs=[{'id': 'a'}, {'id': 'b'}])
+    scraped = FakeCollection('scraped_candidates', docs=[{'id': 'a'}])
+    manager = _manager(nosql, candidates=candidates, scraped_candidates=scraped)
+    
+    assert set(manager.get_candidates_by_ids(['a', 'b'])) == {'a', 'b'}
+    assert manager.get_candidates_by_ids([]) == {}
+    assert scraped.queries == []
+    assert len(candidates.queries) == 1
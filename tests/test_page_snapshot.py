@@ -0,0 +1,77 @@
+"""Tests for single-call card snapshots and local selector fallbacks"""
+from bs4 import BeautifulSoup
+from src.page_snapshot import all_texts, first_attr, first_link, first_text, snapshot_cards
+
+PAGE = """
+<ul>
+  <li class="reusable-search__result-container">
+    <span class="entity-result__title-text"><a href="/in/jane-doe?mini=1">
+      <span aria-hidden="true">View</span></a></span>
+    <a class="app-aware-link" href="/in/jane-doe"><span aria-hidden="true">Jane   Doe</span></a>
+    <div class="entity-result__primary-subtitle">Senior Python Engineer</div>
+    <div class="entity-result__secondary-subtitle"> Berlin,
+      Germany </div>
+  </li>
+  <li class="reusable-search__result-container">
+    <a class="app-aware-link" href="https://www.linkedin.com/in/li-wei/"><span aria-hidden="true">Li Wei</span></a>
+    <div class="left-section">
+      <span class="key-skills"><span class="cand-skill">Python | </span><span class="cand-skill">Go</span></span>
+      <span title="Hyderabad, Pune">prefers</span>
+    </div>
+  </li>
+</ul>
+"""
+
+
+class FakeDriver:
+    """Runs the snapshot script's selector fallback over static HTML"""
+    
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+        self.calls = 0
+    
+    def execute_script(self, script, selectors, min_count):
+        self.calls += 1
+        for selector in selectors:
+            cards = self.soup.select(selector)
+            if len(cards) >= min_count:
+                return {'selector': selector, 'html': [str(card) for card in cards]}
+        return {'selector': None, 'html': []}
+
+
+def test_cards_come_from_first_matching_selector_in_one_call():
+    driver = FakeDriver(PAGE)
+    
+    selector, cards = snapshot_cards(driver, ["div.entity-result", "li.reusable-search__result-container"])
+    
+    assert selector == "li.reusable-search__result-container"
+    assert len(cards) == 2
+    assert cards[0].name == "li"
+    assert driver.calls == 1
+
+
+def test_no_cards():
+    assert snapshot_cards(FakeDriver(PAGE), ["article"]) == (None, [])
+
+
+def test_first_text_falls_back_and_normalizes_whitespace():
+    _, cards = snapshot_cards(FakeDriver(PAGE), ["li"])
+    
+    name = first_text(cards[0], [
+        "span.entity-result__title-text a span[aria-hidden='true']",
+        "a.app-aware-link span[aria-hidden='true']"
+    ], accept=lambda text: not text.startswith("View"))
+    
+    assert name == "Jane Doe"
+    assert first_text(cards[0], [".entity-result__secondary-subtitle"]) == "Berlin, Germany"
+    assert first_text(cards[1], [".entity-result__primary-subtitle"]) is None
+
+
+def test_links_are_absolute_and_attributes_read_locally():
+    _, cards = snapshot_cards(FakeDriver(PAGE), ["li"])
+    
+    assert first_link(cards[0], ["a[href*='/in/']"], "https://www.linkedin.com") == \
+        "https://www.linkedin.com/in/jane-doe?mini=1"
+    assert first_link(cards[1], ["a[href*='/in/']"], "https://www.linkedin.com") == "https://www.linkedin.com/in/li-wei/"
+    assert first_attr(cards[1], ["[title*='Hyderabad']"], "title") == "Hyderabad, Pune"
+    assert all_texts(cards[1], ".key-skills .cand-skill") == ["Python |", "Go"]
@@ -0,0 +1,90 @@
+"""Tests for the write-behind persistence queue"""
+from src.persistence_queue import PersistenceQueue
+
+
+def _queue(tmp_path, start=True, **settings):
+    queue = PersistenceQueue()
+    queue.configure({'persistence': {'queue_path': str(tmp_path / "queue.db"), **settings}})
+    if start:
+        queue.start(background=False)  # Flushed explicitly by the tests
+    return queue
+
+
+def test_batches_writes_by_kind(tmp_path):
+    queue = _queue(tmp_path, batch_size=10)
+    batches = []
+    queue.register('jobs', lambda batch: batches.append(('jobs', [p['id'] for p in batch])))
+    queue.register('candidates', lambda batch: batches.append(('candidates', [p['id'] for p in batch])))
+    
+    queue.enqueue('jobs', [{'id': 'j1'}])
+    queue.enqueue('candidates', [{'id': 'c1'}, {'id': 'c2'}])
+    queue.enqueue('jobs', [{'id': 'j2'}])
+    
+    assert queue.stats()['pending'] == 4
+    assert queue.flush() == 4
+    assert sorted(batches) == [('candidates', ['c1', 'c2']), ('jobs', ['j1', 'j2'])]
+    assert queue.stats()['pending'] == 0
+
+
+def test_failed_writes_retry_then_park(tmp_path):
+    queue = _queue(tmp_path, max_retries=2, retry_backoff_seconds=0)
+    calls = []
+    
+    def failing(batch):
+        calls.append(len(batch))
+        raise ConnectionError("store down")
+    
+    queue.register('jobs', failing)
+    queue.enqueue('jobs', [{'id': 'j1'}])
+    
+    assert queue.flush() == 0
+    assert queue.stats()['pending'] == 1
+    assert queue.flush() == 0
+    assert queue.stats() == {'enabled': True, 'pending': 0, 'failed': 1,
+                             'by_kind': {'jobs': {'pending': 0, 'failed': 1}}}
+    assert calls == [1, 1]
+
+
+def test_pending_writes_survive_restart(tmp_path):
+    queue = _queue(tmp_path, retry_backoff_seconds=60)
+    queue.register('jobs', lambda batch: (_ for _ in ()).throw(ConnectionError("store down")))
+    queue.enqueue('jobs', [{'id': 'j1'}])
+    queue.flush()
+    
+    # A new process sees the write and retries it on shutdown despite the backoff
+    written = []
+    restarted = _queue(tmp_path, retry_backoff_seconds=60)
+    restarted.register('jobs', written.extend)
+    assert restarted.flush() == 0
+    restarted.stop()
+    assert written == [{'id': 'j1'}]
+    assert restarted.stats()['pending'] == 0
+
+
+def test_writes_inline_when_disabled(tmp_path):
+    queue = _queue(tmp_path, write_behind=False)
+    written = []
+    queue.register('jobs', written.extend)
+    
+    queue.enqueue('jobs', [{'id': 'j1'}])
+    assert written == [{'id': 'j1'}]
+    assert not (tmp_path / "queue.db").exists()
+
+
+def test_writes_inline_until_started_and_after_stop(tmp_path):
+    queue = _queue(tmp_path, start=False)
+    written = []
+    queue.register('jobs', written.extend)
+    
+    queue.enqueue('jobs', [{'id': 'j1'}])
+    assert written == [{'id': 'j1'}]
+    assert not (tmp_path / "queue.db").exists()
+    
+    queue.start(background=False)
+    queue.enqueue('jobs', [{'id': 'j2'}])
+    assert written == [{'id': 'j1'}]
+    queue.stop()
+    assert written == [{'id': 'j1'}, {'id': 'j2'}]
+    queue.enqueue('jobs', [{'id': 'j3'}])
+    assert written[-1] == {'id': 'j3'}
+    assert queue.stats()['pending'] == 0
@@ -0,0 +1,140 @@
+"""Tests for the staged candidate pipeline"""
+import asyncio
+import pytest
+from src.models import Candidate, JobDescription, QualityTarget
+from src.pipeline import PipelineStage, SourcingLimits, StagePipeline, TopKSelector
+from src.ranker import CandidateRanker
+
+
+async def _numbers(count):
+    for i in range(count):
+        yield i
+
+
+def test_pipeline_runs_items_through_every_stage():
+    selected = TopKSelector(3)
+    active = {'slow': 0, 'max_slow': 0}
+    
+    async def drop_odd(n):
+        return n if n % 2 == 0 else None
+    
+    async def slow(n):
+        active['slow'] += 1
+        active['max_slow'] = max(active['max_slow'], active['slow'])
+        await asyncio.sleep(0.01)
+        active['slow'] -= 1
+        return n * 10
+    
+    async def select(n):
+        selected.add(n, n)
+        return None
+    
+    pipeline = StagePipeline([
+        PipelineStage('filter', drop_odd),
+        PipelineStage('slow', slow, concurrency=4),
+        PipelineStage('select', select)
+    ], queue_size=2, source_name='numbers')
+    metrics = asyncio.run(pipeline.run(_numbers(20)))
+    
+    assert selected.items() == [180, 160, 140]
+    assert metrics['numbers']['emitted'] == 20
+    assert metrics['filter']['emitted'] == 10
+    assert metrics['slow']['received'] == 10
+    assert metrics['select']['received'] == 10
+    assert metrics['slow']['max_queue_depth'] <= 2
+    assert active['max_slow'] == 4
+
+
+def test_pipeline_counts_handler_errors_and_keeps_going():
+    async def flaky(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return n
+    
+    pipeline = StagePipeline([PipelineStage('flaky', flaky)])
+    metrics = asyncio.run(pipeline.run(_numbers(5)))
+    
+    assert metrics['flaky']['errors'] == 1
+    assert metrics['flaky']['emitted'] == 4
+
+
+def test_top_k_selector_keeps_best_and_first_on_ties():
+    selector = TopKSelector(2)
+    for score, item in [(0.5, "a"), (0.9, "b"), (0.5, "c"), (0.7, "d")]:
+        selector.add(score, item)
+    assert selector.items() == ["b", "d"]
+    
+    selector = TopKSelector(2)
+    for score, item in [(0.5, "a"), (0.5, "b"), (0.5, "c")]:
+        selector.add(score, item)
+    assert selector.items() == ["a", "b"]
+
+
+def test_top_k_selector_discards_by_key():
+    selector = TopKSelector(2)
+    selector.add(0.9, "stale", key="1")
+    selector.add(0.5, "other", key="2")
+    selector.discard("1")
+    selector.add(0.7, "fresh", key="1")
+    assert selector.items() == ["fresh", "other"]
+
+
+CONFIG = {'pipeline': {'quality_target': {'min_candidates': 20, 'min_score': 0.7}, 'time_budget_seconds': None}}
+
+
+def test_sourcing_limits_prefer_the_job_over_config():
+    async def run():
+        defaults = SourcingLimits.for_job(CONFIG, JobDescription(title="Dev", description="d"))
+        job = JobDescription(title="Dev", description="d", quality_target=QualityTarget(min_candidates=5),
+                             time_budget_seconds=30)
+        limits = SourcingLimits.for_job(CONFIG, job)
+        return defaults, limits
+    
+    defaults, limits = asyncio.run(run())
+    assert (defaults.min_candidates, defaults.min_score, defaults.deadline) == (20, 0.7, None)
+    # Fields the job leaves out still come from config
+    assert (limits.min_candidates, limits.min_score, limits.time_budget_seconds) == (5, 0.7, 30)
+    assert limits.deadline is not None
+
+
+def test_sourcing_limits_record_reports_the_target_once():
+    limits = SourcingLimits(min_candidates=2, min_score=0.5)
+    assert [limits.record(score) for score in [0.9, 0.4, 0.6, 0.8]] == [False, False, True, False]
+    assert not SourcingLimits(min_candidates=0).record(1.0)
+
+
+def test_sourcing_limits_bound_later_stages():
+    async def slow(value, delay):
+        await asyncio.sleep(delay)
+        return value
+    
+    async def own_timeout():
+        raise asyncio.TimeoutError
+    
+    async def run():
+        unlimited = await SourcingLimits().within(slow("done", 0.05), "skipped")
+        limits = SourcingLimits(time_budget_seconds=0.05)
+        fast = await limits.within(slow("fast", 0), "skipped")
+        with pytest.raises(asyncio.TimeoutError):
+            await limits.within(own_timeout(), "skipped")
+        cut = await limits.within(slow("slow", 1), "skipped")
+        return unlimited, fast, cut, limits.expired, await limits.within(slow("late", 0), "skipped")
+    
+    assert asyncio.run(run()) == ("done", "fast", "skipped", True, "skipped")
+
+
+def test_rank_candidates_stops_ai_reasoning_at_the_time_budget():
+    ranker = CandidateRanker.__new__(CandidateRanker)
+    ranker.weights = {'skills_match': 1.0}
+    ranker._get_ai_reasoning = lambda job, candidate, scores: "AI"
+    job = JobDescription(title="Dev", description="d", required_skills=["python"])
+    candidates = [Candidate(id=str(i), name="C", profile_url="u", source_portal="p", skills=["python"])
+                  for i in range(3)]
+    
+    assert {r.reasoning for r in ranker.rank_candidates(job, candidates)} == {"AI"}
+    summaries = {r.reasoning for r in ranker.rank_candidates(job, candidates, time_budget=0)}
+    assert len(summaries) == 1 and summaries.pop().startswith("Match: 100% - Skills: 100%")
+    # Callers that stream reasoning themselves rank without any LLM call
+    ranker._get_ai_reasoning = None
+    summaries = {r.reasoning for r in ranker.rank_candidates(job, candidates, reasoning=False)}
+    assert len(summaries) == 1 and summaries.pop().startswith("Match: 100% - Skills: 100%")
@@ -0,0 +1,67 @@
+"""Tests for prompt budgeting and token accounting"""
+from src.prompt_budget import PromptBudgeter, TokenUsageTracker
+
+
+def test_fit_list_keeps_short_lists_intact():
+    budgeter = PromptBudgeter(max_list_tokens=120)
+    assert budgeter.fit_list(["Python", "Django", "FastAPI"]) == "Python, Django, FastAPI"
+
+
+def test_fit_list_trims_and_summarises_long_lists():
+    budgeter = PromptBudgeter(max_list_tokens=20)
+    skills = [f"Skill{i}" for i in range(40)]
+    result = budgeter.fit_list(skills)
+    
+    assert result.startswith("Skill0, Skill1")
+    assert result.endswith("more)")
+    assert budgeter.estimate_tokens(result) <= 24
+
+
+def test_from_config_reads_prompt_budget():
+    config = {'llm': {'prompt_budget': {'max_prompt_tokens': 800, 'max_list_tokens': 50}}}
+    budgeter = PromptBudgeter.from_config(config)
+    assert budgeter.max_prompt_tokens == 800
+    assert budgeter.max_list_tokens == 50
+
+
+def test_token_usage_is_recorded_per_job():
+    tracker = TokenUsageTracker()
+    with tracker.track_job("job-1"):
+        tracker.record(prompt_tokens=100, completion_tokens=20, model="test")
+        tracker.record(prompt_tokens=50, completion_tokens=10, model="test")
+    tracker.record(prompt_tokens=5, completion_tokens=5, model="test")
+    
+    usage = tracker.get_job_usage("job-1")
+    assert usage == {'calls': 2, 'prompt_tokens': 150, 'completion_tokens': 30, 'total_tokens': 180}
+    assert tracker.summary()['totals']['calls'] == 3
+
+
+def test_fit_list_reserves_room_for_the_summary_only_when_trimming():
+    budgeter = PromptBudgeter(max_list_tokens=6)
+    # Fits exactly: nothing reserved for a summary it doesn't need
+    assert budgeter.fit_list(["abcdef"] * 3) == "abcdef, abcdef, abcdef"
+    
+    trimmed = budgeter.fit_list(["abcdef"] * 4)
+    assert trimmed == "abcdef (+3 more)"
+    assert budgeter.estimate_tokens(trimmed) <= 6
+
+
+def test_token_usage_keeps_only_recent_jobs():
+    tracker = TokenUsageTracker(max_jobs=2)
+    for job_id in ["job-1", "job-2", "job-1", "job-3"]:
+        with tracker.track_job(job_id):
+            tracker.record(prompt_tokens=10, completion_tokens=1)
+    
+    assert list(tracker.by_job) == ["job-1", "job-3"]
+    assert tracker.get_job_usage("job-1")['calls'] == 2
+    assert tracker.get_job_usage("job-2")['calls'] == 0
+    assert tracker.summary()['totals']['calls'] == 4
+
+
+def test_bind_job_can_be_undone():
+    tracker = TokenUsageTracker()
+    binding = tracker.bind_job("job-1")
+    tracker.record(prompt_tokens=1, completion_tokens=1)
+    tracker.unbind_job(binding)
+    tracker.record(prompt_tokens=1, completion_tokens=1)
+    assert tracker.get_job_usage("job-1")['calls'] == 1
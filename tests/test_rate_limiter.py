@@ -0,0 +1,108 @@
+"""Tests for the adaptive per-host rate limiter"""
+import asyncio
+import time
+import pytest
+from src.rate_limiter import HostRateLimiter, RateLimitExceeded, TokenBucket
+
+
+def _limiter(**rate_limits):
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limit_delay': 2, 'rate_limits': rate_limits}})
+    return limiter
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    
+    waits = [bucket.reserve(100.0) for _ in range(5)]
+    
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert round(waits[3], 3) == 0.1
+    assert round(waits[4], 3) == 0.2
+
+
+def test_default_rate_follows_rate_limit_delay():
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limit_delay': 4}})
+    
+    asyncio.run(limiter.acquire("https://www.indeed.com/jobs"))
+    
+    assert limiter.stats()['www.indeed.com']['rate'] == 0.25
+
+
+def test_path_prefixes_get_their_own_bucket():
+    limiter = _limiter(hosts={'api.github.com': {'rate': 10}, 'api.github.com/search': {'rate': 0.5}})
+    
+    assert limiter._key("https://api.github.com/search/users?q=go") == "api.github.com/search"
+    assert limiter._key("https://api.github.com/users/octocat") == "api.github.com"
+    assert limiter._key("https://api.github.com/searching") == "api.github.com"
+    assert limiter._key("www.linkedin.com") == "www.linkedin.com"
+
+
+def test_429_halves_rate_and_pauses_for_retry_after():
+    limiter = _limiter(hosts={'api.github.com': {'rate': 10, 'burst': 10}})
+    
+    limiter.update("https://api.github.com/users/a", 429, {'Retry-After': '30'})
+    
+    stats = limiter.stats()['api.github.com']
+    assert stats['rate'] == 5
+    assert 29 <= stats['paused_seconds'] <= 30
+
+
+def test_low_quota_is_spread_until_reset_and_recovers():
+    limiter = _limiter(hosts={'api.github.com': {'rate': 10, 'burst': 10}})
+    reset = str(int(time.time()) + 100)
+    
+    limiter.update("https://api.github.com/users/a", 200,
+                   {'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '50', 'X-RateLimit-Reset': reset})
+    assert 0.49 <= limiter.stats()['api.github.com']['rate'] <= 0.51
+    
+    limiter.update("https://api.github.com/users/a", 200,
+                   {'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '4000', 'X-RateLimit-Reset': reset})
+    assert limiter.stats()['api.github.com']['rate'] > 1
+
+
+def test_exhausted_quota_pauses_until_reset():
+    limiter = _limiter()
+    
+    limiter.update("https://api.github.com/users/a", 200,
+                   {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 60)})
+    
+    assert limiter.stats()['api.github.com']['paused_seconds'] >= 55
+
+
+def test_stackexchange_backoff_and_quota():
+    limiter = _limiter(hosts={'api.stackexchange.com': {'rate': 10, 'burst': 10}})
+    
+    limiter.update("https://api.stackexchange.com/2.3/users", 200, {},
+                   {'items': [], 'backoff': 10, 'quota_remaining': 500, 'quota_max': 10000})
+    
+    stats = limiter.stats()['api.stackexchange.com']
+    assert 9 <= stats['paused_seconds'] <= 10
+    assert stats['rate'] == 2.5
+
+
+def test_acquire_fails_fast_instead_of_waiting_past_max_wait():
+    limiter = _limiter(max_wait=5)
+    limiter.update("https://api.github.com/users/a", 200,
+                   {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 3600)})
+    
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(limiter.acquire("https://api.github.com/users/b"))
+    assert time.monotonic() - started < 1
+
+
+def test_rejected_acquire_books_no_slot():
+    bucket = TokenBucket(rate=1, burst=1)
+    
+    assert bucket.reserve(100.0) == 0.0
+    assert bucket.reserve(100.0, max_wait=0.5) is None
+    assert bucket.reserve(100.0) == 1.0
+
+
+def test_max_wait_defaults_to_scrape_timeout():
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'timeout_seconds': 12}})
+    
+    assert limiter.max_wait == 12
@@ -0,0 +1,229 @@
+"""Tests for query planning and concurrent scraping in PortalScraperManager"""
+import asyncio
+from src.models import Candidate, JobDescription
+from src.scrapers import BasePortalScraper, PortalScraperManager
+
+
+class FakeScraper:
+    """Scraper stub that tracks how many scrapes run at once"""
+    
+    def __init__(self, portal_name: str, delay: float = 0.05):
+        self.portal_name = portal_name
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+    
+    async def scrape(self, job_description: JobDescription):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        # Same candidate for every title, plus one unique per title
+        return [
+            Candidate(id=f"{self.portal_name}-shared", name="Shared", profile_url="u", source_portal=self.portal_name),
+            Candidate(id=f"{self.portal_name}-{job_description.title}", name="Unique", profile_url="u",
+                      source_portal=self.portal_name)
+        ]
+
+
+class FakeTitleScraper(FakeScraper):
+    """Scraper stub whose delay depends on the title; the shared candidate records its query"""
+    
+    def __init__(self, portal_name: str, delays: dict):
+        super().__init__(portal_name)
+        self.delays = delays
+    
+    async def scrape(self, job_description: JobDescription):
+        await asyncio.sleep(self.delays[job_description.title])
+        return [
+            Candidate(id=f"{self.portal_name}-{job_description.title}", name="Unique", profile_url="u",
+                      source_portal=self.portal_name),
+            Candidate(id=f"{self.portal_name}-shared", name="Shared", profile_url="u", source_portal=self.portal_name,
+                      summary=job_description.title)
+        ]
+
+
+class FakeKeywordScraper(FakeScraper):
+    """Scraper stub for a portal that accepts OR-ed titles"""
+    
+    max_titles_per_query = 2
+    merge_titles = BasePortalScraper.merge_titles
+    query_key = BasePortalScraper.query_key
+    
+    def __init__(self, portal_name: str):
+        super().__init__(portal_name)
+        self.queries = []
+    
+    async def scrape(self, job_description: JobDescription, titles=None):
+        # Like LinkedIn: search with the merged string, describe candidates with the readable titles
+        self.queries.append((job_description.title, titles))
+        return [
+            Candidate(id="headline", name="A", profile_url="u", source_portal=self.portal_name,
+                      current_title="Django Developer at Acme", summary=f"Found via search for: {', '.join(titles)}",
+                      matched_titles=BasePortalScraper.titles_in("Django Developer at Acme", titles)),
+            Candidate(id="no-headline", name="B", profile_url="u", source_portal=self.portal_name,
+                      current_title=titles[0])
+        ]
+
+
+class FakeTitleSearchScraper(FakeScraper):
+    """Scraper stub for a portal that searches by title and location only"""
+    
+    def query_key(self, job_description):
+        return ((job_description.location or "").lower(),)
+
+
+class FakeSkillScraper(FakeScraper):
+    """Scraper stub for a portal that searches by skills only"""
+    
+    uses_title = False
+    
+    def query_key(self, job_description):
+        return tuple(job_description.required_skills[:3])
+
+
+def _manager(scrapers, portal_concurrency=None):
+    config = {'job_portals': [], 'scraping': {'portal_concurrency': portal_concurrency or {}}}
+    manager = PortalScraperManager(config)
+    manager.scrapers = scrapers
+    return manager
+
+
+def test_titles_fan_out_under_per_portal_limits():
+    browser = FakeScraper("linkedin")
+    api = FakeScraper("github_jobs")
+    manager = _manager([browser, api], {'default': 3, 'linkedin': 1})
+    titles = ["Python Developer", "Python Engineer", "Backend Developer"]
+    
+    async def run():
+        tasks = manager.schedule([JobDescription(title=title, description="") for title in titles])
+        return await manager.collect(tasks)
+    
+    candidates = asyncio.run(run())
+    
+    assert browser.max_running == 1
+    assert api.max_running == 3
+    # 2 shared + 3 unique per portal, duplicates across titles removed
+    assert len(candidates) == 8
+    assert len({c.id for c in candidates}) == 8
+
+
+def test_plan_merges_titles_per_portal_and_skips_issued_queries():
+    keyword = FakeKeywordScraper("linkedin")
+    skills = FakeSkillScraper("github_jobs")
+    per_title = FakeScraper("recruiter")
+    manager = _manager([keyword, skills, per_title])
+    
+    original = JobDescription(title="Python Developer", description="", required_skills=["Python"])
+    expanded = [
+        JobDescription(title=title, description="", required_skills=["Python", "Django"])
+        for title in ["Python Developer", "Python Engineer", "Backend Developer", "Django Developer"]
+    ]
+    
+    planned = {}
+    first = manager.plan_queries([original], planned)
+    rest = manager.plan_queries(expanded, planned)
+    
+    assert [(s.portal_name, jd.title) for s, jd, _ in first] == [
+        ("linkedin", "Python Developer"), ("github_jobs", "Python Developer"), ("recruiter", "Python Developer")
+    ]
+    # Different skills change the query key, so the original title is planned again once per key
+    linkedin = [(jd.title, titles) for s, jd, titles in rest if s.portal_name == "linkedin"]
+    assert linkedin == [
+        ('"Python Developer" OR "Python Engineer"', ["Python Developer", "Python Engineer"]),
+        ('"Backend Developer" OR "Django Developer"', ["Backend Developer", "Django Developer"])
+    ]
+    github = [titles for s, jd, titles in rest if s.portal_name == "github_jobs"]
+    assert github == [["Python Developer", "Python Engineer", "Backend Developer", "Django Developer"]]
+    assert len([s for s, _, _ in rest if s.portal_name == "recruiter"]) == 4
+    
+    # Nothing left to issue when the same titles are planned again
+    assert manager.plan_queries(expanded, planned) == []
+
+
+def test_speculative_plan_waits_for_expanded_skills_where_they_matter():
+    people = FakeTitleSearchScraper("linkedin")
+    skills = FakeSkillScraper("github_jobs")
+    per_title = FakeScraper("recruiter")
+    manager = _manager([people, skills, per_title])
+    
+    original = JobDescription(title="Python Developer", description="", required_skills=["Python"])
+    planned = {}
+    speculative = manager.plan_queries([original], planned, skill_independent_only=True)
+    assert [(s.portal_name, jd.required_skills) for s, jd, _ in speculative] == [("linkedin", ["Python"])]
+    
+    # After expansion the original title runs with the expanded skills everywhere it matters
+    expanded = [original.model_copy(update={'required_skills': ["Python", "Django"]}),
+                JobDescription(title="Python Engineer", description="", required_skills=["Python", "Django"])]
+    rest = manager.plan_queries(expanded, planned)
+    assert [(s.portal_name, jd.title, jd.required_skills) for s, jd, _ in rest] == [
+        ("linkedin", "Python Engineer", ["Python", "Django"]),
+        ("github_jobs", "Python Developer", ["Python", "Django"]),
+        ("recruiter", "Python Developer", ["Python", "Django"]),
+        ("recruiter", "Python Engineer", ["Python", "Django"])
+    ]
+
+
+def test_match_titles_maps_merged_results_back():
+    candidate = Candidate(id="1", name="A", profile_url="u", source_portal="linkedin",
+                          current_title="Senior Backend Developer at Acme")
+    titles = ["Python Engineer", "Backend Developer"]
+    
+    assert PortalScraperManager._match_titles(candidate, titles) == ["Backend Developer"]
+    candidate.current_title = "Engineer"
+    assert PortalScraperManager._match_titles(candidate, titles) == titles
+
+
+def test_merged_query_passes_readable_titles_to_the_scraper():
+    keyword = FakeKeywordScraper("linkedin")
+    manager = _manager([keyword])
+    titles = ["Python Developer", "Django Developer"]
+    
+    async def run():
+        return await manager.collect(manager.schedule([JobDescription(title=t, description="") for t in titles]))
+    
+    candidates = {c.id: c for c in asyncio.run(run())}
+    
+    assert keyword.queries == [('"Python Developer" OR "Django Developer"', titles)]
+    # The scraper's own match from the headline is kept, not overridden by the summary listing every title
+    assert candidates["headline"].matched_titles == ["Django Developer"]
+    assert candidates["no-headline"].current_title == "Python Developer"
+
+
+def test_iter_results_skips_cancelled_scrapes():
+    fast = FakeScraper("fast", delay=0.01)
+    slow = FakeScraper("slow", delay=5)
+    manager = _manager([fast, slow])
+    
+    async def run():
+        tasks = manager.schedule([JobDescription(title="Dev", description="")])
+        batches = []
+        async for _, batch in manager.iter_results(tasks):
+            batches.append(batch)
+            for task in tasks:
+                task.cancel()  # Early termination after the first result
+        return batches
+    
+    batches = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert [c.source_portal for c in batches[0]] == ["fast", "fast"]
+    assert len(batches) == 1
+
+
+def test_collect_dedupes_by_query_order_not_completion_order():
+    scraper = FakeTitleScraper("linkedin", {"Python Developer": 0.1, "Python Engineer": 0.01})
+    manager = _manager([scraper])
+    
+    async def run():
+        tasks = manager.schedule([JobDescription(title="Python Developer", description="")])
+        tasks += manager.schedule([JobDescription(title="Python Engineer", description="")])
+        return await manager.collect(tasks)
+    
+    for _ in range(3):
+        candidates = asyncio.run(run())
+        # The slow original-title scrape still wins the duplicate and comes first
+        assert [c.id for c in candidates] == [
+            "linkedin-Python Developer", "linkedin-shared", "linkedin-Python Engineer"
+        ]
+        shared = candidates[1]
+        assert shared.summary == "Python Developer"
+        assert shared.matched_titles == ["Python Developer", "Python Engineer"]
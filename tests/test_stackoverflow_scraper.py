@@ -0,0 +1,115 @@
+"""Tests for concurrent StackExchange search, top answerers and batched user lookups"""
+import asyncio
+from urllib.parse import urlsplit
+import pytest
+from src.http_cache import http_cache
+from src.models import JobDescription
+from src.rate_limiter import HostRateLimiter
+from src.scrapers import StackOverflowScraper
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(http_cache, 'enabled', False)
+    limiter = HostRateLimiter()
+    limiter.configure({'scraping': {'rate_limits': {'default': {'rate': 1000, 'burst': 1000}}}})
+    monkeypatch.setattr("src.http_cache.rate_limiter", limiter)
+    monkeypatch.setattr(StackOverflowScraper, '_filter', None)
+    monkeypatch.delenv('STACKEXCHANGE_KEY', raising=False)
+
+
+class FakeResponse:
+    def __init__(self, session, status, data):
+        self.session = session
+        self.status = status
+        self._data = data
+        self.headers = {}
+    
+    async def json(self):
+        return self._data
+    
+    async def __aenter__(self):
+        self.session.running += 1
+        self.session.max_running = max(self.session.max_running, self.session.running)
+        await asyncio.sleep(0.01)
+        self.session.running -= 1
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeStackExchange:
+    """Stands in for aiohttp.ClientSession: name search finds user ids 1-9, tags' top answerers are ids 100+"""
+    
+    def __init__(self):
+        self.requests = []
+        self.running = 0
+        self.max_running = 0
+    
+    @staticmethod
+    def _user(user_id):
+        return {'user_id': user_id, 'display_name': f"user{user_id}", 'reputation': 1000 + user_id,
+                'location': "Pune", 'link': f"https://stackoverflow.com/users/{user_id}", 'badge_counts': {'gold': 1}}
+    
+    def get(self, url, params=None, headers=None):
+        path = urlsplit(url).path.replace("/2.3", "", 1)
+        self.requests.append((path, params or {}))
+        if path == "/filters/create":
+            items = [{'filter': "!abc"}]
+        elif path == "/users":
+            items = [self._user(i) for i in range(1, 10)] if params['page'] == 1 else []
+        elif path.startswith("/tags/"):
+            offset = 100 if "python" in path else 200
+            items = [{'user': {'user_id': offset + i}, 'score': 50 - i} for i in range(3)]
+        else:
+            items = [self._user(int(i)) for i in path.rsplit("/", 1)[-1].split(";")]
+        return FakeResponse(self, 200, {'items': items, 'quota_remaining': 9000, 'quota_max': 10000})
+
+
+def _scraper(**stackoverflow):
+    config = {'scraping': {'max_candidates_per_portal': 100, 'timeout_seconds': 30, 'stackoverflow': stackoverflow}}
+    return StackOverflowScraper('stackoverflow', 'https://stackoverflow.com', config)
+
+
+def test_skills_and_pages_are_fetched_concurrently_with_filter(monkeypatch):
+    session = FakeStackExchange()
+    monkeypatch.setattr("src.scrapers.get_http_session", lambda config: session)
+    
+    jd = JobDescription(title="Dev", description="", required_skills=["python", "machine learning"])
+    candidates = asyncio.run(_scraper(search_pages=2).scrape(jd))
+    
+    api_calls = [(path, params) for path, params in session.requests if path != "/filters/create"]
+    assert session.max_running > 4
+    assert all(params['filter'] == "!abc" for _, params in api_calls)
+    assert len([p for p, _ in api_calls if p == "/users"]) == 4
+    assert "/tags/machine-learning/top-answerers/all_time" in [p for p, _ in api_calls]
+    assert len(candidates) == 15
+
+
+def test_top_answerers_are_hydrated_in_one_batch_and_ranked_first(monkeypatch):
+    session = FakeStackExchange()
+    monkeypatch.setattr("src.scrapers.get_http_session", lambda config: session)
+    
+    jd = JobDescription(title="Dev", description="", required_skills=["python", "go"])
+    candidates = asyncio.run(_scraper(search_pages=1).scrape(jd))
+    
+    batch_calls = [p for p, _ in session.requests if p.startswith("/users/")]
+    assert batch_calls == ["/users/100;200;101;201;102;202"]
+    assert candidates[0].name == "user100"
+    assert candidates[0].location == "Pune"
+    assert "top answerer in python (score 50)" in candidates[0].summary
+    # Name-search users were found for both skills and are kept once
+    user1 = next(c for c in candidates if c.name == "user1")
+    assert user1.skills == ["python", "go"]
+
+
+def test_filter_is_created_once_per_process(monkeypatch):
+    session = FakeStackExchange()
+    monkeypatch.setattr("src.scrapers.get_http_session", lambda config: session)
+    
+    jd = JobDescription(title="Dev", description="", required_skills=["python"])
+    asyncio.run(_scraper().scrape(jd))
+    asyncio.run(_scraper().scrape(jd))
+    
+    assert len([p for p, _ in session.requests if p == "/filters/create"]) == 1
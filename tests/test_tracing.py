@@ -0,0 +1,62 @@
+"""Tests for job tracing spans and exports"""
+import asyncio
+import json
+from src.tracing import Tracer
+
+
+def test_spans_nest_across_tasks_and_summarise():
+    tracer = Tracer()
+    
+    async def scrape(portal):
+        with tracer.span("scrape", portal=portal) as span:
+            await asyncio.sleep(0.01)
+            span.set_attribute("candidates", 3)
+    
+    async def run():
+        with tracer.span("matching"):
+            pass
+        await asyncio.gather(scrape("github"), scrape("stackoverflow"))
+    
+    with tracer.trace_job("job-1") as root:
+        asyncio.run(run())
+    
+    spans = {s.span_id: s for s in root.trace.spans}
+    scrapes = [s for s in spans.values() if s.name == "scrape"]
+    assert len(scrapes) == 2
+    assert all(s.parent_id == root.span_id for s in scrapes)
+    assert scrapes[0].attributes["candidates"] == 3
+    
+    summary = tracer.summary(root)
+    assert summary["stages"]["scrape"]["count"] == 2
+    assert summary["stages"]["matching"]["count"] == 1
+    assert summary["total_seconds"] >= summary["stages"]["scrape"]["max_seconds"]
+
+
+def test_spans_are_noops_outside_a_job():
+    tracer = Tracer()
+    with tracer.span("scrape") as span:
+        span.set_attribute("candidates", 1)
+    tracer.set_attribute("expansion_source", "cache")
+    assert tracer.summary(span) is None
+
+
+def test_trace_exported_as_json_lines_and_otlp(tmp_path):
+    tracer = Tracer()
+    tracer.configure({'tracing': {
+        'file': str(tmp_path / "traces.jsonl"),
+        'otlp_file': str(tmp_path / "traces.otlp.jsonl")
+    }})
+    
+    with tracer.trace_job("job-2"):
+        with tracer.span("ranking", candidates=5):
+            pass
+    
+    lines = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["ranking", "job"]
+    assert lines[0]["job_id"] == "job-2"
+    
+    otlp = json.loads((tmp_path / "traces.otlp.jsonl").read_text())
+    spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    ranking = next(s for s in spans if s["name"] == "ranking")
+    assert len(ranking["traceId"]) == 32 and len(ranking["spanId"]) == 16
+    assert {"key": "candidates", "value": {"intValue": "5"}} in ranking["attributes"]
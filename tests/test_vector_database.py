@@ -0,0 +1,77 @@
+"""Tests for chunked ChromaDB upserts against a fake collection"""
+import importlib
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+
+class FakeChromaCollection:
+    """Records upserts; raises `error` from upsert if given"""
+    
+    def __init__(self, error=None):
+        self.error = error
+        self.upserts = []
+    
+    def upsert(self, **kwargs):
+        if self.error is not None:
+            raise self.error
+        self.upserts.append(kwargs)
+
+
+class FakeEmbeddingModel:
+    """One embedding row per document, tagged with the document's position"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def encode(self, documents, batch_size=32, convert_to_tensor=False):
+        self.calls.append(list(documents))
+        return np.array([[float(i), 1.0] for i in range(len(documents))])
+
+
+@pytest.fixture(scope="module")
+def vector():
+    """src.vector_database, imported without opening a store or loading a model"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(chromadb, "PersistentClient", MagicMock())
+        patch.setattr(sentence_transformers, "SentenceTransformer", MagicMock())
+        yield importlib.import_module("src.vector_database")
+
+
+def _manager(vector, collection):
+    manager = vector.VectorDBManager.__new__(vector.VectorDBManager)
+    manager.embedding_model = FakeEmbeddingModel()
+    manager.candidates_collection = collection
+    manager.scraped_collection = FakeChromaCollection()
+    return manager
+
+
+def test_batch_upsert_embeds_once_and_upserts_in_chunks(vector):
+    collection = FakeChromaCollection()
+    manager = _manager(vector, collection)
+    candidates = [{'id': str(i), 'name': f"C{i}", 'location': None, 'experience_years': None} for i in range(5)]
+    candidates.append({'id': '0', 'name': "C0 updated"})
+    
+    ids = manager.add_candidates_batch(candidates, is_final=True, batch_size=2)
+    
+    assert ids == ['0', '1', '2', '3', '4']
+    # Every document is embedded in one call, with the last record per id
+    [documents] = manager.embedding_model.calls
+    assert len(documents) == 5 and "C0 updated" in documents[0]
+    assert [u['ids'] for u in collection.upserts] == [['0', '1'], ['2', '3'], ['4']]
+    # Precomputed embeddings stay aligned with their ids across chunks
+    assert [e[0] for u in collection.upserts for e in u['embeddings']] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert all(isinstance(e, list) for u in collection.upserts for e in u['embeddings'])
+    # None metadata values are replaced, since Chroma rejects them
+    metadata = collection.upserts[0]['metadatas'][1]
+    assert metadata['location'] == '' and metadata['experience_years'] == 0 and metadata['is_final'] is True
+
+
+def test_batch_upsert_reports_failure_as_no_ids(vector):
+    manager = _manager(vector, FakeChromaCollection(error=ValueError("bad batch")))
+    assert manager.add_candidates_batch([{'id': '1', 'name': "C1"}]) == []
+    assert manager.add_candidates_batch([]) == []